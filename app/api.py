@@ -0,0 +1,427 @@
+"""
+🆕 V4 FEATURE: Async HTTP API for the generation pipeline.
+
+Run:
+    uvicorn api:app --app-dir app --host 0.0.0.0 --port 8000
+
+Endpoints (JSON bodies; matching endpoints accept "portfolio" to pick a named portfolio):
+    GET  /health                 liveness, with the warm-up readiness state
+    GET  /ready                  200 once warmed up, 503 before (for load balancer checks)
+    POST /extract                {"text"} or {"url"}                     -> job data
+    POST /match                  {"skills"}                              -> portfolio links
+    POST /match_jobs             {"jobs": [skills, ...], "top_k"?}       -> portfolio fit per job
+    POST /generate               {"job_data", "links"?, "tone"?, "company_intel"?} -> email
+    POST /variations             {"job_data", "links"?, "tone"?, "company_intel"?} -> 3 emails
+    POST /followups              {"email", "job_data", "company_name"}   -> follow-up sequence
+    POST /batch                  {"requests": [{"op", "body"}, ...]}     -> results in order
+    POST /campaign/stream        {"job"} or {"url", "company"?}         -> server-sent events
+"""
+import os
+import json
+import time
+import asyncio
+import threading
+import contextlib
+from typing import Callable, Dict, List, Tuple
+
+from dotenv import load_dotenv
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from chains import Chain
+from portfolio import Portfolio
+from portfolio_registry import get_portfolio_registry
+from campaigns import run_campaign
+from structured_jobs import ingest_job_url
+from task_queue import TaskCancelled
+from utils import extract_company_name_from_url
+from tracing import tracer
+from rate_limiter import call_priority, BATCH
+from warmup import start_warmup, readiness
+
+load_dotenv()
+
+# Maximum operations per /batch request, and how many of them run at once
+MAX_BATCH_REQUESTS = int(os.getenv("API_MAX_BATCH", "50"))
+BATCH_CONCURRENCY = int(os.getenv("API_BATCH_CONCURRENCY", "8"))
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent single-item calls into one batched call.
+
+    Items submitted within `max_wait` seconds of each other (up to
+    `max_batch`) are passed together to `batch_fn`, which runs in the
+    thread pool and returns one result per item (an exception instance
+    fails only its own item).
+    """
+
+    def __init__(self, batch_fn: Callable[[List], List], max_batch: int = 32, max_wait: float = 0.01):
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._pending = []
+        self._timer = None
+        self.stats = {"items": 0, "batches": 0}
+
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch):
+        self.stats["items"] += len(batch)
+        self.stats["batches"] += 1
+        try:
+            results = await run_in_threadpool(self.batch_fn, [item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+class Services:
+    """Process-wide clients shared by every request: one Chain, the portfolio registry."""
+
+    def __init__(self):
+        self.chain = Chain()
+        self.portfolios = get_portfolio_registry()
+        self.match_batcher = MicroBatcher(self._match_batch)
+
+    def portfolio(self, name: str = None) -> Portfolio:
+        # Loaded on first use: the embedding model is only needed for matching
+        try:
+            return self.portfolios.get(name)
+        except KeyError:
+            raise ApiError(404, f"unknown portfolio {name!r}")
+        except ValueError as e:
+            raise ApiError(400, str(e))
+
+    def _match_batch(self, items: List[Tuple[str, str]]) -> List[list]:
+        # Items are (portfolio name, skills text): one vector query per portfolio
+        positions = {}
+        for i, (name, _) in enumerate(items):
+            positions.setdefault(name, []).append(i)
+
+        results = [None] * len(items)
+        for name, indices in positions.items():
+            try:
+                links = self.portfolio(name).query_links_batch([items[i][1] for i in indices])
+            except ApiError as e:
+                links = [e] * len(indices)
+            for i, result in zip(indices, links):
+                results[i] = result
+        return results
+
+
+_services = None
+_services_lock = threading.Lock()
+
+
+def get_services() -> Services:
+    global _services
+    with _services_lock:
+        if _services is None:
+            _services = Services()
+        return _services
+
+
+def _require(body: Dict, *fields):
+    missing = [field for field in fields if not body.get(field)]
+    if missing:
+        raise ApiError(400, f"missing field(s): {', '.join(missing)}")
+
+
+def _job_data(body: Dict) -> Dict:
+    """The request's `job_data`, checked to be an object whose skills (if any) are a list."""
+    _require(body, "job_data")
+    job_data = body["job_data"]
+    if not isinstance(job_data, dict):
+        raise ApiError(400, "'job_data' must be an object")
+    if not isinstance(job_data.get("skills") or [], list):
+        raise ApiError(400, "'job_data.skills' must be a list")
+    return job_data
+
+
+def _skills_text(skills) -> str:
+    return str(skills if isinstance(skills, (list, str)) else list(skills or []))
+
+
+# ---------------------------------------------------------------------------
+# Operations (shared by the single endpoints and /batch)
+# ---------------------------------------------------------------------------
+
+async def op_extract(body: Dict) -> Dict:
+    chain = get_services().chain
+    if body.get("url"):
+        job_data, text, method = await run_in_threadpool(ingest_job_url, body["url"], chain.extract_jobs)
+        if text is None:
+            raise ApiError(502, f"unable to fetch {body['url']}")
+        return {"job_data": job_data, "method": method}
+
+    _require(body, "text")
+    return {"job_data": await chain.aextract_jobs(body["text"]), "method": "llm"}
+
+
+async def op_match(body: Dict) -> Dict:
+    _require(body, "skills")
+    links = await get_services().match_batcher.submit((body.get("portfolio"), _skills_text(body["skills"])))
+    return {"links": links}
+
+
+async def op_match_jobs(body: Dict) -> Dict:
+    _require(body, "jobs")
+    jobs = body["jobs"]
+    if not isinstance(jobs, list):
+        raise ApiError(400, "'jobs' must be a list of skill lists")
+    top_k = body.get("top_k", 2)
+    if isinstance(top_k, bool) or not isinstance(top_k, int) or top_k < 1:
+        raise ApiError(400, "'top_k' must be a positive integer")
+    skills_per_job = [job.get("skills") or [] if isinstance(job, dict) else job for job in jobs]
+    if not all(isinstance(skills, list) for skills in skills_per_job):
+        raise ApiError(400, "each of 'jobs' must be a skill list or an object with a 'skills' list")
+    portfolio = await run_in_threadpool(get_services().portfolio, body.get("portfolio"))
+    matches = await run_in_threadpool(portfolio.match_jobs, skills_per_job, top_k)
+    return {"matches": matches}
+
+
+async def _links_for(body: Dict, job_data: Dict):
+    if body.get("links") is not None:
+        return body["links"]
+    skills = job_data.get("skills", [])
+    return await get_services().match_batcher.submit((body.get("portfolio"), _skills_text(skills)))
+
+
+async def op_generate(body: Dict) -> Dict:
+    job_data = _job_data(body)
+    chain = get_services().chain
+    links = await _links_for(body, job_data)
+    email = await chain.agenerate_cold_email(job_data, links, body.get("tone"), body.get("company_intel"))
+    return {"email": email}
+
+
+async def op_variations(body: Dict) -> Dict:
+    job_data = _job_data(body)
+    chain = get_services().chain
+    links = await _links_for(body, job_data)
+    tone = body.get("tone") or await chain.adetect_style(job_data.get("description", ""))
+    variations = await chain.agenerate_email_variations(job_data, links, tone, body.get("company_intel") or {})
+    return {"tone": tone, "variations": variations}
+
+
+async def op_followups(body: Dict) -> Dict:
+    _require(body, "email", "company_name")
+    job_data = _job_data(body)
+    chain = get_services().chain
+    followups = await chain.agenerate_follow_up_sequence(body["email"], job_data, body["company_name"])
+    return {"followups": followups}
+
+
+OPERATIONS = {
+    "extract": op_extract,
+    "match": op_match,
+    "match_jobs": op_match_jobs,
+    "generate": op_generate,
+    "variations": op_variations,
+    "followups": op_followups,
+}
+
+
+# ---------------------------------------------------------------------------
+# HTTP layer
+# ---------------------------------------------------------------------------
+
+async def _json_body(request: Request) -> Dict:
+    try:
+        body = await request.json()
+    except ValueError:
+        raise ApiError(400, "request body must be JSON")
+    if not isinstance(body, dict):
+        raise ApiError(400, "request body must be a JSON object")
+    return body
+
+
+def _error_response(e: Exception) -> JSONResponse:
+    if isinstance(e, ApiError):
+        return JSONResponse({"error": e.message}, status_code=e.status)
+    print(f"❌ API error: {e}")
+    return JSONResponse({"error": str(e)}, status_code=500)
+
+
+def operation_endpoint(name: str):
+    operation = OPERATIONS[name]
+
+    async def endpoint(request: Request):
+        with tracer.span(f"api.{name}"):
+            try:
+                return JSONResponse(await operation(await _json_body(request)))
+            except Exception as e:
+                return _error_response(e)
+
+    return endpoint
+
+
+async def batch_endpoint(request: Request):
+    """Run several operations concurrently; each result is reported separately."""
+    try:
+        body = await _json_body(request)
+        items = body.get("requests")
+        if not isinstance(items, list) or not items:
+            raise ApiError(400, "'requests' must be a non-empty list")
+        if len(items) > MAX_BATCH_REQUESTS:
+            raise ApiError(400, f"at most {MAX_BATCH_REQUESTS} requests per batch")
+    except Exception as e:
+        return _error_response(e)
+
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def run(item):
+        async with semaphore:
+            try:
+                operation = OPERATIONS.get((item or {}).get("op"))
+                if operation is None:
+                    raise ApiError(400, f"unknown op {item.get('op')!r}")
+                # Bulk requests yield LLM capacity to the single-operation endpoints
+                with call_priority(BATCH):
+                    result = await operation(item.get("body") or {})
+                return {"ok": True, "result": result}
+            except Exception as e:
+                return {"ok": False, "error": getattr(e, "message", str(e))}
+
+    with tracer.span("api.batch", size=len(items)):
+        results = await asyncio.gather(*(run(item) for item in items))
+    return JSONResponse({"results": results})
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class _StreamingSteps:
+    """`run_campaign` step runner that publishes every finished step to an asyncio queue."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue):
+        self.loop = loop
+        self.queue = queue
+        self.cancelled = False
+
+    def step(self, name: str, fn: Callable, progress: float, stage: str = ""):
+        if self.cancelled:
+            raise TaskCancelled(name)
+        result = fn()
+        self.loop.call_soon_threadsafe(
+            self.queue.put_nowait, ("step", {"step": name, "stage": stage, "progress": progress, "result": result})
+        )
+        return result
+
+
+async def campaign_stream_endpoint(request: Request):
+    """Full campaign for one job, streamed as server-sent events (one event per step)."""
+    try:
+        body = await _json_body(request)
+        job = body.get("job")
+        if not job:
+            _require(body, "url")
+            job = {
+                "title": body.get("title", ""),
+                "company": body.get("company") or extract_company_name_from_url(body["url"]),
+                "url": body["url"],
+                "description_snippet": "",
+            }
+        services = get_services()
+        portfolio = await run_in_threadpool(services.portfolio, body.get("portfolio"))
+    except Exception as e:
+        return _error_response(e)
+
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+    steps = _StreamingSteps(loop, events)
+
+    def produce():
+        try:
+            result = run_campaign(services.chain, portfolio, job, steps)
+            loop.call_soon_threadsafe(events.put_nowait, ("done", {"best_strategy": result["best_strategy"]}))
+        except TaskCancelled:
+            pass
+        except Exception as e:
+            loop.call_soon_threadsafe(events.put_nowait, ("error", {"error": str(e)}))
+
+    async def stream():
+        start = time.perf_counter()
+        producer = loop.run_in_executor(None, produce)
+        try:
+            while True:
+                event, data = await events.get()
+                data["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+                yield _sse(event, data)
+                if event in ("done", "error"):
+                    break
+        finally:
+            # Client disconnected or finished: stop the campaign at its next step
+            steps.cancelled = True
+            await producer
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+async def health_endpoint(request: Request):
+    state = readiness()
+    return JSONResponse({"status": "healthy", "ready": state["ready"], "readiness": state, "timestamp": time.time()})
+
+
+async def ready_endpoint(request: Request):
+    state = readiness()
+    return JSONResponse(state, status_code=200 if state["ready"] else 503)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # Shared clients are created once, before the first request; /ready turns 200 once warmed up
+    services = await run_in_threadpool(get_services)
+    start_warmup({"chain": services.chain, "portfolios": services.portfolios})
+    yield
+
+
+app = Starlette(
+    routes=[
+        Route("/health", health_endpoint, methods=["GET"]),
+        Route("/ready", ready_endpoint, methods=["GET"]),
+        *[Route(f"/{name}", operation_endpoint(name), methods=["POST"]) for name in OPERATIONS],
+        Route("/batch", batch_endpoint, methods=["POST"]),
+        Route("/campaign/stream", campaign_stream_endpoint, methods=["POST"]),
+    ],
+    lifespan=lifespan,
+)
@@ -0,0 +1,49 @@
+"""
+Build-time index snapshots: embed every portfolio once, before deploy.
+
+Usage:
+    python app/build_index.py                      # every portfolio (default + PORTFOLIOS_DIR)
+    python app/build_index.py --portfolio alice
+
+Writes the embedding model files (EMBEDDING_MODEL_DIR), the Chroma store
+(CHROMA_PATH) and one snapshot per portfolio (PORTFOLIO_SNAPSHOT_DIR). The
+Dockerfile runs it so a fresh container starts with everything on disk; a
+CSV that changed after the build no longer matches its snapshot and is
+re-embedded at startup as before.
+"""
+import time
+import argparse
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from portfolio import SharedEmbeddingFunction, EMBEDDING_MODEL_DIR  # noqa: E402
+from portfolio_registry import PortfolioRegistry  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build portfolio index snapshots")
+    parser.add_argument("--portfolio", action="append", help="Portfolio name (repeatable; default: all)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    # First call downloads the model (into EMBEDDING_MODEL_DIR when set)
+    SharedEmbeddingFunction()(["warm-up"])
+    print(f"🧠 Embedding model ready in {time.perf_counter() - start:.1f}s ({EMBEDDING_MODEL_DIR or 'chromadb cache'})")
+
+    # Nothing stays resident: each portfolio is released once its snapshot is written
+    registry = PortfolioRegistry(max_bytes=0)
+    for name in args.portfolio or registry.names():
+        started = time.perf_counter()
+        portfolio = registry.get(name)
+        snapshot_dir = portfolio.build_snapshot()
+        print(f"📦 {name}: {len(portfolio.data)} projects -> {snapshot_dir} "
+              f"({time.perf_counter() - started:.1f}s)")
+        registry.evict(name)
+
+    print(f"✅ Index snapshots built in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
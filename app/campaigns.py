@@ -0,0 +1,105 @@
+from typing import Callable, Dict, Optional
+
+from structured_jobs import ingest_job_url
+from task_queue import TaskContext, register_task
+
+# Email strategies returned by `Chain.generate_email_variations`
+STRATEGIES = ["value_proposition", "problem_solution", "storytelling"]
+
+
+class _InlineSteps:
+    """Step runner for campaigns executed directly, without a task queue."""
+
+    def step(self, name: str, fn: Callable, progress: float, stage: str = ""):
+        return fn()
+
+
+def listing_job_data(job: Dict) -> Dict:
+    """Job data built from the discovery listing when the posting cannot be fetched."""
+    return {
+        'role': job['title'],
+        'experience': 'Not specified',
+        'skills': [],
+        'description': job.get('description_snippet', '')
+    }
+
+
+def _job_data(chain, job: Dict) -> Dict:
+    # ATS APIs / JSON-LD skip LLM extraction, and the stored extraction is
+    # re-used when the page is unchanged
+    if job.get('url'):
+        job_data, job_content, _ = ingest_job_url(job['url'], chain.extract_jobs)
+        if job_content:
+            return job_data
+    return listing_job_data(job)
+
+
+def run_campaign(chain, portfolio, job: Dict, ctx: Optional[TaskContext] = None) -> Dict:
+    """
+    🆕 V4 FEATURE: Full campaign for one discovered job.
+
+    Every step is checkpointed when run as a queued task, so a campaign
+    resumed after a restart continues where it stopped.
+
+    Args:
+        chain (Chain): LLM chain
+        portfolio (Portfolio): Portfolio for project links
+        job (dict): Discovered job listing (title, company, url, ...)
+        ctx (TaskContext): Task context for progress/cancellation (None runs inline)
+
+    Returns:
+        dict: {"job", "job_data", "company_intel", "tone", "links", "variations",
+               "analyses", "best_strategy", "followups"}
+    """
+    steps = ctx or _InlineSteps()
+
+    job_data = steps.step("job_data", lambda: _job_data(chain, job), 0.15, "Reading job posting")
+    description = job_data.get('description', '')
+
+    company_intel = steps.step(
+        "company_intel", lambda: chain.research_company(job['company'], description), 0.3, "Analyzing company"
+    )
+    tone = steps.step("tone", lambda: chain.detect_style(description), 0.4, "Detecting tone")
+    links = steps.step(
+        "links", lambda: portfolio.query_links(str(job_data.get('skills', []))), 0.45, "Matching portfolio"
+    )
+    variations = steps.step(
+        "variations",
+        lambda: chain.generate_email_variations(job_data, links, tone, company_intel),
+        0.65, "Crafting email strategies"
+    )
+
+    analyses = {}
+    for i, strategy in enumerate(STRATEGIES):
+        analyses[strategy] = steps.step(
+            f"analysis.{strategy}",
+            lambda strategy=strategy: chain.analyze_email_effectiveness(variations[strategy], job_data),
+            0.65 + 0.2 * (i + 1) / len(STRATEGIES), "Scoring emails"
+        )
+
+    best_strategy = max(STRATEGIES, key=lambda s: analyses[s].get('success_score', 75))
+    followups = steps.step(
+        "followups",
+        lambda: chain.generate_follow_up_sequence(variations[best_strategy], job_data, job['company']),
+        1.0, "Generating follow-up sequence"
+    )
+
+    return {
+        "job": job,
+        "job_data": job_data,
+        "company_intel": company_intel,
+        "tone": tone,
+        "links": links,
+        "variations": variations,
+        "analyses": analyses,
+        "best_strategy": best_strategy,
+        "followups": followups,
+    }
+
+
+@register_task("campaign")
+def campaign_task(ctx: TaskContext) -> Dict:
+    # Named portfolio of the submitting consultant (payload "portfolio"), when workers serve several
+    portfolios = ctx.resources.get("portfolios")
+    portfolio = portfolios.get(ctx.payload.get("portfolio")) if portfolios else ctx.resources["portfolio"]
+    return run_campaign(ctx.resources["chain"], portfolio, ctx.payload["job"], ctx)
@@ -1,17 +1,51 @@
 import os
 import streamlit as st
-from langchain_groq import ChatGroq
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.exceptions import OutputParserException
 from dotenv import load_dotenv
 from typing import Dict, List
 import json
+import time
+import asyncio
+import threading
+from llm_backends import LLMBackend, GroqBackend, FakeBackend, DEFAULT_MODEL
+from tracing import tracer, record_token_usage
+from rate_limiter import RateLimitScheduler
+from model_routing import ModelRouter
+from single_flight import single_flight, normalize_text, digest
+from llm_loop import run_sync, run_on_llm_loop
 
 load_dotenv()
 
 class Chain:
-    def __init__(self, groq_api_key: str = None):
+    def __init__(self, groq_api_key: str = None, backend: LLMBackend = None,
+                 router: ModelRouter = None):
+        # Explicit backend (e.g. FakeBackend for benchmarks) or LLM_BACKEND=fake
+        if backend is None and os.getenv("LLM_BACKEND", "groq").strip().lower() == "fake":
+            backend = FakeBackend.from_env()
+        
+        if backend is None:
+            backend = GroqBackend(self._resolve_groq_api_key(groq_api_key))
+        
+        print(f"🧠 LLM backend: {backend.name}")
+        self.backend = backend
+        self.scheduler = backend.scheduler or RateLimitScheduler()
+        self.router = router or ModelRouter.from_env()
+        
+        # One client per (model, temperature, timeout), created on first use
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+        self.llm = self._get_llm(DEFAULT_MODEL, 0)
+        self.creative_llm = self._get_llm(DEFAULT_MODEL, 0.7)
+
+    @property
+    def flight_scope(self):
+        """Coalescing scope of the single-flight methods: chains with the same backend and routes."""
+        return self.backend.identity, digest(self.router.routes)
+
+    def _resolve_groq_api_key(self, groq_api_key: str = None) -> str:
+        """Resolve the Groq API key from parameter, Streamlit Secrets or .env."""
         # Method 1: Direct parameter
         if groq_api_key and groq_api_key.strip():
             self.groq_api_key = groq_api_key.strip()
@@ -40,12 +74,75 @@ class Chain:
             raise ValueError("Groq API Key is empty")
         
         print(f"🔑 Key loaded ({len(self.groq_api_key)} characters)")
-        
-        self.llm = ChatGroq(temperature=0, groq_api_key=self.groq_api_key, model="llama-3.1-8b-instant")
-        self.creative_llm = ChatGroq(temperature=0.7, groq_api_key=self.groq_api_key, model="llama-3.1-8b-instant")
+        return self.groq_api_key
+
+    def _get_llm(self, model: str, temperature: float, timeout: float = None):
+        key = (model, temperature, timeout)
+        with self._clients_lock:
+            if key not in self._clients:
+                self._clients[key] = self.backend.create_llm(
+                    temperature=temperature, model=model, timeout=timeout
+                )
+            return self._clients[key]
+
+    async def _ainvoke(self, stage: str, prompt: ChatPromptTemplate, inputs: Dict):
+        """
+        Run `prompt` on the model routed for this stage, trying fallback models
+        in order on failure or timeout.
+        
+        Each attempt goes through the rate-limit scheduler; the tracing span
+        records latency, retries, tokens, served model and cost. Requests are
+        sent from the shared LLM loop, whichever loop awaits them.
+        """
+        return await run_on_llm_loop(self._ainvoke_on_loop(stage, prompt, inputs))
+
+    async def _ainvoke_on_loop(self, stage: str, prompt: ChatPromptTemplate, inputs: Dict):
+        route_name = stage.split(".")[0]
+        route = self.router.route(route_name)
+        
+        # ~4 characters per token for the prompt, plus a typical completion budget
+        estimated_tokens = len(prompt.format(**inputs)) // 4 + 400
+        
+        with tracer.span(f"llm.{stage}", backend=self.backend.name, route=route_name) as span:
+            last_error = None
+            
+            for attempt, model in enumerate(self.router.candidates(route_name)):
+                llm = self._get_llm(model, route["temperature"], route["timeout"])
+                start = time.perf_counter()
+                
+                try:
+                    res = await self.scheduler.arun(lambda: (prompt | llm).ainvoke(inputs), estimated_tokens,
+                                                   model=model)
+                except Exception as e:
+                    latency_ms = (time.perf_counter() - start) * 1000
+                    self.router.record(route_name, model, latency_ms, error=True, fallback=attempt > 0)
+                    print(f"⚠️ {route_name} failed on {model}: {e}")
+                    last_error = e
+                    continue
+                
+                latency_ms = (time.perf_counter() - start) * 1000
+                record_token_usage(span, res)
+                prompt_tokens = span.attributes.get("prompt_tokens", 0)
+                completion_tokens = span.attributes.get("completion_tokens", 0)
+                
+                self.router.record(route_name, model, latency_ms, prompt_tokens,
+                                   completion_tokens, fallback=attempt > 0)
+                self.scheduler.reconcile(estimated_tokens, prompt_tokens + completion_tokens, model)
+                
+                span.set("model", model)
+                span.set("fallback", attempt > 0)
+                span.set("cost_usd", self.router.cost(model, prompt_tokens, completion_tokens))
+                return res
+            
+            raise last_error
 
     def extract_jobs(self, cleaned_text):
         """Extract job posting information from cleaned text."""
+        return run_sync(self.aextract_jobs(cleaned_text))
+
+    @single_flight("extract_jobs", key=lambda cleaned_text: digest(normalize_text(cleaned_text)), method=True)
+    async def aextract_jobs(self, cleaned_text):
+        """Async `extract_jobs`."""
         prompt_extract = ChatPromptTemplate.from_template(
             """
             ### SCRAPED TEXT FROM WEBSITE:
@@ -60,8 +157,7 @@ class Chain:
             """
         )
         
-        chain_extract = prompt_extract | self.llm
-        res = chain_extract.invoke({"page_data": cleaned_text})
+        res = await self._ainvoke("extract_jobs", prompt_extract, {"page_data": cleaned_text})
         
         try:
             json_parser = JsonOutputParser()
@@ -73,6 +169,11 @@ class Chain:
 
     def detect_style(self, job_description):
         """Detect appropriate communication tone from job posting."""
+        return run_sync(self.adetect_style(job_description))
+
+    @single_flight("detect_style", key=lambda job_description: digest(normalize_text(job_description)), method=True)
+    async def adetect_style(self, job_description):
+        """Async `detect_style`."""
         prompt_tone = ChatPromptTemplate.from_template(
             """
             ### JOB POSTING TEXT:
@@ -86,8 +187,7 @@ class Chain:
             """
         )
         
-        chain_tone = prompt_tone | self.llm
-        res = chain_tone.invoke({"job_text": job_description})
+        res = await self._ainvoke("detect_style", prompt_tone, {"job_text": job_description})
         
         detected_tone = res.content.strip().lower()
         
@@ -100,6 +200,15 @@ class Chain:
 
     def research_company(self, company_name: str, job_description: str = "") -> Dict:
         """Research company for better email personalization."""
+        return run_sync(self.aresearch_company(company_name, job_description))
+
+    @single_flight(
+        "research_company",
+        key=lambda company_name, job_description="": (normalize_text(company_name), digest(normalize_text(job_description))),
+        method=True
+    )
+    async def aresearch_company(self, company_name: str, job_description: str = "") -> Dict:
+        """Async `research_company`."""
         prompt_research = ChatPromptTemplate.from_template(
             """
             ### COMPANY NAME:
@@ -122,8 +231,7 @@ class Chain:
             """
         )
         
-        chain_research = prompt_research | self.llm
-        res = chain_research.invoke({
+        res = await self._ainvoke("research_company", prompt_research, {
             "company_name": company_name,
             "job_context": job_description[:1000]
         })
@@ -144,6 +252,10 @@ class Chain:
 
     def generate_email_variations(self, job_data: Dict, links: List, tone: str, company_intel: Dict) -> Dict[str, str]:
         """Generate 3 different email strategies."""
+        return run_sync(self.agenerate_email_variations(job_data, links, tone, company_intel))
+
+    async def agenerate_email_variations(self, job_data: Dict, links: List, tone: str, company_intel: Dict) -> Dict[str, str]:
+        """Async `generate_email_variations`."""
         
         prompt_value = ChatPromptTemplate.from_template(
             """
@@ -212,18 +324,25 @@ class Chain:
             "tone": tone
         }
         
-        chain_value = prompt_value | self.creative_llm
-        chain_problem = prompt_problem | self.creative_llm
-        chain_story = prompt_story | self.creative_llm
-        
+        # The three strategies are independent: request them concurrently
+        value, problem, story = await asyncio.gather(
+            self._ainvoke("generate_email_variations.value", prompt_value, context),
+            self._ainvoke("generate_email_variations.problem", prompt_problem, context),
+            self._ainvoke("generate_email_variations.story", prompt_story, context)
+        )
         return {
-            "value_proposition": chain_value.invoke(context).content,
-            "problem_solution": chain_problem.invoke(context).content,
-            "storytelling": chain_story.invoke(context).content
+            "value_proposition": value.content,
+            "problem_solution": problem.content,
+            "storytelling": story.content
         }
 
     def analyze_email_effectiveness(self, email: str, job_data: Dict) -> Dict:
         """Predict email effectiveness and provide suggestions."""
+        return run_sync(self.aanalyze_email_effectiveness(email, job_data))
+
+    @single_flight("analyze_email_effectiveness", key=lambda email, job_data: (digest(email), digest(job_data)), method=True)
+    async def aanalyze_email_effectiveness(self, email: str, job_data: Dict) -> Dict:
+        """Async `analyze_email_effectiveness`."""
         prompt_analyze = ChatPromptTemplate.from_template(
             """
             ### EMAIL TO ANALYZE:
@@ -251,8 +370,7 @@ class Chain:
             """
         )
         
-        chain_analyze = prompt_analyze | self.llm
-        res = chain_analyze.invoke({
+        res = await self._ainvoke("analyze_email_effectiveness", prompt_analyze, {
             "email": email,
             "job_data": str(job_data)
         })
@@ -273,6 +391,10 @@ class Chain:
 
     def generate_follow_up_sequence(self, initial_email: str, job_data: Dict, company_name: str) -> List[Dict]:
         """Create 3-email follow-up sequence."""
+        return run_sync(self.agenerate_follow_up_sequence(initial_email, job_data, company_name))
+
+    async def agenerate_follow_up_sequence(self, initial_email: str, job_data: Dict, company_name: str) -> List[Dict]:
+        """Async `generate_follow_up_sequence`."""
         prompt_followup = ChatPromptTemplate.from_template(
             """
             ### ORIGINAL EMAIL:
@@ -297,16 +419,18 @@ class Chain:
         follow_ups = []
         schedule = [(3, 1), (7, 2), (14, 3)]
         
-        for days, number in schedule:
-            chain_followup = prompt_followup | self.creative_llm
-            res = chain_followup.invoke({
+        responses = await asyncio.gather(*(
+            self._ainvoke("generate_follow_up_sequence", prompt_followup, {
                 "initial_email": initial_email,
                 "job_data": str(job_data),
                 "company_name": company_name,
                 "followup_number": number,
                 "days": days
             })
-            
+            for days, number in schedule
+        ))
+        
+        for (days, number), res in zip(schedule, responses):
             try:
                 json_parser = JsonOutputParser()
                 followup_data = json_parser.parse(res.content)
@@ -324,8 +448,12 @@ class Chain:
 
     def generate_cold_email(self, job_data, links, tone=None, company_intel=None):
         """Generate personalized cold email with adaptive tone."""
+        return run_sync(self.agenerate_cold_email(job_data, links, tone, company_intel))
+
+    async def agenerate_cold_email(self, job_data, links, tone=None, company_intel=None):
+        """Async `generate_cold_email`."""
         if tone is None:
-            tone = self.detect_style(job_data.get('description', ''))
+            tone = await self.adetect_style(job_data.get('description', ''))
         
         tone_instructions = {
             'formal': "Use highly professional language, no contractions.",
@@ -364,8 +492,7 @@ class Chain:
             """
         )
         
-        chain_email = prompt_email | self.llm
-        res = chain_email.invoke({
+        res = await self._ainvoke("generate_cold_email", prompt_email, {
             "job_data": str(job_data),
             "links": str(links),
             "tone": tone,
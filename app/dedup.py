@@ -0,0 +1,205 @@
+import re
+import zlib
+import threading
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+# Largest 32-bit prime, for the universal hash family (a * x + b) mod p: with a, b, x < p
+# every product fits in uint64 (p^2 + p < 2^64), so numpy computes it exactly
+_PRIME = (1 << 32) - 5
+_MAX_HASH = (1 << 32) - 1
+
+# Bumped whenever signatures or the band layout change (persisted signatures must be recomputed)
+SIGNATURE_VERSION = 3
+
+
+def _normalize(text: str) -> str:
+    return " ".join(re.sub(r'[^a-z0-9 ]', ' ', (text or "").lower()).split())
+
+
+def shingles(text: str, size: Optional[int] = None) -> set:
+    """
+    Shingle a text for MinHash.
+
+    Short texts (listing title + company + snippet) use character 5-grams,
+    which survive truncation and punctuation differences between boards;
+    long scraped pages use word 3-grams.
+    """
+    normalized = _normalize(text)
+    if not normalized:
+        return set()
+
+    words = normalized.split()
+    if size is None and len(words) < 60:
+        k = 5
+        if len(normalized) <= k:
+            return {normalized}
+        return {normalized[i:i + k] for i in range(len(normalized) - k + 1)}
+
+    k = size or 3
+    if len(words) <= k:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+def jaccard(a: set, b: set) -> float:
+    """Exact Jaccard similarity of two shingle sets."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """MinHash signatures with a fixed, seeded permutation family (stable across processes)."""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self._a = rng.randint(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, _PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        tokens = shingles(text)
+        if not tokens:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+
+        # crc32 is deterministic (unlike hash()), so signatures can be persisted
+        hashes = np.fromiter((zlib.crc32(t.encode("utf-8")) % _PRIME for t in tokens),
+                             dtype=np.uint64, count=len(tokens))
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _PRIME
+        return permuted.min(axis=1)
+
+    @staticmethod
+    def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+        """Estimated Jaccard similarity of the underlying shingle sets."""
+        return float(np.mean(sig_a == sig_b))
+
+
+class NearDuplicateIndex:
+    """
+    MinHash LSH index: banded signatures bucket similar texts together, so a
+    lookup only compares against a handful of candidates instead of every
+    stored document.
+
+    With 128 permutations in 32 bands of 4 rows, the banding curve's midpoint
+    is (1/32)^(1/4) ~ 0.42: pairs at 0.7 Jaccard share a band with
+    probability 1 - (1 - 0.7^4)^32 > 0.999. Candidates whose MinHash estimate
+    is within `CANDIDATE_MARGIN` of `threshold` are then confirmed with the
+    caller's exact similarity, if given, else with the estimate.
+    """
+
+    # Estimates have a standard deviation of ~0.04 at 0.7 with 128 permutations
+    CANDIDATE_MARGIN = 0.15
+
+    def __init__(self, threshold: float = 0.7, num_perm: int = 128, bands: int = 32,
+                 hasher: Optional[MinHasher] = None):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = hasher or MinHasher(num_perm)
+        self._buckets = {}
+        self._signatures = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _band_keys(self, signature: np.ndarray) -> List[tuple]:
+        return [
+            (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def candidates(self, signature: np.ndarray, min_estimate: float = 0.0) -> List[Tuple[Hashable, float]]:
+        """Keys sharing a band with `signature` and their estimated similarity, most similar first."""
+        with self._lock:
+            keys = set()
+            for band_key in self._band_keys(signature):
+                keys.update(self._buckets.get(band_key, ()))
+            scored = [(key, MinHasher.similarity(signature, self._signatures[key])) for key in keys]
+        return sorted((item for item in scored if item[1] >= min_estimate), key=lambda item: -item[1])
+
+    def query(self, text: str = None, signature: np.ndarray = None,
+              similarity: Optional[Callable[[Hashable], float]] = None) -> Optional[Hashable]:
+        """
+        Key of the most similar indexed document above `threshold`, or None.
+
+        Args:
+            text (str): Document to look up (or pass its `signature`)
+            signature (np.ndarray): MinHash signature of the document
+            similarity (callable): Key -> exact Jaccard similarity with the document;
+                without it, candidates are confirmed on the MinHash estimate
+
+        Returns:
+            Key of the best match, or None
+        """
+        if signature is None:
+            signature = self.hasher.signature(text)
+
+        if similarity is None:
+            matches = self.candidates(signature, self.threshold)
+            return matches[0][0] if matches else None
+
+        best_key, best_score = None, self.threshold
+        for key, _ in self.candidates(signature, self.threshold - self.CANDIDATE_MARGIN):
+            score = similarity(key)
+            if score >= best_score:
+                best_key, best_score = key, score
+        return best_key
+
+    def add(self, key: Hashable, text: str = None, signature: np.ndarray = None) -> np.ndarray:
+        if signature is None:
+            signature = self.hasher.signature(text)
+        with self._lock:
+            self._signatures[key] = signature
+            for band_key in self._band_keys(signature):
+                self._buckets.setdefault(band_key, []).append(key)
+        return signature
+
+
+def listing_text(job: Dict) -> str:
+    return f"{job.get('title', '')} {job.get('company', '')} {job.get('description_snippet', '')}"
+
+
+def collapse_near_duplicates(jobs: List[Dict], threshold: float = 0.7) -> List[Dict]:
+    """
+    🆕 V4 FEATURE: Collapse the same posting syndicated across sources.
+
+    Jobs are compared on title + company + snippet. The first job of each
+    group (callers pass them best match first) is kept and annotated with
+    the URLs and sources of its duplicates.
+
+    Args:
+        jobs (list): Job listings
+        threshold (float): Minimum Jaccard similarity to treat as duplicates
+
+    Returns:
+        list: Jobs with near-duplicates removed
+    """
+    index = NearDuplicateIndex(threshold=threshold)
+    kept = []
+    kept_shingles = []
+
+    for job in jobs:
+        text = listing_text(job)
+        tokens = shingles(text)
+        signature = index.hasher.signature(text)
+        duplicate_of = index.query(signature=signature,
+                                   similarity=lambda key: jaccard(tokens, kept_shingles[key]))
+
+        if duplicate_of is not None:
+            original = kept[duplicate_of]
+            original.setdefault('duplicates', []).append(job.get('url', ''))
+            source = job.get('source')
+            if source and source not in original.setdefault('sources', [original.get('source')]):
+                original['sources'].append(source)
+            continue
+
+        index.add(len(kept), signature=signature)
+        kept.append(dict(job))
+        kept_shingles.append(tokens)
+
+    return kept
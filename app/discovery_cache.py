@@ -0,0 +1,115 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+class DiscoveryCache:
+    """
+    Persistent TTL cache of job discovery results.
+
+    Entries are keyed by (keywords, location, source) and stored in
+    SQLite so they survive app restarts. An entry is:
+      - fresh while younger than `ttl` (served as is),
+      - stale until `stale_ttl` (served instantly, refreshed in background),
+      - expired afterwards (treated as a miss).
+    """
+
+    def __init__(self, path: str = "cache/discovery.db", ttl: float = 900, stale_ttl: float = 86400):
+        self.path = path
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS discovery_cache (
+                key TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                jobs TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    @classmethod
+    def from_env(cls) -> "DiscoveryCache":
+        return cls(
+            path=os.getenv("DISCOVERY_CACHE_PATH", "cache/discovery.db"),
+            ttl=float(os.getenv("DISCOVERY_CACHE_TTL", "900")),
+            stale_ttl=float(os.getenv("DISCOVERY_CACHE_STALE_TTL", "86400")),
+        )
+
+    @staticmethod
+    def make_key(keywords: List[str], location: str, source: str) -> str:
+        """
+        Normalize keywords (case, whitespace) and location.
+
+        Keyword order is kept: sources build their query from the leading
+        keywords (see `JobSource.query_keywords`), so a reordered list is a
+        different search.
+        """
+        normalized = [" ".join(k.lower().split()) for k in keywords if k.strip()]
+        return json.dumps([normalized, " ".join(location.lower().split()), source])
+
+    def get(self, key: str) -> Optional[Tuple[List[Dict], str]]:
+        """
+        Returns:
+            tuple: (jobs, "fresh" | "stale") or None on miss/expiry
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT jobs, fetched_at FROM discovery_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        age = time.time() - row[1]
+        if age >= self.stale_ttl:
+            return None
+        return json.loads(row[0]), ("fresh" if age < self.ttl else "stale")
+
+    def set(self, key: str, source: str, jobs: List[Dict]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO discovery_cache (key, source, jobs, fetched_at) VALUES (?, ?, ?, ?)",
+                (key, source, json.dumps(jobs), time.time())
+            )
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        """Delete entries older than `stale_ttl`; returns the number removed."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM discovery_cache WHERE fetched_at < ?", (time.time() - self.stale_ttl,)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM discovery_cache")
+            self._conn.commit()
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_discovery_cache() -> DiscoveryCache:
+    """Process-wide discovery cache (shared by every Streamlit session)."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = DiscoveryCache.from_env()
+            _shared_cache.purge_expired()
+        return _shared_cache
@@ -0,0 +1,107 @@
+"""
+On-disk snapshots of a portfolio's derived indexes.
+
+A snapshot holds the unit-normalized embedding matrix (`<hash>.npy`, opened
+memory-mapped) and a JSON manifest with the project ids, metadata and
+extracted skills (`<hash>.json`), keyed to the sha256 of the portfolio CSV
+it was built from. A portfolio loaded cold from a matching snapshot needs
+no ChromaDB read, no re-normalization and no skill extraction, and an
+empty collection is filled from the stored embeddings without running the
+model. `app/build_index.py` writes them at image build time.
+"""
+import os
+import json
+import tempfile
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from vector_index import NumpyVectorIndex
+
+# Bumped whenever the snapshot layout changes: older snapshots are rebuilt
+SNAPSHOT_FORMAT = 2
+
+
+def embedding_model_id(embedding_function) -> str:
+    """Identifies the embedding model, so snapshots built with another model are not reused."""
+    return f"{embedding_function.name()}:{getattr(embedding_function, 'MODEL_NAME', '')}"
+
+
+def _atomic_write(path: str, write):
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def write_snapshot(directory: str, source_hash: str, model_id: str,
+                   index: NumpyVectorIndex, ids: List[str], skills: List[str]) -> str:
+    """
+    Save `index` and `skills` as the snapshot for `source_hash`, replacing older versions.
+
+    Args:
+        directory (str): Snapshot directory of one portfolio
+        source_hash (str): sha256 of the portfolio CSV
+        model_id (str): `embedding_model_id` of the embedding function
+        index (NumpyVectorIndex): Index built from the portfolio's embeddings
+        ids (list): Collection id of each index row
+        skills (list): `Portfolio.extract_all_skills()` of the same CSV
+
+    Returns:
+        str: Path of the written manifest
+    """
+    os.makedirs(directory, exist_ok=True)
+    matrix_path = os.path.join(directory, f"{source_hash}.npy")
+    manifest_path = os.path.join(directory, f"{source_hash}.json")
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "source_sha256": source_hash,
+        "embedding_model": model_id,
+        "rows": len(index),
+        "dims": int(index.matrix.shape[1]),
+        "ids": list(ids),
+        "metadatas": index.metadatas,
+        "skills": skills,
+    }
+
+    # Matrix first: a manifest on disk always has its complete matrix next to it
+    _atomic_write(matrix_path, lambda f: np.save(f, np.asarray(index.matrix, dtype=np.float32)))
+    _atomic_write(manifest_path, lambda f: f.write(json.dumps(manifest).encode("utf-8")))
+
+    for name in os.listdir(directory):
+        if not name.startswith(source_hash) and not name.startswith(".tmp-"):
+            os.remove(os.path.join(directory, name))
+    return manifest_path
+
+
+def read_snapshot(directory: str, source_hash: str, model_id: str) -> Optional[Dict]:
+    """
+    Load the snapshot for `source_hash`, memory-mapping the embedding matrix.
+
+    Returns:
+        dict: {"index": NumpyVectorIndex, "ids": [...], "skills": [...]} or None
+              when there is no matching snapshot (other CSV content, model or format)
+    """
+    manifest_path = os.path.join(directory, f"{source_hash}.json")
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if (manifest.get("format") != SNAPSHOT_FORMAT or manifest.get("embedding_model") != model_id
+                or manifest.get("source_sha256") != source_hash):
+            return None
+        matrix = np.load(os.path.join(directory, f"{source_hash}.npy"), mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+
+    if matrix.shape != (manifest["rows"], manifest["dims"]):
+        return None
+    return {
+        "index": NumpyVectorIndex.from_normalized(matrix, manifest["metadatas"]),
+        "ids": manifest["ids"],
+        "skills": manifest["skills"],
+    }
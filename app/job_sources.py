@@ -0,0 +1,281 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Iterator, List, Optional
+
+from utils import discover_jobs_from_keywords, search_jobs_google_custom
+from tracing import tracer
+from discovery_cache import DiscoveryCache, get_discovery_cache
+from job_store import get_job_store
+
+
+class CircuitBreaker:
+    """
+    Skip a source after repeated failures or deadline overruns.
+
+    closed -> open after `failure_threshold` consecutive failures;
+    open -> half-open after `reset_timeout` seconds (one trial call);
+    half-open -> closed on success, back to open on failure.
+
+    While the trial call is in flight every other caller is rejected; a
+    trial that never reports back (abandoned caller) expires after
+    another `reset_timeout`.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 300.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_started_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        """True if a call may go through; in half-open, only for the single trial call."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "open":
+                return False
+            now = time.monotonic()
+            if self.trial_started_at is not None and now - self.trial_started_at < self.reset_timeout:
+                return False
+            self.trial_started_at = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_started_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half-open" or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.trial_started_at = None
+
+
+class JobSource:
+    """
+    Base class for job discovery sources.
+
+    Subclasses implement `search` and raise on request errors, so the
+    circuit breaker can tell a failing board from an empty result.
+    """
+
+    name = "base"
+    # Live sources go through the discovery cache and feed the job store
+    cacheable = True
+
+    def __init__(self):
+        self.breaker = CircuitBreaker()
+
+    def search(self, keywords: List[str], location: str, max_results: int) -> List[Dict]:
+        raise NotImplementedError
+
+    def query_keywords(self, keywords: List[str]) -> List[str]:
+        """Keywords the results depend on (the cache key): all of them, in order, by default."""
+        return keywords
+
+
+# Registered sources, queried by `stream_jobs` in registration order
+JOB_SOURCES: List[JobSource] = []
+
+
+def register_source(source_cls):
+    """
+    Class decorator adding a source to the discovery aggregator.
+
+    Usage:
+        @register_source
+        class MyBoardSource(JobSource):
+            name = "MyBoard"
+            def search(self, keywords, location, max_results): ...
+    """
+    JOB_SOURCES.append(source_cls())
+    return source_cls
+
+
+def get_source(name: str) -> Optional[JobSource]:
+    for source in JOB_SOURCES:
+        if source.name == name:
+            return source
+    return None
+
+
+@register_source
+class IndeedSource(JobSource):
+    name = "Indeed"
+
+    def search(self, keywords: List[str], location: str, max_results: int) -> List[Dict]:
+        return discover_jobs_from_keywords(keywords, location, max_results=max_results, raise_errors=True)
+
+
+@register_source
+class DuckDuckGoSource(JobSource):
+    name = "DuckDuckGo"
+
+    def search(self, keywords: List[str], location: str, max_results: int) -> List[Dict]:
+        query = f"{' '.join(self.query_keywords(keywords))} developer {location} job"
+        return search_jobs_google_custom(query, num_results=max_results, raise_errors=True)
+
+    def query_keywords(self, keywords: List[str]) -> List[str]:
+        # Only the first two keywords go into the query
+        return keywords[:2]
+
+
+@register_source
+class SavedJobsSource(JobSource):
+    """Full-text search over every posting already in the local job store."""
+
+    name = "Saved"
+    cacheable = False
+
+    def search(self, keywords: List[str], location: str, max_results: int) -> List[Dict]:
+        return get_job_store().search(keywords, location, limit=max_results)
+
+
+# Shared pool: sources that overrun the deadline finish in the background
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="job-source")
+
+
+# Cache keys with a background refresh in flight (avoid refreshing twice)
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def _run_source(source: JobSource, keywords: List[str], location: str, max_results: int,
+                cache: Optional[DiscoveryCache] = None, cache_key: Optional[str] = None) -> List[Dict]:
+    with tracer.span(f"discovery.{source.name}", cache_hit=False) as span:
+        jobs = source.search(keywords, location, max_results)
+        span.set("results", len(jobs))
+
+    if source.cacheable:
+        get_job_store().upsert_listings(jobs)
+    if cache is not None:
+        cache.set(cache_key, source.name, jobs)
+    return jobs
+
+
+def _refresh_in_background(source: JobSource, keywords: List[str], location: str,
+                           max_results: int, cache: DiscoveryCache, cache_key: str):
+    """Stale-while-revalidate: refresh a stale cache entry without blocking the caller."""
+    with _refreshing_lock:
+        if cache_key in _refreshing:
+            return
+        # Checked once the refresh is sure to run, so a half-open trial is never left unreported
+        if not source.breaker.allow():
+            return
+        _refreshing.add(cache_key)
+
+    def refresh():
+        try:
+            _run_source(source, keywords, location, max_results, cache, cache_key)
+            source.breaker.record_success()
+        except Exception as e:
+            source.breaker.record_failure()
+            print(f"Error refreshing {source.name} results: {e}")
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(cache_key)
+
+    _executor.submit(refresh)
+
+
+def stream_jobs(keywords: List[str], location: str = "Remote", deadline: Optional[float] = None,
+                max_results_per_source: int = 5,
+                sources: Optional[List[JobSource]] = None,
+                use_cache: bool = True) -> Iterator[Dict]:
+    """
+    🆕 V4 FEATURE: Query all job sources concurrently and yield results as each one finishes.
+
+    Results are cached per (query keywords, location, source). Fresh entries are
+    returned without a request; stale entries are returned instantly while
+    a background refresh updates the cache.
+
+    Args:
+        keywords (list): Skills to search for
+        location (str): Desired location
+        deadline (float): Overall time budget in seconds (default: DISCOVERY_DEADLINE_SECONDS or 12)
+        max_results_per_source (int): Maximum jobs requested from each source
+        sources (list): Sources to query (default: every registered source)
+        use_cache (bool): Serve and store results through the discovery cache
+
+    Yields:
+        dict: {"source": str, "jobs": list, "error": str or None, "elapsed": float,
+               "cached": "fresh" | "stale" | None}
+    """
+    if deadline is None:
+        deadline = float(os.getenv("DISCOVERY_DEADLINE_SECONDS", "12"))
+
+    cache = get_discovery_cache() if use_cache else None
+    start = time.monotonic()
+    pending = {}
+    immediate = []
+
+    # Start every live fetch first, then hand out what is already known
+    for source in (sources if sources is not None else JOB_SOURCES):
+        use_source_cache = cache is not None and source.cacheable
+        cache_key = (DiscoveryCache.make_key(source.query_keywords(keywords), location, source.name)
+                     if use_source_cache else None)
+        cached = cache.get(cache_key) if use_source_cache else None
+
+        if cached is not None:
+            jobs, freshness = cached
+            with tracer.span(f"discovery.{source.name}", cache_hit=True, freshness=freshness):
+                pass
+            if freshness == "stale":
+                _refresh_in_background(source, keywords, location, max_results_per_source, cache, cache_key)
+            immediate.append({"source": source.name, "jobs": jobs, "error": None,
+                              "elapsed": time.monotonic() - start, "cached": freshness})
+            continue
+
+        if not source.breaker.allow():
+            print(f"⏭️ Skipping {source.name}: circuit open after repeated failures")
+            immediate.append({"source": source.name, "jobs": [], "error": "circuit open",
+                              "elapsed": 0.0, "cached": None})
+            continue
+        future = _executor.submit(_run_source, source, keywords, location, max_results_per_source,
+                                  cache if use_source_cache else None, cache_key)
+        pending[future] = source
+
+    yield from immediate
+
+    while pending:
+        remaining = deadline - (time.monotonic() - start)
+        if remaining <= 0:
+            break
+
+        done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            source = pending.pop(future)
+            elapsed = time.monotonic() - start
+            try:
+                jobs = future.result()
+            except Exception as e:
+                source.breaker.record_failure()
+                yield {"source": source.name, "jobs": [], "error": str(e), "elapsed": elapsed, "cached": None}
+                continue
+
+            source.breaker.record_success()
+            yield {"source": source.name, "jobs": jobs, "error": None, "elapsed": elapsed, "cached": None}
+
+    # Sources still running past the deadline count as failures
+    for future, source in pending.items():
+        future.cancel()
+        source.breaker.record_failure()
+        print(f"⏱️ {source.name} exceeded the {deadline:.0f}s discovery deadline")
+        yield {"source": source.name, "jobs": [], "error": "deadline exceeded",
+               "elapsed": time.monotonic() - start, "cached": None}
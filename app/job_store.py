@@ -0,0 +1,334 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils import calculate_match_score
+from tracing import tracer
+from dedup import NearDuplicateIndex, SIGNATURE_VERSION, jaccard, shingles
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def _fts_query(keywords: List[str]) -> str:
+    """Build an FTS5 query matching any keyword (each one quoted as a phrase)."""
+    phrases = []
+    for keyword in keywords:
+        keyword = " ".join(keyword.replace('"', ' ').split())
+        if keyword:
+            phrases.append(f'"{keyword}"')
+    return " OR ".join(phrases)
+
+
+class JobStore:
+    """
+    Persistent SQLite store of every job posting seen by the app.
+
+    Keeps the discovery listing, the scraped text with its content hash and
+    the `extract_jobs` output per URL, so unchanged postings are never
+    re-extracted. An FTS5 index over title/company/location/snippet/text
+    answers keyword searches without live discovery.
+    """
+
+    def __init__(self, path: str = "cache/jobs.db"):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY,
+                url TEXT UNIQUE NOT NULL,
+                title TEXT,
+                company TEXT,
+                location TEXT,
+                snippet TEXT,
+                source TEXT,
+                content_hash TEXT,
+                scraped_text TEXT,
+                extracted TEXT,
+                signature BLOB,
+                duplicate_of TEXT,
+                first_seen REAL,
+                last_seen REAL,
+                extracted_at REAL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+                title, company, location, snippet, scraped_text,
+                content='jobs', content_rowid='id'
+            );
+            CREATE TRIGGER IF NOT EXISTS jobs_ai AFTER INSERT ON jobs BEGIN
+                INSERT INTO jobs_fts(rowid, title, company, location, snippet, scraped_text)
+                VALUES (new.id, new.title, new.company, new.location, new.snippet, new.scraped_text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS jobs_ad AFTER DELETE ON jobs BEGIN
+                INSERT INTO jobs_fts(jobs_fts, rowid, title, company, location, snippet, scraped_text)
+                VALUES ('delete', old.id, old.title, old.company, old.location, old.snippet, old.scraped_text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS jobs_au AFTER UPDATE ON jobs BEGIN
+                INSERT INTO jobs_fts(jobs_fts, rowid, title, company, location, snippet, scraped_text)
+                VALUES ('delete', old.id, old.title, old.company, old.location, old.snippet, old.scraped_text);
+                INSERT INTO jobs_fts(rowid, title, company, location, snippet, scraped_text)
+                VALUES (new.id, new.title, new.company, new.location, new.snippet, new.scraped_text);
+            END;
+            """
+        )
+        # Stores created before near-duplicate detection lack these columns
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, column_type in (("signature", "BLOB"), ("duplicate_of", "TEXT")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+        # Signatures from an older MinHash family never match new ones: recomputed on first use
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < SIGNATURE_VERSION:
+            self._conn.execute("UPDATE jobs SET signature = NULL")
+            self._conn.execute(f"PRAGMA user_version = {SIGNATURE_VERSION}")
+        self._conn.commit()
+
+        # Full-text MinHash LSH index over extracted postings, built on first use
+        self._dedup_index = None
+
+    @classmethod
+    def from_env(cls) -> "JobStore":
+        return cls(path=os.getenv("JOB_STORE_PATH", "cache/jobs.db"))
+
+    def upsert_listings(self, jobs: List[Dict]) -> int:
+        """
+        Record discovery listings (title, company, location, snippet, source).
+
+        Returns:
+            int: Number of listings stored
+        """
+        now = time.time()
+        rows = [
+            (job['url'], job.get('title', ''), job.get('company', ''), job.get('location', ''),
+             job.get('description_snippet', ''), job.get('source', ''), now, now)
+            for job in jobs if job.get('url')
+        ]
+        with self._lock:
+            self._conn.executemany(
+                """
+                INSERT INTO jobs (url, title, company, location, snippet, source, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    title = excluded.title,
+                    company = excluded.company,
+                    location = excluded.location,
+                    snippet = excluded.snippet,
+                    source = excluded.source,
+                    last_seen = excluded.last_seen
+                """,
+                rows
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def get(self, url: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['extracted'] = json.loads(job['extracted']) if job['extracted'] else None
+        return job
+
+    def _near_duplicates(self) -> NearDuplicateIndex:
+        # Built under the store lock: concurrent first callers share one index, and
+        # a page ingested meanwhile is either in the snapshot or added to this index
+        with self._lock:
+            if self._dedup_index is not None:
+                return self._dedup_index
+
+            index = NearDuplicateIndex()
+            rows = self._conn.execute(
+                "SELECT url, signature, scraped_text FROM jobs WHERE extracted IS NOT NULL "
+                "AND (signature IS NOT NULL OR scraped_text IS NOT NULL)"
+            ).fetchall()
+
+            resigned = []
+            for row in rows:
+                if row['signature'] is not None:
+                    signature = np.frombuffer(row['signature'], dtype=np.uint64)
+                else:
+                    signature = index.hasher.signature(row['scraped_text'])
+                    resigned.append((signature.tobytes(), row['url']))
+                index.add(row['url'], signature=signature)
+
+            if resigned:
+                self._conn.executemany("UPDATE jobs SET signature = ? WHERE url = ?", resigned)
+                self._conn.commit()
+            self._dedup_index = index
+            return index
+
+    def _similarity_to(self, text: str) -> Callable[[str], float]:
+        """Exact Jaccard similarity of `text` with the stored page of a URL, for confirming LSH candidates."""
+        tokens = shingles(text)
+
+        def similarity(url: str) -> float:
+            with self._lock:
+                row = self._conn.execute("SELECT scraped_text FROM jobs WHERE url = ?", (url,)).fetchone()
+            if row is None or not row['scraped_text']:
+                return 0.0
+            return jaccard(tokens, shingles(row['scraped_text']))
+
+        return similarity
+
+    def ingest_page(self, url: str, scraped_text: str, extractor: Callable[[str], Dict],
+                    structured_data: Optional[Dict] = None) -> Tuple[Dict, bool]:
+        """
+        🆕 V4 FEATURE: Incremental ingestion of a scraped posting.
+
+        `extractor` (typically `Chain.extract_jobs`) only runs when the page
+        content hash differs from the stored one and no near-duplicate
+        posting (same job on another URL) has already been extracted.
+        Structured data (ATS API, JSON-LD) is exact, so it is always stored
+        as is instead of a stored or near-duplicate LLM extraction.
+
+        Args:
+            url (str): Job posting URL
+            scraped_text (str): Cleaned page text
+            extractor (callable): Text -> structured job data
+            structured_data (dict): Job data read from the posting itself, if any
+
+        Returns:
+            tuple: (job_data, changed) where `changed` is False when the stored extraction was reused
+        """
+        digest = content_hash(scraped_text)
+        stored = self.get(url)
+
+        if stored and stored['content_hash'] == digest and stored['extracted'] \
+                and (not structured_data or stored['extracted'] == structured_data):
+            with tracer.span("job_store.ingest", cache_hit=True):
+                pass
+            return stored['extracted'], False
+
+        index = self._near_duplicates()
+        signature = index.hasher.signature(scraped_text)
+        duplicate_of = None
+        if not structured_data:
+            duplicate_of = index.query(signature=signature, similarity=self._similarity_to(scraped_text))
+        duplicate = self.get(duplicate_of) if duplicate_of and duplicate_of != url else None
+
+        if structured_data:
+            job_data = structured_data
+        elif duplicate and duplicate['extracted']:
+            job_data = duplicate['extracted']
+            print(f"♻️ {url} is a near-duplicate of {duplicate_of}, reusing its extraction")
+        else:
+            duplicate_of = None
+            job_data = extractor(scraped_text)
+        now = time.time()
+
+        with tracer.span("job_store.ingest", cache_hit=False):
+            with self._lock:
+                self._conn.execute(
+                    """
+                    INSERT INTO jobs (url, title, content_hash, scraped_text, extracted, signature,
+                                      duplicate_of, first_seen, last_seen, extracted_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(url) DO UPDATE SET
+                        content_hash = excluded.content_hash,
+                        scraped_text = excluded.scraped_text,
+                        extracted = excluded.extracted,
+                        signature = excluded.signature,
+                        duplicate_of = excluded.duplicate_of,
+                        last_seen = excluded.last_seen,
+                        extracted_at = excluded.extracted_at
+                    """,
+                    (
+                        url,
+                        job_data.get('role', '') if isinstance(job_data, dict) else '',
+                        digest,
+                        scraped_text,
+                        # Failed extractions ({}) are not stored so they are retried next time
+                        json.dumps(job_data) if job_data else None,
+                        signature.tobytes(),
+                        duplicate_of,
+                        now, now, now
+                    )
+                )
+                self._conn.commit()
+
+        if job_data and not duplicate_of:
+            index.add(url, signature=signature)
+
+        return job_data, True
+
+    def search(self, keywords: List[str], location: Optional[str] = None,
+               limit: int = 20) -> List[Dict]:
+        """
+        🆕 V4 FEATURE: Full-text search over every posting seen so far.
+
+        Args:
+            keywords (list): Skills/keywords (any of them may match)
+            location (str): Optional location filter (substring, "Remote" matches all)
+            limit (int): Maximum results
+
+        Returns:
+            list: Job listings shaped like discovery results, best match first
+        """
+        query = _fts_query(keywords)
+        if not query:
+            return []
+
+        sql = """
+            SELECT jobs.* FROM jobs_fts
+            JOIN jobs ON jobs.id = jobs_fts.rowid
+            WHERE jobs_fts MATCH ?
+        """
+        params = [query]
+        if location and location.strip().lower() != "remote":
+            sql += " AND (jobs.location LIKE ? OR jobs.location LIKE '%remote%')"
+            params.append(f"%{location.strip()}%")
+        sql += " ORDER BY bm25(jobs_fts) LIMIT ?"
+        params.append(limit)
+
+        with tracer.span("job_store.search", keywords=len(keywords)) as span:
+            with self._lock:
+                rows = self._conn.execute(sql, params).fetchall()
+            span.set("results", len(rows))
+
+        results = []
+        for row in rows:
+            snippet = row['snippet'] or (row['scraped_text'] or '')[:200]
+            results.append({
+                "title": row['title'] or '',
+                "company": row['company'] or '',
+                "location": row['location'] or '',
+                "description_snippet": snippet[:200],
+                "url": row['url'],
+                "match_score": calculate_match_score(f"{row['title']} {snippet}", keywords),
+                "source": row['source'] or "Saved",
+            })
+
+        results.sort(key=lambda x: x['match_score'], reverse=True)
+        return results
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+
+def get_job_store() -> JobStore:
+    """Process-wide job store (shared by every Streamlit session)."""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = JobStore.from_env()
+        return _shared_store
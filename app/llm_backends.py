@@ -0,0 +1,429 @@
+import os
+import json
+import time
+import random
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.callbacks import BaseCallbackHandler
+from pydantic import PrivateAttr
+
+
+DEFAULT_MODEL = "llama-3.1-8b-instant"
+
+
+class LLMBackend:
+    """
+    Factory for the chat models used by `Chain`.
+
+    A backend only has to build a LangChain chat model for a given
+    temperature/model pair; `Chain` composes it with its prompts.
+    """
+
+    name = "base"
+    # RateLimitScheduler shared by every client of this backend (None = unlimited)
+    scheduler = None
+    # LangChain callback handlers attached to every client the backend creates
+    callbacks = None
+
+    def create_llm(self, temperature: float = 0, model: str = DEFAULT_MODEL,
+                   timeout: Optional[float] = None) -> BaseChatModel:
+        raise NotImplementedError
+
+    def warm_up(self):
+        """Open the backend's connections ahead of the first request (no-op by default)."""
+
+    @property
+    def identity(self) -> Tuple:
+        """Backends with the same identity give the same answers (by default: this instance only)."""
+        return (self.name, id(self))
+
+
+class GroqBackend(LLMBackend):
+    """
+    Production backend talking to the Groq API.
+
+    All clients share one sync and one async HTTP connection pool whose
+    responses feed the rate-limit headers to the shared scheduler. Async
+    calls are all sent from the LLM loop (see llm_loop), so the async pool is
+    never used across event loops. Retries are left to the scheduler, so the
+    Groq SDK's own retry loop is disabled.
+    """
+
+    name = "groq"
+
+    def __init__(self, groq_api_key: str, scheduler=None, callbacks: Optional[List[BaseCallbackHandler]] = None):
+        import httpx
+        from rate_limiter import get_scheduler
+
+        self.groq_api_key = groq_api_key
+        self.scheduler = scheduler or get_scheduler()
+        self.callbacks = callbacks
+        self.http_client = httpx.Client(event_hooks={"response": [self.scheduler.observe_response]})
+        self.http_async_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=None, max_keepalive_connections=100),
+            event_hooks={"response": [self._aobserve_response]}
+        )
+
+    @property
+    def identity(self) -> Tuple:
+        # Sessions using the same API key share results; the key itself is not kept in the tuple
+        return (self.name, hashlib.sha256(self.groq_api_key.encode("utf-8")).hexdigest()[:16])
+
+    async def _aobserve_response(self, response):
+        self.scheduler.observe_response(response)
+
+    def warm_up(self):
+        """
+        TLS handshake with the API on both pools, so the first LLM call reuses an open connection.
+
+        Lists the models (no tokens used); the connections stay in the pools.
+        """
+        from llm_loop import run_sync
+
+        url = f"{os.getenv('GROQ_API_BASE', 'https://api.groq.com').rstrip('/')}/openai/v1/models"
+        headers = {"Authorization": f"Bearer {self.groq_api_key}"}
+        self.http_client.get(url, headers=headers, timeout=10).raise_for_status()
+
+        async def warm_async_pool():
+            response = await self.http_async_client.get(url, headers=headers, timeout=10)
+            response.raise_for_status()
+
+        run_sync(warm_async_pool())
+
+    def create_llm(self, temperature: float = 0, model: str = DEFAULT_MODEL,
+                   timeout: Optional[float] = None) -> BaseChatModel:
+        from langchain_groq import ChatGroq
+        return ChatGroq(
+            temperature=temperature,
+            groq_api_key=self.groq_api_key,
+            model=model,
+            max_retries=0,
+            request_timeout=timeout,
+            http_client=self.http_client,
+            http_async_client=self.http_async_client,
+            callbacks=self.callbacks
+        )
+
+
+class FakeLLMError(RuntimeError):
+    """Injected failure raised by `FakeChatModel` to simulate API errors."""
+
+
+class FakeRateLimitError(FakeLLMError):
+    """Injected HTTP 429, handled by the rate-limit scheduler like a Groq 429."""
+
+    status_code = 429
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class FakeTimeoutError(FakeLLMError, TimeoutError):
+    """Raised when the sampled latency exceeds the client timeout."""
+
+
+# Vocabulary used to build schema-valid fake outputs
+_FAKE_SKILLS = [
+    "Python", "JavaScript", "TypeScript", "React", "Node.js", "Django", "FastAPI",
+    "AWS", "Docker", "Kubernetes", "PostgreSQL", "MongoDB", "Machine Learning",
+    "TensorFlow", "PyTorch", "Java", "Spring", "Go", "Terraform", "GraphQL"
+]
+_FAKE_VALUES = ["Innovation", "Quality", "Customer Focus", "Ownership", "Transparency", "Speed"]
+_FAKE_TRAITS = ["Collaborative", "Fast-paced", "Professional", "Remote-friendly", "Data-driven"]
+_FAKE_TONES = ["formal", "technical", "creative", "corporate", "marketing"]
+_FAKE_WORDS = (
+    "we help teams ship reliable software faster by combining proven engineering "
+    "practices with modern cloud tooling and a pragmatic focus on measurable business "
+    "outcomes for every client engagement"
+).split()
+
+
+def _prompt_text(messages: List[BaseMessage]) -> str:
+    return "\n".join(str(m.content) for m in messages)
+
+
+def _prompt_key(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def _estimate_tokens(text: str) -> int:
+    # Rough approximation (~4 characters per token), good enough for load tests
+    return max(1, len(text) // 4)
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic offline stand-in for `ChatGroq`.
+
+    Responses are replayed from recordings when the prompt was seen before,
+    otherwise a schema-valid answer is generated from the prompt itself.
+    The same prompt and seed always produce the same content; latency and
+    error injection follow the configured distribution.
+    """
+
+    model_name: str = DEFAULT_MODEL
+    temperature: float = 0
+    seed: int = 42
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    latency_distribution: str = "constant"  # constant | uniform | normal | lognormal
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    timeout: Optional[float] = None
+    recordings: Dict[str, str] = {}
+
+    _rng: Any = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._rng = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name, "seed": self.seed}
+
+    def sample_latency(self) -> float:
+        """Return the simulated latency for one call, in seconds."""
+        mean = self.latency_ms
+        jitter = self.latency_jitter_ms
+
+        if self.latency_distribution == "uniform":
+            value = self._rng.uniform(mean - jitter, mean + jitter)
+        elif self.latency_distribution == "normal":
+            value = self._rng.gauss(mean, jitter)
+        elif self.latency_distribution == "lognormal":
+            sigma = (jitter / mean) if mean > 0 else 0.0
+            value = mean * self._rng.lognormvariate(0, sigma)
+        else:
+            value = mean
+
+        return max(value, 0.0) / 1000.0
+
+    def _effective_latency(self) -> float:
+        """Sampled latency, capped at the timeout (the call then fails with FakeTimeoutError)."""
+        latency = self.sample_latency()
+        if self.timeout is not None and latency > self.timeout:
+            return self.timeout
+        return latency
+
+    def _check_timeout(self, latency: float) -> None:
+        if self.timeout is not None and latency >= self.timeout:
+            raise FakeTimeoutError(f"Simulated timeout after {self.timeout}s (fake backend)")
+
+    def _maybe_fail(self) -> None:
+        if self.rate_limit_rate > 0 and self._rng.random() < self.rate_limit_rate:
+            raise FakeRateLimitError("Simulated 429 rate limit (fake backend)", retry_after=0.05)
+        if self.error_rate > 0 and self._rng.random() < self.error_rate:
+            raise FakeLLMError("Simulated LLM failure (fake backend error injection)")
+
+    def _respond(self, prompt: str) -> str:
+        key = _prompt_key(prompt)
+        if key in self.recordings:
+            return self.recordings[key]
+
+        rng = random.Random(f"{self.seed}:{key}")
+        return _generate_fake_response(prompt, rng)
+
+    def _build_result(self, prompt: str, content: str) -> ChatResult:
+        usage = {
+            "input_tokens": _estimate_tokens(prompt),
+            "output_tokens": _estimate_tokens(content),
+        }
+        usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+
+        message = AIMessage(
+            content=content,
+            usage_metadata=usage,
+            response_metadata={
+                "model_name": self.model_name,
+                "token_usage": {
+                    "prompt_tokens": usage["input_tokens"],
+                    "completion_tokens": usage["output_tokens"],
+                    "total_tokens": usage["total_tokens"],
+                },
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        prompt = _prompt_text(messages)
+        latency = self._effective_latency()
+        time.sleep(latency)
+        self._check_timeout(latency)
+        self._maybe_fail()
+        return self._build_result(prompt, self._respond(prompt))
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager=None, **kwargs: Any) -> ChatResult:
+        import asyncio
+
+        prompt = _prompt_text(messages)
+        latency = self._effective_latency()
+        await asyncio.sleep(latency)
+        self._check_timeout(latency)
+        self._maybe_fail()
+        return self._build_result(prompt, self._respond(prompt))
+
+
+def _fake_email(rng: random.Random, words: int) -> str:
+    body = " ".join(rng.choice(_FAKE_WORDS) for _ in range(words))
+    return f"Hi,\n\n{body.capitalize()}.\n\nBest regards"
+
+
+def _generate_fake_response(prompt: str, rng: random.Random) -> str:
+    """Build a plausible response matching the output format each `Chain` prompt expects."""
+    if "### SCRAPED TEXT FROM WEBSITE" in prompt:
+        prompt_lower = prompt.lower()
+        skills = [s for s in _FAKE_SKILLS if s.lower() in prompt_lower][:6]
+        if not skills:
+            skills = rng.sample(_FAKE_SKILLS, 4)
+        return json.dumps({
+            "role": f"{skills[0]} Engineer",
+            "experience": f"{rng.randint(1, 8)}+ years",
+            "skills": skills,
+            "description": " ".join(rng.choice(_FAKE_WORDS) for _ in range(40)),
+        })
+
+    if "### TONE (ONE WORD)" in prompt:
+        return rng.choice(_FAKE_TONES)
+
+    if "### COMPANY NAME" in prompt:
+        return json.dumps({
+            "key_values": rng.sample(_FAKE_VALUES, 3),
+            "recent_focus": "Expanding technical capabilities across its product lines.",
+            "culture_traits": rng.sample(_FAKE_TRAITS, 3),
+            "tech_stack": rng.sample(_FAKE_SKILLS, 4),
+        })
+
+    if "### EMAIL TO ANALYZE" in prompt:
+        metrics = {
+            "relevance": rng.randint(15, 25),
+            "clarity": rng.randint(15, 25),
+            "personalization": rng.randint(12, 25),
+            "call_to_action": rng.randint(12, 25),
+        }
+        return json.dumps({
+            "success_score": sum(metrics.values()),
+            "strengths": ["Clear communication", "Relevant portfolio links"],
+            "improvements": ["Add a concrete metric", "Strengthen CTA"],
+            "key_metrics": metrics,
+        })
+
+    if "### ORIGINAL EMAIL" in prompt:
+        return json.dumps({
+            "subject": "Following up on my previous note",
+            "email": _fake_email(rng, 110),
+        })
+
+    return _fake_email(rng, 220)
+
+
+class FakeBackend(LLMBackend):
+    """
+    Offline backend for benchmarks and load tests (no network, no API key).
+
+    Args:
+        seed (int): Seed for deterministic content, latency and errors
+        latency_ms (float): Mean simulated latency per call
+        latency_jitter_ms (float): Spread of the latency distribution
+        latency_distribution (str): constant, uniform, normal or lognormal
+        error_rate (float): Probability (0-1) that a call raises FakeLLMError
+        rate_limit_rate (float): Probability (0-1) that a call raises FakeRateLimitError (429)
+        recordings_path (str): Optional JSONL file of recorded prompt/response pairs
+    """
+
+    name = "fake"
+
+    def __init__(self, seed: int = 42, latency_ms: float = 0.0, latency_jitter_ms: float = 0.0,
+                 latency_distribution: str = "constant", error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, recordings_path: Optional[str] = None,
+                 scheduler=None):
+        self.seed = seed
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.latency_distribution = latency_distribution
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.scheduler = scheduler
+        self.recordings = load_recordings(recordings_path) if recordings_path else {}
+        self._instances = 0
+
+    @classmethod
+    def from_env(cls) -> "FakeBackend":
+        """Build a fake backend from FAKE_LLM_* environment variables."""
+        return cls(
+            seed=int(os.getenv("FAKE_LLM_SEED", "42")),
+            latency_ms=float(os.getenv("FAKE_LLM_LATENCY_MS", "0")),
+            latency_jitter_ms=float(os.getenv("FAKE_LLM_LATENCY_JITTER_MS", "0")),
+            latency_distribution=os.getenv("FAKE_LLM_LATENCY_DISTRIBUTION", "constant"),
+            error_rate=float(os.getenv("FAKE_LLM_ERROR_RATE", "0")),
+            rate_limit_rate=float(os.getenv("FAKE_LLM_RATE_LIMIT_RATE", "0")),
+            recordings_path=os.getenv("FAKE_LLM_RECORDINGS") or None,
+        )
+
+    def create_llm(self, temperature: float = 0, model: str = DEFAULT_MODEL,
+                   timeout: Optional[float] = None) -> BaseChatModel:
+        # Offset the seed per instance so two clients don't share one latency/error sequence
+        self._instances += 1
+        return FakeChatModel(
+            model_name=model,
+            temperature=temperature,
+            seed=self.seed + self._instances - 1,
+            latency_ms=self.latency_ms,
+            latency_jitter_ms=self.latency_jitter_ms,
+            latency_distribution=self.latency_distribution,
+            error_rate=self.error_rate,
+            rate_limit_rate=self.rate_limit_rate,
+            timeout=timeout,
+            recordings=self.recordings,
+        )
+
+
+def load_recordings(path: str) -> Dict[str, str]:
+    """
+    Load recorded responses from a JSONL file.
+
+    Each line is {"prompt": str, "response": str}; entries are keyed by prompt hash.
+    """
+    recordings = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            recordings[_prompt_key(entry["prompt"])] = entry["response"]
+    return recordings
+
+
+class RecordingCallbackHandler(BaseCallbackHandler):
+    """
+    Append every prompt/response pair of a real backend to a JSONL file,
+    so it can be replayed later by `FakeBackend(recordings_path=...)`.
+
+    Usage: Chain(backend=GroqBackend(api_key, callbacks=[RecordingCallbackHandler(path)]))
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._prompts = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._prompts[run_id] = _prompt_text(messages[0])
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        prompt = self._prompts.pop(run_id, None)
+        if prompt is None:
+            return
+        content = response.generations[0][0].text
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"prompt": prompt, "response": content}) + "\n")
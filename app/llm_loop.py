@@ -0,0 +1,68 @@
+import asyncio
+import threading
+import contextvars
+import concurrent.futures
+from typing import Awaitable, Coroutine
+
+_loop = None
+_loop_thread = None
+_loop_lock = threading.Lock()
+
+
+def get_llm_loop() -> asyncio.AbstractEventLoop:
+    """
+    Process-wide event loop for LLM calls, running in a daemon thread.
+
+    Every LLM request is sent from this loop, so one async HTTP client (and
+    its connection pool) serves all callers: Streamlit sessions, background
+    workers and the API server.
+    """
+    global _loop, _loop_thread
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(target=loop.run_forever, name="llm-loop", daemon=True)
+            _loop_thread.start()
+            _loop = loop
+        return _loop
+
+
+def submit(coro: Coroutine) -> concurrent.futures.Future:
+    """Schedule `coro` on the LLM loop with the caller's context (tracing spans, call priority)."""
+    loop = get_llm_loop()
+    context = contextvars.copy_context()
+    future = concurrent.futures.Future()
+
+    def on_done(task: asyncio.Task):
+        if task.cancelled():
+            future.set_exception(concurrent.futures.CancelledError())
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+
+    def start():
+        if not future.set_running_or_notify_cancel():
+            coro.close()
+            return
+        loop.create_task(coro, context=context).add_done_callback(on_done)
+
+    loop.call_soon_threadsafe(start)
+    return future
+
+
+def run_sync(coro: Coroutine):
+    """Run `coro` on the LLM loop and block until it finishes (for synchronous callers)."""
+    if threading.current_thread() is _loop_thread:
+        coro.close()
+        raise RuntimeError("run_sync() called from the LLM loop; await the coroutine instead")
+    return submit(coro).result()
+
+
+async def run_on_llm_loop(coro: Awaitable):
+    """Await `coro` on the LLM loop from any event loop."""
+    loop = get_llm_loop()
+    if asyncio.get_running_loop() is loop:
+        return await coro
+    return await asyncio.wrap_future(submit(coro))
+
@@ -1,22 +1,313 @@
 import streamlit as st
-from langchain_community.document_loaders import WebBaseLoader
 from chains import Chain
-from portfolio import Portfolio
+from portfolio_registry import get_portfolio_registry
 from utils import (
     clean_text,
-    scrape_job_page,
     discover_jobs_from_keywords,
     extract_company_name_from_url,
     format_email_for_download,
-    fetch_job_boards_aggregate
+    dedupe_jobs
 )
+from job_sources import stream_jobs, get_source
+from matching import rank_jobs
+from job_store import get_job_store
+from structured_jobs import ingest_job_url
+from tracing import tracer
+from single_flight import single_flight_stats
+from task_queue import get_task_queue, start_workers, ACTIVE_STATUSES, DONE, CANCELLED
+from warmup import start_warmup, readiness
+import campaigns  # noqa: F401  (registers the "campaign" task)
 import time
 import os
 
 
 def health_check():
-    """Health check endpoint for Docker."""
-    return {"status": "healthy", "timestamp": time.time()}
+    """
+    Health check endpoint for Docker.
+    
+    🆕 V4: "ready" stays False until the startup warm-up has finished, so
+    traffic is only routed to warm instances.
+    """
+    state = readiness()
+    return {"status": "healthy", "ready": state["ready"], "readiness": state, "timestamp": time.time()}
+
+def render_diagnostics_panel(llm):
+    """Sidebar panel with per-stage latency, token and cache statistics from the tracer."""
+    with st.sidebar.expander("🩺 Diagnostics", expanded=False):
+        summary = tracer.summary()
+        if not summary:
+            st.caption("No traced operations yet.")
+            return
+        
+        st.markdown("**Per-stage latency (sorted by p95)**")
+        st.dataframe(summary, use_container_width=True, hide_index=True)
+        
+        total_prompt = sum(row['prompt_tokens'] for row in summary)
+        total_completion = sum(row['completion_tokens'] for row in summary)
+        st.caption(f"Tokens: {total_prompt} prompt / {total_completion} completion")
+        
+        bytes_saved = sum(row['bytes_saved'] for row in summary)
+        if bytes_saved:
+            st.caption(f"Page downloads: {bytes_saved / 1024:.0f} KB skipped by size caps and early stops")
+        
+        route_metrics = llm.router.metrics()
+        if route_metrics:
+            st.markdown("**Model routes**")
+            st.dataframe(route_metrics, use_container_width=True, hide_index=True)
+            st.caption(f"Estimated cost: ${sum(row['cost_usd'] for row in route_metrics):.4f}")
+        
+        coalescing = [row for row in single_flight_stats() if row['calls']]
+        if coalescing:
+            st.markdown("**Coalesced requests**")
+            st.dataframe(coalescing, use_container_width=True, hide_index=True)
+        
+        st.markdown("**Recent spans**")
+        st.dataframe(
+            [
+                {
+                    "stage": span['name'],
+                    "ms": round(span['duration_ms'], 1),
+                    "status": span['status'],
+                    "attributes": str(span['attributes'])
+                }
+                for span in tracer.recent(20)
+            ],
+            use_container_width=True,
+            hide_index=True
+        )
+        
+        if st.button("Reset diagnostics"):
+            tracer.reset()
+
+def render_campaign(result, key):
+    """Render a finished campaign (strategies, scores, follow-ups) returned by `run_campaign`."""
+    job = result['job']
+    job_data = result['job_data']
+    detected_tone = result['tone']
+    
+    tone_emoji = {
+        'formal': '🎩',
+        'technical': '💻',
+        'creative': '🎨',
+        'corporate': '🏢',
+        'marketing': '📢'
+    }
+    
+    st.markdown(f"""
+    <div style="text-align: center; margin: 1.5rem 0;">
+        <span class="tone-badge-modern tone-{detected_tone}">
+            <span>{tone_emoji.get(detected_tone, '✨')}</span>
+            <span>Communication Style: {detected_tone.upper()}</span>
+        </span>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Display email strategies
+    tab1, tab2, tab3 = st.tabs(["💼 Value Focus", "🔧 Solution Approach", "📖 Story Method"])
+    
+    strategies = [
+        ("value_proposition", tab1, "Value Proposition", "ROI-focused approach"),
+        ("problem_solution", tab2, "Problem-Solution", "Pain point resolution"),
+        ("storytelling", tab3, "Storytelling", "Narrative engagement")
+    ]
+    
+    for strategy_key, tab, title, description in strategies:
+        with tab:
+            email = result['variations'][strategy_key]
+            analysis = result['analyses'][strategy_key]
+            score = analysis.get('success_score', 75)
+            
+            st.markdown(f"**{title}** • *{description}*")
+            
+            # Score visualization
+            score_class = "score-excellent" if score >= 80 else "score-good" if score >= 70 else "score-fair" if score >= 60 else "score-poor"
+            
+            st.markdown(f"""
+            <div class="score-display">
+                <div class="score-circle {score_class}">
+                    {score}
+                </div>
+                <div style="color: #64748b; font-weight: 600;">Success Prediction Score</div>
+            </div>
+            """, unsafe_allow_html=True)
+            
+            # Metrics
+            with st.expander("📊 Detailed Breakdown"):
+                metrics = analysis.get('key_metrics', {})
+                
+                mcol1, mcol2, mcol3, mcol4 = st.columns(4)
+                
+                metric_items = [
+                    (mcol1, "Relevance", metrics.get('relevance', 0)),
+                    (mcol2, "Clarity", metrics.get('clarity', 0)),
+                    (mcol3, "Personal", metrics.get('personalization', 0)),
+                    (mcol4, "CTA", metrics.get('call_to_action', 0))
+                ]
+                
+                for col, label, value in metric_items:
+                    with col:
+                        st.metric(label, f"{value}/25")
+                
+                st.markdown("**✅ Strengths:**")
+                for strength in analysis.get('strengths', []):
+                    st.markdown(f"• {strength}")
+                
+                st.markdown("**💡 Optimization Tips:**")
+                for improvement in analysis.get('improvements', []):
+                    st.markdown(f"• {improvement}")
+            
+            # Email content
+            st.markdown("**📧 Generated Email:**")
+            st.code(email, language='markdown')
+            
+            # Download
+            metadata = {
+                'role': job_data.get('role', 'N/A'),
+                'company': job['company'],
+                'tone': detected_tone,
+                'success_score': score,
+                'strategy': title
+            }
+            formatted_email = format_email_for_download(email, metadata)
+            
+            st.download_button(
+                label=f"📥 Download {title}",
+                data=formatted_email,
+                file_name=f"{job['company']}_{strategy_key}.txt",
+                mime="text/plain",
+                key=f"download_{key}_{strategy_key}"
+            )
+    
+    # Follow-up Sequence
+    st.markdown('<div class="section-header"><span class="section-icon">🔄</span><h2>Follow-up Campaign</h2></div>', unsafe_allow_html=True)
+    st.caption("*Automated sequence based on best-performing strategy*")
+    
+    st.markdown('<div class="timeline-container"></div>', unsafe_allow_html=True)
+    
+    fcol1, fcol2, fcol3 = st.columns(3)
+    
+    for col, followup in zip([fcol1, fcol2, fcol3], result['followups']):
+        with col:
+            day = followup.get('day', 0)
+            st.markdown(f"""
+            <div class="strategy-card">
+                <div style="font-size: 1.5rem; margin-bottom: 0.5rem;">📅</div>
+                <div style="font-weight: 700; color: #1e293b; margin-bottom: 0.5rem;">Day {day}</div>
+                <div style="color: #64748b; font-size: 0.9rem;">{followup.get('subject', 'N/A')[:50]}...</div>
+            </div>
+            """, unsafe_allow_html=True)
+            
+            with st.expander("View Email"):
+                st.code(followup.get('email', 'N/A'), language='markdown')
+                
+                st.download_button(
+                    label="📥 Download",
+                    data=followup.get('email', ''),
+                    file_name=f"{job['company']}_followup_day{day}.txt",
+                    mime="text/plain",
+                    key=f"followup_{key}_{day}"
+                )
+
+
+@st.fragment(run_every=2)
+def render_campaign_progress(task_ids):
+    """Live progress of queued/running campaigns; only this fragment reruns while polling."""
+    queue = get_task_queue()
+    still_active = False
+    
+    for task_id in task_ids:
+        task = queue.get(task_id)
+        if task is None or task['status'] not in ACTIVE_STATUSES:
+            continue
+        still_active = True
+        
+        job = task['payload']['job']
+        col1, col2 = st.columns([8, 2])
+        with col1:
+            label = task['stage'] or "Waiting for a worker..."
+            if task['cancel_requested']:
+                label = "Cancelling..."
+            st.progress(task['progress'], text=f"🔄 {job['title']} at {job['company']}: {label}")
+        with col2:
+            if st.button("🛑 Cancel", key=f"cancel_{task_id}", disabled=task['cancel_requested']):
+                queue.cancel(task_id)
+    
+    # Everything finished: rerun the whole page to render the results
+    if not still_active:
+        st.rerun()
+
+
+def render_portfolio_fit(portfolio, tasks):
+    """
+    🆕 V4 FEATURE: Skill match of every finished campaign, from one batched
+    jobs x projects similarity computation.
+    """
+    done = [task for task in tasks if task['status'] == DONE]
+    if len(done) < 2:
+        return
+    
+    matches = portfolio.match_jobs([task['result']['job_data'].get('skills', []) for task in done])
+    rows = []
+    for task, match in zip(done, matches):
+        best = match['links'][0][0]['link'] if match['links'][0] else ""
+        rows.append({
+            "Company": task['payload']['job']['company'],
+            "Match %": match['match_percentage'],
+            "Similarity": match['similarities'][0] if match['similarities'] else 0.0,
+            "Missing skills": ", ".join(match['missing_skills'][:5]),
+            "Best project": best,
+        })
+    
+    st.markdown('<div class="section-header"><span class="section-icon">🎯</span><h2>Portfolio Fit</h2></div>', unsafe_allow_html=True)
+    st.dataframe(rows, use_container_width=True, hide_index=True)
+
+
+def render_campaign_tasks(portfolio=None):
+    """
+    🆕 V4 FEATURE: Campaigns submitted in this session (kept in the URL, so a
+    browser refresh or app restart picks them up again).
+    """
+    if 'campaign_tasks' not in st.session_state and st.query_params.get('campaigns'):
+        st.session_state['campaign_tasks'] = st.query_params['campaigns'].split(",")
+    
+    task_ids = st.session_state.get('campaign_tasks', [])
+    if not task_ids:
+        return
+    
+    queue = get_task_queue()
+    tasks = [task for task in (queue.get(task_id) for task_id in task_ids) if task]
+    
+    active_ids = [task['id'] for task in tasks if task['status'] in ACTIVE_STATUSES]
+    if active_ids:
+        render_campaign_progress(active_ids)
+    
+    if portfolio is not None:
+        render_portfolio_fit(portfolio, tasks)
+    
+    for task in tasks:
+        if task['status'] in ACTIVE_STATUSES:
+            continue
+        job = task['payload']['job']
+        
+        st.markdown('<div class="section-header"><span class="section-icon">📧</span><h2>Email Campaign</h2></div>', unsafe_allow_html=True)
+        st.markdown(f"**Company:** {job['company']}")
+        
+        job_url = job.get('url', '')
+        if job_url:
+            st.markdown(f"**Position Link:** [{job_url}]({job_url})")
+        
+        if task['status'] == DONE:
+            render_campaign(task['result'], task['id'][:8])
+        elif task['status'] == CANCELLED:
+            st.info("🛑 Campaign cancelled")
+        else:
+            st.error(f"❌ Error processing {job['company']}: {task['error']}")
+    
+    if len(active_ids) < len(tasks) and st.button("🧹 Clear finished campaigns"):
+        st.session_state['campaign_tasks'] = active_ids
+        st.query_params['campaigns'] = ",".join(active_ids)
+        st.rerun()
+
 
 def create_streamlit_app(llm, portfolio, clean_text):
     # ========== PROFESSIONAL AI-POWERED UI STYLES ==========
@@ -577,12 +868,38 @@ def create_streamlit_app(llm, portfolio, clean_text):
         with col2:
             location_input = st.text_input("Location", value="Remote")
         
+        saved_only = st.toggle(
+            f"💾 Search saved jobs only ({get_job_store().count()} seen so far)",
+            value=False,
+            help="Full-text search over previously discovered postings, without contacting job boards"
+        )
+        
         discover_button = st.button("🚀 Discover Opportunities", type="primary", use_container_width=True)
         
         if discover_button and search_input:
             with st.spinner("🔍 AI analyzing job market..."):
                 keywords = [k.strip() for k in search_input.split(',') if k.strip()]
-                jobs = fetch_job_boards_aggregate(keywords, location_input)
+                
+                # Sources run concurrently; report each one as soon as it finishes
+                source_status = st.empty()
+                jobs = []
+                sources = [get_source("Saved")] if saved_only else None
+                for result in stream_jobs(keywords, location_input, sources=sources):
+                    jobs = dedupe_jobs(jobs + result['jobs'])
+                    if result['error']:
+                        source_status.warning(f"⚠️ {result['source']} skipped ({result['error']})")
+                    elif result.get('cached'):
+                        source_status.info(
+                            f"⚡ {result['source']}: {len(result['jobs'])} cached results "
+                            f"({result['cached']}) ({len(jobs)} unique so far)"
+                        )
+                    else:
+                        source_status.info(
+                            f"📡 {result['source']}: {len(result['jobs'])} results "
+                            f"in {result['elapsed']:.1f}s ({len(jobs)} unique so far)"
+                        )
+                source_status.empty()
+                jobs = rank_jobs(jobs, keywords, portfolio=portfolio)
                 
                 if jobs:
                     st.success(f"✅ Discovered {len(jobs)} matching opportunities")
@@ -634,202 +951,13 @@ def create_streamlit_app(llm, portfolio, clean_text):
                 st.info(f"✅ {len(selected_jobs)} opportunity selected")
                 
                 if st.button("✨ Generate Email Campaigns", type="primary", use_container_width=True):
-                    for idx, job in selected_jobs:
-                        st.markdown('<div class="section-header"><span class="section-icon">📧</span><h2>Email Campaign</h2></div>', unsafe_allow_html=True)
-                        st.markdown(f"**Company:** {job['company']}")
-
-                        job_url = job.get('url', '')
-                        if job_url:
-                            st.markdown(f"**Position Link:** [{job_url}]({job_url})")
-
-                        with st.spinner(f"🔄 Generating campaign for {job['title']}..."):
-                            try:
-                                # Scrape job details
-                                if job.get('url'):
-                                    job_content = scrape_job_page(job['url'])
-                                    if job_content:
-                                        job_data = llm.extract_jobs(job_content)
-                                    else:
-                                        job_data = {
-                                            'role': job['title'],
-                                            'experience': 'Not specified',
-                                            'skills': [],
-                                            'description': job.get('description_snippet', '')
-                                        }
-                                else:
-                                    job_data = {
-                                        'role': job['title'],
-                                        'experience': 'Not specified',
-                                        'skills': [],
-                                        'description': job.get('description_snippet', '')
-                                    }
-                                
-                                # Company Research
-                                with st.spinner("🏢 Analyzing company..."):
-                                    company_intel = llm.research_company(
-                                        job['company'],
-                                        job_data.get('description', '')
-                                    )
-                                
-                          
-                                
-                                # Detect Tone
-                                detected_tone = llm.detect_style(job_data.get('description', ''))
-                                
-                                tone_emoji = {
-                                    'formal': '🎩',
-                                    'technical': '💻',
-                                    'creative': '🎨',
-                                    'corporate': '🏢',
-                                    'marketing': '📢'
-                                }
-                                
-                                st.markdown(f"""
-                                <div style="text-align: center; margin: 1.5rem 0;">
-                                    <span class="tone-badge-modern tone-{detected_tone}">
-                                        <span>{tone_emoji.get(detected_tone, '✨')}</span>
-                                        <span>Communication Style: {detected_tone.upper()}</span>
-                                    </span>
-                                </div>
-                                """, unsafe_allow_html=True)
-                                
-                                # Portfolio Matching
-                                skills = job_data.get('skills', [])
-                                links = portfolio.query_links(str(skills))
-                                
-                                # Generate 3 Email Strategies
-                                with st.spinner("✍️ Crafting email strategies..."):
-                                    email_variations = llm.generate_email_variations(
-                                        job_data, 
-                                        links, 
-                                        detected_tone,
-                                        company_intel
-                                    )
-                                
-                                # Display email strategies
-                                tab1, tab2, tab3 = st.tabs(["💼 Value Focus", "🔧 Solution Approach", "📖 Story Method"])
-                                
-                                strategies = [
-                                    ("value_proposition", tab1, "Value Proposition", "ROI-focused approach"),
-                                    ("problem_solution", tab2, "Problem-Solution", "Pain point resolution"),
-                                    ("storytelling", tab3, "Storytelling", "Narrative engagement")
-                                ]
-                                
-                                best_email = None
-                                best_score = 0
-                                
-                                for strategy_key, tab, title, description in strategies:
-                                    with tab:
-                                        email = email_variations[strategy_key]
-                                        
-                                        st.markdown(f"**{title}** • *{description}*")
-                                        
-                                        # Analyze effectiveness
-                                        analysis = llm.analyze_email_effectiveness(email, job_data)
-                                        score = analysis.get('success_score', 75)
-                                        
-                                        if score > best_score:
-                                            best_score = score
-                                            best_email = email
-                                        
-                                        # Score visualization
-                                        score_class = "score-excellent" if score >= 80 else "score-good" if score >= 70 else "score-fair" if score >= 60 else "score-poor"
-                                        
-                                        st.markdown(f"""
-                                        <div class="score-display">
-                                            <div class="score-circle {score_class}">
-                                                {score}
-                                            </div>
-                                            <div style="color: #64748b; font-weight: 600;">Success Prediction Score</div>
-                                        </div>
-                                        """, unsafe_allow_html=True)
-                                        
-                                        # Metrics
-                                        with st.expander("📊 Detailed Breakdown"):
-                                            metrics = analysis.get('key_metrics', {})
-                                            
-                                            mcol1, mcol2, mcol3, mcol4 = st.columns(4)
-                                            
-                                            metric_items = [
-                                                (mcol1, "Relevance", metrics.get('relevance', 0)),
-                                                (mcol2, "Clarity", metrics.get('clarity', 0)),
-                                                (mcol3, "Personal", metrics.get('personalization', 0)),
-                                                (mcol4, "CTA", metrics.get('call_to_action', 0))
-                                            ]
-                                            
-                                            for col, label, value in metric_items:
-                                                with col:
-                                                    st.metric(label, f"{value}/25")
-                                            
-                                            st.markdown("**✅ Strengths:**")
-                                            for strength in analysis.get('strengths', []):
-                                                st.markdown(f"• {strength}")
-                                            
-                                            st.markdown("**💡 Optimization Tips:**")
-                                            for improvement in analysis.get('improvements', []):
-                                                st.markdown(f"• {improvement}")
-                                        
-                                        # Email content
-                                        st.markdown("**📧 Generated Email:**")
-                                        st.code(email, language='markdown')
-                                        
-                                        # Download
-                                        metadata = {
-                                            'role': job_data.get('role', 'N/A'),
-                                            'company': job['company'],
-                                            'tone': detected_tone,
-                                            'success_score': score,
-                                            'strategy': title
-                                        }
-                                        formatted_email = format_email_for_download(email, metadata)
-                                        
-                                        st.download_button(
-                                            label=f"📥 Download {title}",
-                                            data=formatted_email,
-                                            file_name=f"{job['company']}_{strategy_key}.txt",
-                                            mime="text/plain",
-                                            key=f"download_{idx}_{strategy_key}"
-                                        )
-                                
-                                # Follow-up Sequence
-                                st.markdown('<div class="section-header"><span class="section-icon">🔄</span><h2>Follow-up Campaign</h2></div>', unsafe_allow_html=True)
-                                st.caption("*Automated sequence based on best-performing strategy*")
-                                
-                                with st.spinner("Generating follow-up sequence..."):
-                                    followups = llm.generate_follow_up_sequence(
-                                        best_email,
-                                        job_data,
-                                        job['company']
-                                    )
-                                
-                                st.markdown('<div class="timeline-container"></div>', unsafe_allow_html=True)
-                                
-                                fcol1, fcol2, fcol3 = st.columns(3)
-                                
-                                for col, followup in zip([fcol1, fcol2, fcol3], followups):
-                                    with col:
-                                        day = followup.get('day', 0)
-                                        st.markdown(f"""
-                                        <div class="strategy-card">
-                                            <div style="font-size: 1.5rem; margin-bottom: 0.5rem;">📅</div>
-                                            <div style="font-weight: 700; color: #1e293b; margin-bottom: 0.5rem;">Day {day}</div>
-                                            <div style="color: #64748b; font-size: 0.9rem;">{followup.get('subject', 'N/A')[:50]}...</div>
-                                        </div>
-                                        """, unsafe_allow_html=True)
-                                        
-                                        with st.expander("View Email"):
-                                            st.code(followup.get('email', 'N/A'), language='markdown')
-                                            
-                                            st.download_button(
-                                                label="📥 Download",
-                                                data=followup.get('email', ''),
-                                                file_name=f"{job['company']}_followup_day{day}.txt",
-                                                mime="text/plain",
-                                                key=f"followup_{idx}_{day}"
-                                            )
-                                
-                            except Exception as e:
-                                st.error(f"❌ Error processing {job['company']}: {str(e)}")
+                    # Campaigns run in background workers: reruns and restarts do not lose them
+                    queue = get_task_queue()
+                    task_ids = [queue.submit("campaign", {"job": job, "portfolio": portfolio.name}) for _, job in selected_jobs]
+                    st.session_state['campaign_tasks'] = st.session_state.get('campaign_tasks', []) + task_ids
+                    st.query_params['campaigns'] = ",".join(st.session_state['campaign_tasks'])
+        
+        render_campaign_tasks(portfolio)
     
     # ========================================
     # MODE 2: DIRECT URL INPUT
@@ -893,16 +1021,18 @@ def create_streamlit_app(llm, portfolio, clean_text):
             else:
                 with st.spinner("🔄 Processing job posting..."):
                     try:
-                        loader = WebBaseLoader([url_input])
-                        data = clean_text(loader.load().pop().page_content)
+                        job_data, data, method = ingest_job_url(url_input, llm.extract_jobs)
+                        if method not in ("html", "failed"):
+                            st.caption(f"⚡ Structured posting data ({method}), no AI extraction needed")
                         
                         portfolio.load_portfolio()
-                        job_data = llm.extract_jobs(data)
                         
-                        if not job_data:
+                        if data is None:
+                            st.error("⚠️ Unable to fetch the job posting")
+                        elif not job_data:
                             st.error("⚠️ Unable to extract job information")
                         else:
-                            company_name = extract_company_name_from_url(url_input)
+                            company_name = job_data.get('company') or extract_company_name_from_url(url_input)
                             
                             # Detect tone
                             if override_tone == "Auto-detect":
@@ -1051,6 +1181,8 @@ def create_streamlit_app(llm, portfolio, clean_text):
 </div>
 """
     , unsafe_allow_html=True)
+    
+    render_diagnostics_panel(llm)
 
 
 
@@ -1060,7 +1192,20 @@ def initialize_app():
 
     try:
         chain = Chain()
-        portfolio = Portfolio() 
+        
+        # 🆕 V4: One portfolio per consultant; recently used ones stay loaded
+        registry = get_portfolio_registry()
+        names = registry.names()
+        portfolio_name = st.query_params.get('portfolio')
+        if portfolio_name not in names:
+            portfolio_name = names[0]
+        if len(names) > 1:
+            portfolio_name = st.sidebar.selectbox("Portfolio", names, index=names.index(portfolio_name))
+            st.query_params['portfolio'] = portfolio_name
+        portfolio = registry.get(portfolio_name)
+        
+        # 🆕 V4: Model, store, LLM connections and parser warmed once per process, in the background
+        start_warmup({"chain": chain, "portfolio": portfolio})
         st.sidebar.success("Components initialized")
         return chain, portfolio
     except Exception as e:
@@ -1075,5 +1220,8 @@ if __name__ == "__main__":
         st.error("App failed to start. Check logs.")
         st.stop()
 
+    # Background workers start once per server process and outlive reruns
+    start_workers(resources=lambda: {"chain": chain, "portfolios": get_portfolio_registry()})
+
     st.set_page_config(page_title="AI Cold Email", layout="wide")
     create_streamlit_app(chain, portfolio, clean_text)
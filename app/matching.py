@@ -0,0 +1,157 @@
+import re
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from tracing import tracer
+
+# Keywords are matched as whole tokens; custom boundaries instead of \b so
+# skills ending in symbols ("C++", "C#", ".NET") still match
+_BOUNDARY_BEFORE = r'(?<![a-z0-9_])'
+_BOUNDARY_AFTER = r'(?![a-z0-9_])'
+
+# Joins batch texts; a non-word character, so boundaries never span two texts
+_SEPARATOR = "\x00"
+
+
+def _normalize_keyword(keyword: str) -> str:
+    return " ".join(keyword.lower().split())
+
+
+class KeywordMatcher:
+    """
+    Compiled multi-keyword matcher.
+
+    All keywords are combined into one alternation regex (longest first,
+    inside a lookahead so overlapping keywords such as "learning" in
+    "machine learning" are all found) and scanned in a single pass,
+    whatever the number of keywords.
+    """
+
+    def __init__(self, keywords: Tuple[str, ...]):
+        self.keywords = keywords
+        # Duplicate keywords count once per occurrence, like the original scorer
+        self._weights = {}
+        for keyword in keywords:
+            normalized = _normalize_keyword(keyword)
+            if normalized:
+                self._weights[normalized] = self._weights.get(normalized, 0) + 1
+
+        terms = sorted(self._weights, key=len, reverse=True)
+        if terms:
+            alternation = "|".join(re.escape(term).replace(r'\ ', r'\s+') for term in terms)
+            self._pattern = re.compile(f"(?=({_BOUNDARY_BEFORE}(?:{alternation}){_BOUNDARY_AFTER}))")
+        else:
+            self._pattern = None
+
+        # Keywords found inside longer keywords sharing their start position
+        # (e.g. "react" in "react native") are implied by the longer match
+        self._implied = {}
+        for term in terms:
+            self._implied[term] = {term} | {
+                other for other in terms
+                if len(other) < len(term)
+                and re.search(f"{_BOUNDARY_BEFORE}{re.escape(other)}{_BOUNDARY_AFTER}", term)
+            }
+
+    def _score(self, matched: set) -> float:
+        if not self.keywords:
+            return 0.0
+        covered = set()
+        for term in matched:
+            covered |= self._implied.get(term, {term})
+        hits = sum(self._weights.get(term, 0) for term in covered)
+        return min(hits / len(self.keywords), 1.0)
+
+    def matches(self, text: str) -> set:
+        """Normalized keywords found in `text`."""
+        if self._pattern is None or not text:
+            return set()
+        return {_normalize_keyword(m.group(1)) for m in self._pattern.finditer(text.lower())}
+
+    def score(self, text: str) -> float:
+        """Share of keywords present in `text` (0-1)."""
+        return self._score(self.matches(text))
+
+    def score_batch(self, texts: List[str]) -> List[float]:
+        """
+        Score many texts with one regex scan over their concatenation.
+
+        Args:
+            texts (list): Job texts (title + snippet)
+
+        Returns:
+            list: Match score per text, in order
+        """
+        if self._pattern is None:
+            return [0.0] * len(texts)
+
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text or "") + len(_SEPARATOR)
+
+        matched = [set() for _ in texts]
+        corpus = _SEPARATOR.join(text or "" for text in texts).lower()
+        for m in self._pattern.finditer(corpus):
+            matched[bisect_right(starts, m.start()) - 1].add(_normalize_keyword(m.group(1)))
+
+        return [self._score(found) for found in matched]
+
+
+@lru_cache(maxsize=128)
+def _cached_matcher(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
+
+
+def get_matcher(keywords: List[str]) -> KeywordMatcher:
+    """Matcher for a keyword list, compiled once per distinct list."""
+    return _cached_matcher(tuple(keywords))
+
+
+def job_text(job: Dict) -> str:
+    return f"{job.get('title', '')} {job.get('description_snippet', '')}"
+
+
+def rank_jobs(jobs: List[Dict], keywords: List[str], portfolio=None,
+              embedding_weight: float = 0.3) -> List[Dict]:
+    """
+    🆕 V4 FEATURE: Re-score and rank discovered jobs in one batch.
+
+    The keyword score is blended with the embedding similarity between each
+    job and the closest portfolio project when a `Portfolio` is given.
+
+    Args:
+        jobs (list): Job listings
+        keywords (list): Skills/keywords searched for
+        portfolio (Portfolio): Optional portfolio for the embedding blend
+        embedding_weight (float): Weight of the embedding similarity (0-1)
+
+    Returns:
+        list: Jobs with updated 'match_score', best match first
+    """
+    if not jobs:
+        return []
+
+    texts = [job_text(job) for job in jobs]
+    with tracer.span("matching.rank_jobs", jobs=len(jobs), keywords=len(keywords)) as span:
+        scores = get_matcher(keywords).score_batch(texts)
+
+        similarities: Optional[List[float]] = None
+        if portfolio is not None and embedding_weight > 0:
+            try:
+                similarities = portfolio.skill_similarity(texts)
+            except Exception as e:
+                print(f"⚠️ Embedding similarity unavailable, ranking by keywords only: {e}")
+        span.set("embedding_blend", similarities is not None)
+
+    ranked = []
+    for i, job in enumerate(jobs):
+        score = scores[i]
+        if similarities is not None:
+            score = (1 - embedding_weight) * score + embedding_weight * similarities[i]
+        ranked.append({**job, "match_score": round(score, 4)})
+
+    ranked.sort(key=lambda x: x['match_score'], reverse=True)
+    return ranked
@@ -0,0 +1,135 @@
+import os
+import json
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+from llm_backends import DEFAULT_MODEL
+
+# Route per Chain method. Every route may override model, temperature,
+# timeout (seconds) and an ordered list of fallback models.
+DEFAULT_ROUTES = {
+    "extract_jobs": {"model": DEFAULT_MODEL, "temperature": 0},
+    "detect_style": {"model": DEFAULT_MODEL, "temperature": 0},
+    "research_company": {"model": DEFAULT_MODEL, "temperature": 0},
+    "generate_email_variations": {"model": DEFAULT_MODEL, "temperature": 0.7},
+    "analyze_email_effectiveness": {"model": DEFAULT_MODEL, "temperature": 0},
+    "generate_follow_up_sequence": {"model": DEFAULT_MODEL, "temperature": 0.7},
+    "generate_cold_email": {"model": DEFAULT_MODEL, "temperature": 0},
+}
+
+# USD per 1M tokens (input, output) - Groq list prices, override via the "prices" config key
+DEFAULT_PRICES = {
+    "llama-3.1-8b-instant": (0.05, 0.08),
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+}
+
+
+class ModelRouter:
+    """
+    Config-driven routing table: which model serves which `Chain` method,
+    with optional fallbacks, plus per-route/model latency and cost metrics.
+
+    Config (JSON file pointed to by MODEL_ROUTES_PATH):
+        {
+            "routes": {
+                "extract_jobs": {"model": "llama-3.1-8b-instant", "timeout": 15},
+                "generate_email_variations": {
+                    "model": "llama-3.3-70b-versatile",
+                    "fallbacks": ["llama-3.1-8b-instant"]
+                }
+            },
+            "prices": {"llama-3.3-70b-versatile": [0.59, 0.79]}
+        }
+    """
+
+    def __init__(self, routes: Optional[Dict] = None, prices: Optional[Dict] = None,
+                 latency_window: int = 500):
+        self.routes = {name: dict(route) for name, route in DEFAULT_ROUTES.items()}
+        for name, route in (routes or {}).items():
+            self.routes.setdefault(name, {}).update(route)
+
+        self.prices = dict(DEFAULT_PRICES)
+        self.prices.update({model: tuple(price) for model, price in (prices or {}).items()})
+
+        self._latency_window = latency_window
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        path = os.getenv("MODEL_ROUTES_PATH")
+        if not path:
+            return cls()
+
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        print(f"🧭 Model routes loaded from {path}")
+        return cls(routes=config.get("routes"), prices=config.get("prices"))
+
+    def route(self, name: str) -> Dict:
+        """Resolved route for a Chain method (unknown names use the default model)."""
+        route = self.routes.get(name, {})
+        return {
+            "model": route.get("model", DEFAULT_MODEL),
+            "temperature": route.get("temperature", 0),
+            "timeout": route.get("timeout"),
+            "fallbacks": list(route.get("fallbacks", [])),
+        }
+
+    def candidates(self, name: str) -> List[str]:
+        """Models to try in order: primary first, then fallbacks."""
+        route = self.route(name)
+        return [route["model"]] + [m for m in route["fallbacks"] if m != route["model"]]
+
+    def cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        price_in, price_out = self.prices.get(model, (0.0, 0.0))
+        return (prompt_tokens * price_in + completion_tokens * price_out) / 1_000_000
+
+    def record(self, route: str, model: str, latency_ms: float, prompt_tokens: int = 0,
+               completion_tokens: int = 0, error: bool = False, fallback: bool = False):
+        """Record one attempt of `route` served (or failed) by `model`."""
+        with self._lock:
+            entry = self._metrics.setdefault((route, model), {
+                "calls": 0,
+                "errors": 0,
+                "fallback_calls": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "cost_usd": 0.0,
+                "latencies": deque(maxlen=self._latency_window),
+            })
+            entry["calls"] += 1
+            entry["errors"] += int(error)
+            entry["fallback_calls"] += int(fallback)
+            entry["prompt_tokens"] += prompt_tokens
+            entry["completion_tokens"] += completion_tokens
+            entry["cost_usd"] += self.cost(model, prompt_tokens, completion_tokens)
+            entry["latencies"].append(latency_ms)
+
+    def metrics(self) -> List[Dict]:
+        """
+        Per route/model statistics for tuning the latency-quality tradeoff.
+
+        Returns:
+            list: [{"route", "model", "calls", "errors", "fallback_calls",
+                    "p50_ms", "p95_ms", "prompt_tokens", "completion_tokens", "cost_usd"}]
+        """
+        rows = []
+        with self._lock:
+            for (route, model), entry in self._metrics.items():
+                latencies = sorted(entry["latencies"])
+                rows.append({
+                    "route": route,
+                    "model": model,
+                    "calls": entry["calls"],
+                    "errors": entry["errors"],
+                    "fallback_calls": entry["fallback_calls"],
+                    "p50_ms": round(latencies[len(latencies) // 2], 2) if latencies else 0.0,
+                    "p95_ms": round(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))], 2) if latencies else 0.0,
+                    "prompt_tokens": entry["prompt_tokens"],
+                    "completion_tokens": entry["completion_tokens"],
+                    "cost_usd": round(entry["cost_usd"], 6),
+                })
+        rows.sort(key=lambda r: (r["route"], r["model"]))
+        return rows
@@ -1,39 +1,407 @@
+import numpy as np
 import pandas as pd
 import chromadb 
-import uuid
+from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+import io
+import time
+import hashlib
+import threading
+import weakref
 import os
-from typing import List, Dict
-import re
+from typing import List, Dict, Optional, Tuple
+from tracing import tracer
+from vector_index import NumpyVectorIndex
+from index_snapshot import embedding_model_id, read_snapshot, write_snapshot
+from skill_index import SkillIndex, split_skills
+
+# VECTOR_BACKEND=auto searches portfolios up to this many projects in memory with NumPy
+NUMPY_INDEX_MAX_ROWS = int(os.getenv("NUMPY_INDEX_MAX_ROWS", "5000"))
+
+# Seconds between checks of watched portfolio CSVs for changes (0 disables hot reload)
+PORTFOLIO_RELOAD_INTERVAL = float(os.getenv("PORTFOLIO_RELOAD_INTERVAL", "2"))
+
+# Snapshots of each portfolio's embedding matrix and skills, keyed to the CSV hash ("" disables)
+PORTFOLIO_SNAPSHOT_DIR = os.getenv("PORTFOLIO_SNAPSHOT_DIR", "vector_db/snapshots")
+
+# Directory of the ONNX embedding model files (baked into the image by app/build_index.py);
+# empty: chromadb's download cache under ~/.cache/chroma
+EMBEDDING_MODEL_DIR = os.getenv("EMBEDDING_MODEL_DIR", "")
+
+# Collection metadata key recording the CSV content the collection was synced from
+SOURCE_HASH_KEY = "source_sha256"
+
+# One HTTP client per Chroma server, reused by every Portfolio in the process
+_http_clients = {}
+_http_clients_lock = threading.Lock()
+
+
+def get_chroma_client(mode: str = None):
+    """
+    🆕 V4 FEATURE: ChromaDB client for the configured mode.
+    
+    CHROMA_MODE=embedded (default) opens the on-disk store at CHROMA_PATH in
+    this process; CHROMA_MODE=http talks to a shared Chroma server at
+    CHROMA_HOST:CHROMA_PORT, so replicas and workers use one index instead of
+    each loading its own copy of the SQLite files.
+    
+    Args:
+        mode (str): "embedded" or "http" (default: CHROMA_MODE)
+        
+    Returns:
+        chromadb client (HTTP clients are shared and keep their connections open)
+    """
+    mode = (mode or os.getenv("CHROMA_MODE", "embedded")).strip().lower()
+    
+    if mode == "http":
+        host = os.getenv("CHROMA_HOST", "localhost")
+        port = int(os.getenv("CHROMA_PORT", "8000"))
+        with _http_clients_lock:
+            if (host, port) not in _http_clients:
+                _http_clients[(host, port)] = chromadb.HttpClient(host=host, port=port)
+                print(f"🗄️ ChromaDB server at {host}:{port}")
+            return _http_clients[(host, port)]
+    
+    if mode != "embedded":
+        raise ValueError(f"Unknown CHROMA_MODE '{mode}' (expected 'embedded' or 'http')")
+    
+    # Ensure the vector_db directory exists
+    db_path = os.getenv("CHROMA_PATH", "vector_db")
+    os.makedirs(db_path, exist_ok=True)
+    return chromadb.PersistentClient(path=db_path)
+
+
+_embedding_model = None
+_embedding_model_lock = threading.Lock()
+
+
+def _onnx_model():
+    global _embedding_model
+    with _embedding_model_lock:
+        if _embedding_model is None:
+            from chromadb.utils.embedding_functions.onnx_mini_lm_l6_v2 import ONNXMiniLM_L6_V2
+            model = ONNXMiniLM_L6_V2()
+            if EMBEDDING_MODEL_DIR:
+                model.DOWNLOAD_PATH = EMBEDDING_MODEL_DIR
+            _embedding_model = model
+        return _embedding_model
+
+
+class SharedEmbeddingFunction(DefaultEmbeddingFunction):
+    """
+    Chroma's default embedding (all-MiniLM-L6-v2) with one ONNX session per process.
+    
+    DefaultEmbeddingFunction opens a new session, re-reading the model file,
+    on every call; every Portfolio and query here shares the first one.
+    """
+    MODEL_NAME = "all-MiniLM-L6-v2"
+    
+    def __call__(self, input):
+        return _onnx_model()(input)
+
+
+def _project_id(tech_stack: str, link: str) -> str:
+    # Same project, same id: concurrent loads from several processes upsert instead of duplicating
+    return hashlib.sha1(f"{tech_stack}\x00{link}".encode("utf-8")).hexdigest()
+
 
 class Portfolio:
-    def __init__(self, file_path="app/rsrc/links_portfolio.csv"):
+    def __init__(self, file_path="app/rsrc/links_portfolio.csv", client=None, vector_backend=None,
+                 name=None, snapshot_dir=None):
         self.file_path = file_path
-        self.data = pd.read_csv(self.file_path)
         
-        # Ensure the vector_db directory exists
-        db_path = "vector_db"
-        os.makedirs(db_path, exist_ok=True)
+        # 🆕 V4: Named portfolios (one per consultant) each get their own collection
+        self.name = name
+        self.collection_name = f"portfolio_{name}" if name else "portfolio_collection"
+        
+        # 🆕 V4: Reloads and index syncs run one at a time (_sync_lock); data,
+        # skills cache and vector index are then swapped together (_state_lock)
+        self._sync_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._file_signature, self._file_hash, self.data = self._read_file()
+        self._data_bytes = int(self.data.memory_usage(deep=True).sum())
+        self._indexed_hash = None
         
-        # Initialize the ChromaDB client with the path
-        self.client = chromadb.PersistentClient(path=db_path)
-        self.collection = self.client.get_or_create_collection(name="portfolio_collection")
+        # Embedded store or shared Chroma server (CHROMA_MODE)
+        self.client = client or get_chroma_client()
+        self.embedding_function = SharedEmbeddingFunction()
+        self.collection = self.client.get_or_create_collection(
+            name=self.collection_name, embedding_function=self.embedding_function
+        )
+        
+        # 🆕 V4: Disk snapshot of the derived indexes (see index_snapshot)
+        snapshot_root = PORTFOLIO_SNAPSHOT_DIR if snapshot_dir is None else snapshot_dir
+        self.snapshot_dir = os.path.join(snapshot_root, self.collection_name) if snapshot_root else None
+        
+        # 🆕 V4: Search backend: "chroma", "numpy" or "auto" (NumPy below NUMPY_INDEX_MAX_ROWS)
+        self.vector_backend = (vector_backend or os.getenv("VECTOR_BACKEND", "auto")).strip().lower()
+        self._vector_index = None
+        self._use_numpy = None
+        self._vector_index_lock = threading.Lock()
         
         # 🆕 V3: Cache for extracted skills
         self._skills_cache = None
+        # 🆕 V4: (skills, rows, SkillIndex) built from them, rebuilt whenever the skills change
+        self._skill_index = None
 
     
+    def _read_file(self) -> Tuple[Tuple[int, int], str, pd.DataFrame]:
+        """(mtime/size signature, content hash, parsed rows) of one read of the CSV."""
+        with open(self.file_path, "rb") as f:
+            signature = self._stat_signature(f.fileno())
+            raw = f.read()
+        return signature, hashlib.sha256(raw).hexdigest(), pd.read_csv(io.BytesIO(raw))
+    
+    
+    @staticmethod
+    def _stat_signature(path_or_fd) -> Tuple[int, int]:
+        stat = os.stat(path_or_fd)
+        return stat.st_mtime_ns, stat.st_size
+    
+    
     def load_portfolio(self):
         """
         V2 FEATURE: Load portfolio into ChromaDB vector store.
+        
+        🆕 V4: Only rows missing from the collection are embedded, and rows no
+        longer in the CSV are deleted; a collection already synced from the
+        same CSV content is used as is.
         """
-        if not self.collection.count():
-            for _, row in self.data.iterrows():
-                self.collection.add(
-                    documents=[row['TechStack']],
-                    metadatas=[{"link": row['Portfolio_Link']}],
-                    ids=[str(uuid.uuid4())]
+        if self._indexed_hash == self._file_hash:
+            return
+        
+        with self._sync_lock:
+            if self._indexed_hash != self._file_hash:
+                self._sync_collection(self.data, self._file_hash)
+                self._indexed_hash = self._file_hash
+    
+    
+    def _sync_collection(self, data: pd.DataFrame, source_hash: str):
+        """Make the collection hold exactly the projects of `data`, embedding only new rows."""
+        if (self.collection.metadata or {}).get(SOURCE_HASH_KEY) == source_hash:
+            return
+        
+        projects = {}
+        for stack, link in zip(data['TechStack'], data['Portfolio_Link']):
+            projects.setdefault(_project_id(str(stack), str(link)), (str(stack), str(link)))
+        
+        existing = set(self.collection.get(include=[])["ids"]) if self.collection.count() else set()
+        added = [project_id for project_id in projects if project_id not in existing]
+        removed = [project_id for project_id in existing if project_id not in projects]
+        
+        # Embeddings of a snapshot of this CSV (e.g. baked into the image) skip the model
+        snapshot = self._read_snapshot(source_hash) if added else None
+        stored_rows = {project_id: row for row, project_id in enumerate(snapshot["ids"])} if snapshot else {}
+        
+        with tracer.span("embedding.load_portfolio", rows=len(data), added=len(added), removed=len(removed),
+                         from_snapshot=bool(stored_rows)):
+            # Batched upserts: one round-trip per batch when talking to a server.
+            # New rows go in before old ones are deleted, so searches never see an empty collection
+            batch_size = self.client.get_max_batch_size()
+            for start in range(0, len(added), batch_size):
+                batch = added[start:start + batch_size]
+                rows = [stored_rows.get(project_id) for project_id in batch]
+                embeddings = None
+                if all(row is not None for row in rows):
+                    embeddings = np.asarray(snapshot["index"].matrix[rows], dtype=np.float32)
+                self.collection.upsert(
+                    documents=[projects[project_id][0] for project_id in batch],
+                    metadatas=[{"link": projects[project_id][1]} for project_id in batch],
+                    embeddings=embeddings,
+                    ids=batch
                 )
-
+            for start in range(0, len(removed), batch_size):
+                self.collection.delete(ids=removed[start:start + batch_size])
+            
+            self.collection.modify(metadata={SOURCE_HASH_KEY: source_hash})
+        
+        if existing:
+            print(f"🔄 Portfolio index synced: {len(added)} added, {len(removed)} removed")
+        self._reset_vector_index()
+    
+    
+    def reload_if_changed(self) -> bool:
+        """
+        🆕 V4 FEATURE: Pick up edits to the portfolio CSV without a restart.
+        
+        A cheap mtime/size check gates a content hash; when the content
+        changed, only added and removed rows are re-indexed, then the data,
+        skills cache and in-memory vector index are replaced together.
+        
+        Returns:
+            bool: True if the portfolio was reloaded
+        """
+        try:
+            if self._stat_signature(self.file_path) == self._file_signature:
+                return False
+        except OSError:
+            # Mid-replace (editor save): try again on the next check
+            return False
+        
+        with self._sync_lock:
+            try:
+                signature, source_hash, data = self._read_file()
+            except OSError:
+                return False
+            except ValueError as e:
+                # Keep serving the previous rows; re-check once the file changes again
+                print(f"⚠️ Portfolio reload skipped ({self.file_path}): {e}")
+                self._file_signature = self._stat_signature(self.file_path)
+                return False
+            
+            if source_hash == self._file_hash:
+                # Touched but unchanged
+                self._file_signature = signature
+                return False
+            
+            with tracer.span("portfolio.reload", rows=len(data)):
+                indexed = self._indexed_hash is not None
+                if indexed:
+                    self._sync_collection(data, source_hash)
+                
+                # Lock order: vector index, then state (as in _matrix_index -> _load_snapshot)
+                with self._vector_index_lock, self._state_lock:
+                    self.data = data
+                    self._data_bytes = int(data.memory_usage(deep=True).sum())
+                    self._file_signature, self._file_hash = signature, source_hash
+                    if indexed:
+                        self._indexed_hash = source_hash
+                    self._skills_cache = None
+                    self._vector_index = None
+                    self._use_numpy = None
+        
+        print(f"🔄 Portfolio reloaded: {len(data)} projects from {self.file_path}")
+        return True
+    
+    
+    def _reset_vector_index(self):
+        with self._vector_index_lock:
+            self._vector_index = None
+            self._use_numpy = None
+    
+    
+    def warm_indexes(self):
+        """
+        🆕 V4 FEATURE: Index the portfolio and build its derived indexes now
+        instead of on first search (from the snapshot when the CSV is unchanged).
+        """
+        self.load_portfolio()
+        self._numpy_index()
+        self.extract_all_skills()
+    
+    
+    def build_snapshot(self) -> Optional[str]:
+        """
+        🆕 V4 FEATURE: Index the portfolio and write its snapshot (used at image build time).
+        
+        Returns:
+            str: Snapshot directory, or None when snapshots are disabled or nothing is indexed
+        """
+        self.load_portfolio()
+        if self._matrix_index() is None or not self.snapshot_dir:
+            return None
+        return self.snapshot_dir
+    
+    
+    def memory_bytes(self) -> int:
+        """
+        🆕 V4 FEATURE: Approximate memory held by this portfolio's rows and in-memory index.
+        
+        Returns:
+            int: Bytes
+        """
+        index = self._vector_index
+        return self._data_bytes + (index.matrix.nbytes if index is not None else 0)
+    
+    
+    def _matrix_index(self) -> Optional[NumpyVectorIndex]:
+        """In-memory matrix of the stored embeddings (None while nothing is indexed)."""
+        with self._vector_index_lock:
+            if self._vector_index is None:
+                self._vector_index = self._load_snapshot() or self._build_index()
+            return self._vector_index
+    
+    
+    def _build_index(self) -> Optional[NumpyVectorIndex]:
+        source_hash = self._file_hash
+        count = self.collection.count()
+        if not count:
+            return None
+        with tracer.span("vector.build_index", rows=count):
+            stored = self.collection.get(include=["embeddings", "metadatas"])
+            index = NumpyVectorIndex(stored["embeddings"], stored["metadatas"])
+        self._save_snapshot(index, stored["ids"], source_hash)
+        return index
+    
+    
+    def _read_snapshot(self, source_hash: str) -> Optional[Dict]:
+        if not self.snapshot_dir:
+            return None
+        with tracer.span("vector.load_snapshot") as span:
+            snapshot = read_snapshot(self.snapshot_dir, source_hash, embedding_model_id(self.embedding_function))
+            span.set("hit", snapshot is not None)
+        return snapshot
+    
+    
+    def _load_snapshot(self) -> Optional[NumpyVectorIndex]:
+        """Matrix (memory-mapped) and skills of the current CSV from its snapshot, if there is one."""
+        source_hash = self._file_hash
+        snapshot = self._read_snapshot(source_hash)
+        if snapshot is None:
+            return None
+        with self._state_lock:
+            if self._file_hash == source_hash and self._skills_cache is None:
+                self._skills_cache = snapshot["skills"]
+        return snapshot["index"]
+    
+    
+    def _save_snapshot(self, index: NumpyVectorIndex, ids: List[str], source_hash: str):
+        if not self.snapshot_dir:
+            return
+        # Skip while a sync is rewriting the collection (or one finished since the read):
+        # the matrix may not match `source_hash`. The next build writes it instead
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            if self._indexed_hash == self._file_hash == source_hash:
+                write_snapshot(self.snapshot_dir, source_hash, embedding_model_id(self.embedding_function),
+                               index, ids, self.extract_all_skills())
+        except OSError as e:
+            print(f"⚠️ Portfolio snapshot not written ({self.snapshot_dir}): {e}")
+        finally:
+            self._sync_lock.release()
+    
+    
+    def _numpy_index(self) -> Optional[NumpyVectorIndex]:
+        """The in-memory index when the NumPy backend applies to this portfolio, else None."""
+        if self.vector_backend == "chroma":
+            return None
+        
+        with self._vector_index_lock:
+            if self._use_numpy is None:
+                if self._vector_index is None:
+                    self._vector_index = self._load_snapshot()
+                count = len(self._vector_index) if self._vector_index is not None else self.collection.count()
+                if not count:
+                    # Nothing loaded yet: decide once the portfolio is indexed
+                    return None
+                self._use_numpy = self.vector_backend == "numpy" or count <= NUMPY_INDEX_MAX_ROWS
+        
+        return self._matrix_index() if self._use_numpy else None
+    
+    
+    def _search(self, span_name: str, texts: List[str], n_results: int, include: List[str]) -> Dict:
+        """Nearest projects for `texts`: one NumPy matrix product, or one ChromaDB query."""
+        index = self._numpy_index()
+        backend = "numpy" if index is not None else "chroma"
+        
+        with tracer.span(span_name, n_results=n_results, batch=len(texts), backend=backend):
+            if index is not None:
+                metadatas, distances = index.search(self.embedding_function(texts), n_results)
+                return {"metadatas": metadatas, "distances": distances}
+            
+            # Query embedding + HNSW search happen in the same ChromaDB call
+            return self.collection.query(query_texts=texts, n_results=n_results, include=include)
+    
     
     def query_links(self, skills):
         """
@@ -45,10 +413,99 @@ class Portfolio:
         Returns:
             list: Matching portfolio metadata
         """
-        return self.collection.query(
-            query_texts=[skills],
-            n_results=2
-        ).get('metadatas', [])
+        return self._search("chroma.query_links", [skills], 2, ["metadatas"]).get('metadatas', [])
+    
+    
+    def query_links_batch(self, skills_list: List[str]) -> List[list]:
+        """
+        🆕 V4 FEATURE: `query_links` for many skill strings in one search call.
+        
+        Args:
+            skills_list (list): Skills strings to match against
+            
+        Returns:
+            list: One `query_links`-shaped result per skills string
+        """
+        if not skills_list:
+            return []
+        metadatas = self._search("chroma.query_links", skills_list, 2, ["metadatas"]).get('metadatas', [])
+        return [[links] for links in metadatas]
+    
+    
+    def skill_similarity(self, texts: List[str]) -> List[float]:
+        """
+        🆕 V4 FEATURE: Similarity between each text and its closest portfolio project.
+        
+        Args:
+            texts (list): Job texts to compare
+            
+        Returns:
+            list: Cosine similarity (0-1) per text
+        """
+        if not texts:
+            return []
+        self.load_portfolio()
+        
+        # One batched query: every text embedded and searched in a single call
+        distances = self._search("chroma.skill_similarity", texts, 1, ["distances"]).get('distances', [])
+        
+        # Default space is squared L2 over unit-norm embeddings: cosine = 1 - d / 2
+        return [max(0.0, min(1.0, 1 - d[0] / 2)) if d else 0.0 for d in distances]
+    
+    
+    def similarity_matrix(self, texts: List[str]) -> Tuple[np.ndarray, List[Dict]]:
+        """
+        🆕 V4 FEATURE: Cosine similarity of every text with every portfolio project.
+        
+        Args:
+            texts (list): Job skill strings
+            
+        Returns:
+            tuple: (matrix of shape (texts, projects), project metadata per column)
+        """
+        index = self._matrix_index() if texts else None
+        if index is None:
+            return np.zeros((len(texts), 0), dtype=np.float32), []
+        
+        # All texts embedded in one call, scored against every project in one matrix product
+        with tracer.span("vector.similarity_matrix", texts=len(texts), projects=len(index)):
+            return index.similarities(self.embedding_function(texts)), index.metadatas
+    
+    
+    def match_jobs(self, skills_per_job: List[List[str]], top_k: int = 2) -> List[Dict]:
+        """
+        🆕 V4 FEATURE: Portfolio fit for every job of a campaign at once.
+        
+        Replaces one `query_links` + `suggest_skills_for_job` pair per job with
+        a single jobs x projects similarity matrix and one shared skill lookup.
+        
+        Args:
+            skills_per_job (list): Required skills of each job
+            top_k (int): Portfolio links returned per job
+            
+        Returns:
+            list: Per job {"links" (`query_links`-shaped), "similarities",
+                  "matching_skills", "missing_skills", "match_percentage",
+                  "relevant_projects"}
+        """
+        if not skills_per_job:
+            return []
+        self.load_portfolio()
+        
+        texts = [str(list(skills)) for skills in skills_per_job]
+        matrix, projects = self.similarity_matrix(texts)
+        top, top_similarities = NumpyVectorIndex.top_k(matrix, top_k)
+        
+        skill_index = self.skill_index()
+        project_cache = {}
+        
+        matches = []
+        for skills, columns, similarities in zip(skills_per_job, top, top_similarities):
+            match = self._skill_gap(list(skills), skill_index, project_cache)
+            match["links"] = [[projects[i] for i in columns]]
+            match["similarities"] = [round(float(similarity), 4) for similarity in similarities]
+            matches.append(match)
+        return matches
     
     
     def extract_all_skills(self) -> List[str]:
@@ -61,28 +518,44 @@ class Portfolio:
         if self._skills_cache is not None:
             return self._skills_cache
         
+        data = self.data
         skills_set = set()
         
-        for _, row in self.data.iterrows():
-            tech_stack = str(row['TechStack'])
-            
+        for tech_stack in data['TechStack']:
             # Split by common delimiters: comma, semicolon, pipe, slash
-            skills = re.split(r'[,;|/]', tech_stack)
-            
-            for skill in skills:
-                # Clean and normalize
-                skill = skill.strip()
-                
-                # Remove parentheses content
-                skill = re.sub(r'\([^)]*\)', '', skill).strip()
-                
-                # Skip empty or very short strings
-                if len(skill) > 1 and not skill.isdigit():
-                    skills_set.add(skill)
+            skills_set.update(split_skills(tech_stack))
         
         # Sort alphabetically
-        self._skills_cache = sorted(list(skills_set))
-        return self._skills_cache
+        skills = sorted(list(skills_set))
+        
+        # A reload during extraction already invalidated these skills: don't cache them
+        with self._state_lock:
+            if self.data is data:
+                self._skills_cache = skills
+        return skills
+    
+    
+    def skill_index(self) -> SkillIndex:
+        """
+        🆕 V4 FEATURE: Alias-aware, fuzzy index over this portfolio's skills.
+        
+        Returns:
+            SkillIndex: Resolves job skills ("ReactJS", "Postgres") to portfolio skills
+        """
+        return self._skill_index_entry()[2]
+    
+    
+    def _skill_index_entry(self) -> Tuple[List[str], pd.DataFrame, SkillIndex]:
+        skills = self.extract_all_skills()
+        cached = self._skill_index
+        if cached is not None and cached[0] is skills:
+            return cached
+        
+        data = self.data
+        with tracer.span("skills.build_index", skills=len(skills), rows=len(data)):
+            index = SkillIndex(skills, [str(stack) for stack in data['TechStack']])
+        self._skill_index = (skills, data, index)
+        return self._skill_index
     
     
     def get_skill_categories(self) -> Dict[str, List[str]]:
@@ -177,10 +650,20 @@ class Portfolio:
         Returns:
             list: [{"tech_stack": str, "link": str}]
         """
+        # 🆕 V4: Skills known to the portfolio (also by alias or near-spelling) come from the index
+        _, data, index = self._skill_index_entry()
+        positions = index.positions(skill)
+        if positions is not None:
+            rows = data.iloc[positions]
+            return [
+                {"tech_stack": str(stack), "link": link}
+                for stack, link in zip(rows['TechStack'], rows['Portfolio_Link'])
+            ]
+        
         matching_projects = []
         skill_lower = skill.lower()
         
-        for _, row in self.data.iterrows():
+        for _, row in data.iterrows():
             tech_stack = str(row['TechStack'])
             
             if skill_lower in tech_stack.lower():
@@ -204,15 +687,19 @@ class Portfolio:
                 "matching_skills": [...],
                 "missing_skills": [...],
                 "match_percentage": float,
-                "relevant_projects": [...]
+                "relevant_projects": [...],
+                "matched_as": {job skill: portfolio skill}
             }
         """
-        portfolio_skills = [s.lower() for s in self.extract_all_skills()]
-        job_skills_lower = [s.lower() for s in job_skills]
-        
-        # Find matches
-        matching = [s for s in job_skills if s.lower() in portfolio_skills]
-        missing = [s for s in job_skills if s.lower() not in portfolio_skills]
+        return self._skill_gap(job_skills, self.skill_index(), {})
+    
+    
+    def _skill_gap(self, job_skills: List[str], skill_index: SkillIndex, project_cache: Dict) -> Dict:
+        """Skill match of one job; `project_cache` shares project lookups across jobs."""
+        # Find matches (exact, alias or near-spelling)
+        resolved = skill_index.match(job_skills)
+        matching = [s for s in job_skills if resolved[s] is not None]
+        missing = [s for s in job_skills if resolved[s] is None]
         
         # Calculate match percentage
         match_pct = (len(matching) / len(job_skills) * 100) if job_skills else 0
@@ -220,8 +707,10 @@ class Portfolio:
         # Find relevant projects
         relevant_projects = []
         for skill in matching[:3]:  # Top 3 matching skills
-            projects = self.find_projects_by_skill(skill)
-            relevant_projects.extend(projects[:2])  # Max 2 projects per skill
+            key = skill_index.resolve_key(skill)
+            if key not in project_cache:
+                project_cache[key] = self.find_projects_by_skill(skill)[:2]  # Max 2 projects per skill
+            relevant_projects.extend(project_cache[key])
         
         # Remove duplicates
         unique_projects = []
@@ -235,7 +724,9 @@ class Portfolio:
             "matching_skills": matching,
             "missing_skills": missing,
             "match_percentage": round(match_pct, 1),
-            "relevant_projects": unique_projects[:4]  # Max 4 projects
+            "relevant_projects": unique_projects[:4],  # Max 4 projects
+            # 🆕 V4: Job skills matched under another name ("ReactJS" -> "React.js")
+            "matched_as": {s: resolved[s] for s in matching if resolved[s] != s}
         }
     
     
@@ -285,3 +776,49 @@ class Portfolio:
                         f.write(f"  - {skill}\n")
         
         print(f"✅ Skills exported to {output_file}")
+
+
+# Portfolios checked by the watcher thread (dropped automatically once garbage collected)
+_watched_portfolios = weakref.WeakSet()
+_watcher_thread = None
+_watcher_lock = threading.Lock()
+
+
+def watch_portfolio(portfolio: Portfolio, interval: float = None) -> bool:
+    """
+    🆕 V4 FEATURE: Hot-reload `portfolio` whenever its CSV changes.
+    
+    One daemon thread per process polls every watched portfolio (see
+    `Portfolio.reload_if_changed`), so Streamlit reruns that build new
+    Portfolio objects never pile up watcher threads.
+    
+    Args:
+        portfolio (Portfolio): Portfolio to keep in sync with its file
+        interval (float): Seconds between checks (default: PORTFOLIO_RELOAD_INTERVAL; 0 disables)
+        
+    Returns:
+        bool: True if the portfolio is being watched
+    """
+    global _watcher_thread
+    interval = PORTFOLIO_RELOAD_INTERVAL if interval is None else interval
+    if interval <= 0:
+        return False
+    
+    with _watcher_lock:
+        _watched_portfolios.add(portfolio)
+        if _watcher_thread is None:
+            _watcher_thread = threading.Thread(
+                target=_watch_loop, args=(interval,), name="portfolio-watcher", daemon=True
+            )
+            _watcher_thread.start()
+    return True
+
+
+def _watch_loop(interval: float):
+    while True:
+        time.sleep(interval)
+        for portfolio in list(_watched_portfolios):
+            try:
+                portfolio.reload_if_changed()
+            except Exception as e:
+                print(f"⚠️ Portfolio reload failed ({portfolio.file_path}): {e}")
@@ -0,0 +1,157 @@
+"""
+Named portfolios (one per consultant) with LRU residency.
+
+Every `<name>.csv` in PORTFOLIOS_DIR is a portfolio with its own ChromaDB
+collection and derived indexes; "default" is app/rsrc/links_portfolio.csv.
+Recently used portfolios stay in memory up to PORTFOLIO_CACHE_MB; the least
+recently used ones are dropped beyond that and reload lazily, from their
+index snapshot when the CSV is unchanged.
+"""
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from portfolio import Portfolio, get_chroma_client, watch_portfolio
+from tracing import tracer
+
+DEFAULT_PORTFOLIO = "default"
+DEFAULT_PORTFOLIO_PATH = "app/rsrc/links_portfolio.csv"
+
+# Collection-safe portfolio names: letters, digits, "_" and "-"
+_NAME_PATTERN = re.compile(r"^[A-Za-z0-9]([A-Za-z0-9_-]{0,61}[A-Za-z0-9])?$")
+
+
+class PortfolioRegistry:
+    """
+    🆕 V4 FEATURE: Loads named portfolios on demand and keeps the recently used ones resident.
+    """
+
+    def __init__(self, portfolios_dir: str = None, max_bytes: int = None, client=None, snapshot_dir: str = None):
+        self.portfolios_dir = portfolios_dir or os.getenv("PORTFOLIOS_DIR", "app/rsrc/portfolios")
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv("PORTFOLIO_CACHE_MB", "512")) * 1024 * 1024)
+        self.max_bytes = max_bytes
+        self.client = client
+        self.snapshot_dir = snapshot_dir
+
+        self._resident: "OrderedDict[str, Portfolio]" = OrderedDict()
+        self._lock = threading.Lock()
+        # One loader per name: concurrent first requests for a cold portfolio load it once
+        self._loading: Dict[str, threading.Lock] = {}
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def names(self) -> List[str]:
+        """Available portfolio names ("default" first)."""
+        names = [DEFAULT_PORTFOLIO]
+        if os.path.isdir(self.portfolios_dir):
+            names += sorted(
+                name[:-4] for name in os.listdir(self.portfolios_dir)
+                if name.endswith(".csv") and name[:-4] != DEFAULT_PORTFOLIO and _NAME_PATTERN.match(name[:-4])
+            )
+        return names
+
+    def path_for(self, name: str) -> str:
+        if name == DEFAULT_PORTFOLIO:
+            return DEFAULT_PORTFOLIO_PATH
+        if not _NAME_PATTERN.match(name):
+            raise ValueError(f"invalid portfolio name {name!r}")
+        return os.path.join(self.portfolios_dir, f"{name}.csv")
+
+    def get(self, name: Optional[str] = None) -> Portfolio:
+        """
+        The loaded portfolio `name` (default: "default"), loading it if it is not resident.
+
+        Args:
+            name (str): Portfolio name
+
+        Returns:
+            Portfolio: Indexed and watched for CSV edits
+
+        Raises:
+            KeyError: No CSV for this portfolio
+        """
+        name = name or DEFAULT_PORTFOLIO
+        with self._lock:
+            portfolio = self._resident.get(name)
+            if portfolio is not None:
+                self._resident.move_to_end(name)
+                self.stats["hits"] += 1
+                return portfolio
+            loader = self._loading.setdefault(name, threading.Lock())
+
+        with loader:
+            with self._lock:
+                portfolio = self._resident.get(name)
+                if portfolio is not None:
+                    self._resident.move_to_end(name)
+                    self.stats["hits"] += 1
+                    return portfolio
+                self.stats["misses"] += 1
+
+            portfolio = self._load(name)
+
+            with self._lock:
+                self._resident[name] = portfolio
+                self._loading.pop(name, None)
+                self._evict(keep=name)
+        return portfolio
+
+    def _load(self, name: str) -> Portfolio:
+        path = self.path_for(name)
+        if not os.path.exists(path):
+            raise KeyError(f"no portfolio named {name!r} ({path})")
+
+        start = time.perf_counter()
+        with tracer.span("portfolio.load_tenant", tenant=name):
+            portfolio = Portfolio(
+                file_path=path,
+                client=self.client or get_chroma_client(),
+                name=None if name == DEFAULT_PORTFOLIO else name,
+                snapshot_dir=self.snapshot_dir,
+            )
+            portfolio.warm_indexes()
+        watch_portfolio(portfolio)
+        print(f"📂 Portfolio '{name}' loaded in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return portfolio
+
+    def _evict(self, keep: str):
+        """Drop least recently used portfolios until the resident set fits in `max_bytes`."""
+        sizes = {name: portfolio.memory_bytes() for name, portfolio in self._resident.items()}
+        total = sum(sizes.values())
+        for name in list(self._resident):
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            del self._resident[name]
+            total -= sizes[name]
+            self.stats["evictions"] += 1
+
+    def evict(self, name: str) -> bool:
+        """Drop `name` from memory (it reloads on next use)."""
+        with self._lock:
+            return self._resident.pop(name, None) is not None
+
+    def resident(self) -> List[Dict]:
+        """Resident portfolios, least recently used first, with their approximate size."""
+        with self._lock:
+            return [
+                {"name": name, "projects": len(portfolio.data), "bytes": portfolio.memory_bytes()}
+                for name, portfolio in self._resident.items()
+            ]
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_portfolio_registry() -> PortfolioRegistry:
+    """Process-wide registry shared by the app, the API and background workers."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = PortfolioRegistry()
+        return _registry
@@ -0,0 +1,381 @@
+import os
+import re
+import time
+import asyncio
+import heapq
+import random
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, Optional
+
+from tracing import tracer
+
+# Call priorities: lower value is served first
+INTERACTIVE = 0
+BATCH = 1
+
+_call_priority = contextvars.ContextVar("call_priority", default=INTERACTIVE)
+# Model of the call `run`/`arun` is making, so response headers update that model's limits
+_current_model = contextvars.ContextVar("rate_limit_model", default=None)
+
+
+@contextmanager
+def call_priority(priority: int):
+    """
+    Run LLM calls in this block with the given priority.
+
+    Usage:
+        with call_priority(BATCH):
+            chain.generate_email_variations(...)
+    """
+    token = _call_priority.set(priority)
+    try:
+        yield
+    finally:
+        _call_priority.reset(token)
+
+
+def parse_reset_duration(value: str) -> float:
+    """Parse Groq reset headers such as '7.66s', '2m59.56s', '1h2m' or '500ms' into seconds."""
+    if not value:
+        return 0.0
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    seconds = 0.0
+    for amount, unit in re.findall(r'([\d.]+)(ms|h|m|s)', value):
+        amount = float(amount)
+        if unit == 'h':
+            seconds += amount * 3600
+        elif unit == 'm':
+            seconds += amount * 60
+        elif unit == 's':
+            seconds += amount
+        else:
+            seconds += amount / 1000
+    return seconds
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at `capacity` per minute."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self._last = time.monotonic()
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / 60.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._last) * self.rate)
+        self._last = now
+
+    def time_until(self, amount: float) -> float:
+        """Seconds until `amount` can be consumed (0 if available now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate if self.rate > 0 else float("inf")
+
+    def consume(self, amount: float):
+        self._refill()
+        self.level -= amount
+
+    def sync(self, limit: Optional[float] = None, remaining: Optional[float] = None):
+        """Align the bucket with server-reported limit/remaining values."""
+        self._refill()
+        if limit:
+            self.capacity = float(limit)
+        if remaining is not None:
+            self.level = min(self.level, float(remaining))
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """True for HTTP 429 errors (groq.RateLimitError, FakeRateLimitError...)."""
+    if getattr(error, "status_code", None) == 429:
+        return True
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None) == 429
+
+
+def _retry_after(error: Exception) -> float:
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after is not None:
+        return float(retry_after)
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    return parse_reset_duration(headers.get("retry-after", ""))
+
+
+class _ModelLimits:
+    """Buckets, pause deadline and waiting callers of one model (Groq limits are per model)."""
+
+    def __init__(self, requests_per_minute: Optional[float], tokens_per_minute: Optional[float]):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.paused_until = 0.0
+        self.waiters = []
+
+    def wait_time(self, tokens: float) -> float:
+        waits = [self.paused_until - time.monotonic()]
+        if self.requests:
+            waits.append(self.requests.time_until(1))
+        if self.tokens:
+            waits.append(self.tokens.time_until(tokens))
+        return max(waits)
+
+    def consume(self, tokens: float):
+        if self.requests:
+            self.requests.consume(1)
+        if self.tokens:
+            self.tokens.consume(tokens)
+
+
+class RateLimitScheduler:
+    """
+    Client-side scheduler shared by every LLM call of a backend.
+
+    - Token buckets on requests/minute and tokens/minute per model (None = unlimited)
+    - Adapts to `x-ratelimit-*` / `retry-after` response headers of each model
+    - Retries 429s with jittered exponential backoff
+    - Serves INTERACTIVE callers before BATCH callers when capacity is scarce
+
+    Groq enforces its limits per model, so every model gets its own buckets,
+    pause and queue: a throttled model doesn't hold back calls to another one.
+    """
+
+    # How often queued async callers re-check whether it is their turn
+    ASYNC_POLL_SECONDS = 0.02
+
+    def __init__(self, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None, max_retries: int = 5,
+                 base_delay: float = 1.0, max_delay: float = 60.0):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._cond = threading.Condition()
+        self._limits: Dict[Optional[str], _ModelLimits] = {}
+        self._sequence = itertools.count()
+
+        self.stats = {"calls": 0, "retries": 0, "rate_limited": 0, "wait_seconds": 0.0}
+
+    @classmethod
+    def from_env(cls) -> "RateLimitScheduler":
+        """Groq free-tier defaults for llama-3.1-8b-instant: 30 requests/min, 6000 tokens/min (per model)."""
+        return cls(
+            requests_per_minute=float(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30")),
+            tokens_per_minute=float(os.getenv("GROQ_TOKENS_PER_MINUTE", "6000")),
+            max_retries=int(os.getenv("GROQ_MAX_RETRIES", "5")),
+        )
+
+    def limits(self, model: Optional[str] = None) -> _ModelLimits:
+        """Limits of `model` (None: calls that don't name a model), created on first use."""
+        with self._cond:
+            limits = self._limits.get(model)
+            if limits is None:
+                limits = self._limits[model] = _ModelLimits(self.requests_per_minute, self.tokens_per_minute)
+            return limits
+
+    def acquire(self, tokens: float = 0, priority: Optional[int] = None, model: Optional[str] = None) -> float:
+        """
+        Block until a request of `tokens` estimated tokens may be sent to `model`.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        if priority is None:
+            priority = _call_priority.get()
+
+        limits = self.limits(model)
+        start = time.monotonic()
+        with self._cond:
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(limits.waiters, ticket)
+            try:
+                while True:
+                    if limits.waiters[0] == ticket:
+                        wait = limits.wait_time(tokens)
+                        if wait <= 0:
+                            limits.consume(tokens)
+                            break
+                        self._cond.wait(timeout=wait)
+                    else:
+                        # Only the head of the queue polls the buckets; others wait their turn
+                        self._cond.wait()
+            finally:
+                limits.waiters.remove(ticket)
+                heapq.heapify(limits.waiters)
+                self._cond.notify_all()
+
+        waited = time.monotonic() - start
+        self.stats["wait_seconds"] += waited
+        return waited
+
+    async def aacquire(self, tokens: float = 0, priority: Optional[int] = None,
+                       model: Optional[str] = None) -> float:
+        """
+        Async `acquire`: waits on the event loop instead of blocking a thread.
+
+        Async and thread callers share one queue per model, so priorities hold across both.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        if priority is None:
+            priority = _call_priority.get()
+
+        limits = self.limits(model)
+        start = time.monotonic()
+        with self._cond:
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(limits.waiters, ticket)
+        try:
+            while True:
+                with self._cond:
+                    if limits.waiters[0] == ticket:
+                        wait = limits.wait_time(tokens)
+                        if wait <= 0:
+                            limits.consume(tokens)
+                            break
+                    else:
+                        # Not our turn yet: poll again shortly
+                        wait = self.ASYNC_POLL_SECONDS
+                await asyncio.sleep(min(wait, self.max_delay))
+        finally:
+            with self._cond:
+                limits.waiters.remove(ticket)
+                heapq.heapify(limits.waiters)
+                self._cond.notify_all()
+
+        waited = time.monotonic() - start
+        self.stats["wait_seconds"] += waited
+        return waited
+
+    def reconcile(self, estimated_tokens: float, actual_tokens: float, model: Optional[str] = None):
+        """Correct the token bucket of `model` once the real usage of a call is known."""
+        limits = self.limits(model)
+        if limits.tokens and actual_tokens:
+            with self._cond:
+                limits.tokens.consume(actual_tokens - estimated_tokens)
+
+    def pause(self, seconds: float, model: Optional[str] = None):
+        """Stop dispatching to `model` for `seconds` (server asked us to back off)."""
+        limits = self.limits(model)
+        with self._cond:
+            limits.paused_until = max(limits.paused_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+    def observe_headers(self, headers: Dict, status_code: int = 200, model: Optional[str] = None):
+        """Adapt the limits of `model` from Groq's rate-limit response headers."""
+        headers = {k.lower(): v for k, v in dict(headers).items()}
+
+        def _number(name):
+            try:
+                return float(headers[name])
+            except (KeyError, ValueError):
+                return None
+
+        limits = self.limits(model)
+        with self._cond:
+            # Tokens are reported per minute
+            if limits.tokens:
+                limits.tokens.sync(_number("x-ratelimit-limit-tokens"),
+                                   _number("x-ratelimit-remaining-tokens"))
+
+            # Requests are reported per day: only pause once the quota is exhausted
+            if _number("x-ratelimit-remaining-requests") == 0:
+                reset = parse_reset_duration(headers.get("x-ratelimit-reset-requests", ""))
+                limits.paused_until = max(limits.paused_until, time.monotonic() + reset)
+
+            if status_code == 429:
+                retry_after = parse_reset_duration(headers.get("retry-after", ""))
+                limits.paused_until = max(limits.paused_until, time.monotonic() + retry_after)
+
+            self._cond.notify_all()
+
+    def observe_response(self, response):
+        """httpx response event hook (see GroqBackend), attributed to the model `run`/`arun` is calling."""
+        self.observe_headers(response.headers, response.status_code, _current_model.get())
+
+    def backoff_delay(self, attempt: int, retry_after: float = 0.0) -> float:
+        """Jittered exponential backoff ("full jitter"), never shorter than retry-after."""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return max(retry_after, random.uniform(0, ceiling))
+
+    def run(self, fn: Callable, estimated_tokens: float = 0, priority: Optional[int] = None,
+            model: Optional[str] = None):
+        """Call `fn` once capacity is available on `model`, retrying rate-limit errors."""
+        attempt = 0
+        while True:
+            self.acquire(estimated_tokens, priority, model)
+            self.stats["calls"] += 1
+            token = _current_model.set(model)
+            try:
+                return fn()
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt >= self.max_retries:
+                    raise
+
+                self.stats["rate_limited"] += 1
+                self.stats["retries"] += 1
+                span = tracer.current_span()
+                if span is not None:
+                    span.add("retries")
+
+                delay = self.backoff_delay(attempt, _retry_after(e))
+                print(f"⏳ Rate limited, retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+                self.pause(delay, model)
+                attempt += 1
+            finally:
+                _current_model.reset(token)
+
+    async def arun(self, fn: Callable[[], Awaitable], estimated_tokens: float = 0,
+                   priority: Optional[int] = None, model: Optional[str] = None):
+        """Async `run`: await `fn()` once capacity is available on `model`, retrying rate-limit errors."""
+        attempt = 0
+        while True:
+            await self.aacquire(estimated_tokens, priority, model)
+            self.stats["calls"] += 1
+            token = _current_model.set(model)
+            try:
+                return await fn()
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt >= self.max_retries:
+                    raise
+
+                self.stats["rate_limited"] += 1
+                self.stats["retries"] += 1
+                span = tracer.current_span()
+                if span is not None:
+                    span.add("retries")
+
+                delay = self.backoff_delay(attempt, _retry_after(e))
+                print(f"⏳ Rate limited, retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+                self.pause(delay, model)
+                attempt += 1
+            finally:
+                _current_model.reset(token)
+
+
+_shared_scheduler = None
+_shared_lock = threading.Lock()
+
+
+def get_scheduler() -> RateLimitScheduler:
+    """Process-wide scheduler shared by every Groq client."""
+    global _shared_scheduler
+    with _shared_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = RateLimitScheduler.from_env()
+        return _shared_scheduler
@@ -0,0 +1,189 @@
+import copy
+import json
+import asyncio
+import inspect
+import hashlib
+import threading
+import functools
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+
+def normalize_text(text: str) -> str:
+    """Case- and whitespace-insensitive form of free text (company names, page text)."""
+    return " ".join(str(text or "").lower().split())
+
+
+def normalize_url(url: str) -> str:
+    """Lowercase scheme/host, drop the fragment and a trailing slash."""
+    try:
+        parts = urlsplit((url or "").strip())
+    except ValueError:
+        return url or ""
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ''))
+
+
+def digest(value) -> str:
+    """Short stable digest of any JSON-serializable input (long texts, dicts, lists)."""
+    if not isinstance(value, str):
+        value = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()[:32]
+
+
+class _LeaderAborted(Exception):
+    """The leading call was cancelled or interrupted: followers run the call again."""
+
+
+class SingleFlight:
+    """
+    In-process request coalescing.
+
+    While a call for `key` is in flight, identical calls from other threads
+    (other Streamlit sessions, parallel jobs) wait on the same future
+    instead of repeating the network/LLM round-trip. Nothing is cached once
+    the call completes. Errors raised by the call are shared with the
+    waiting callers; if the leading caller is cancelled (or interrupted),
+    they retry instead, one of them becoming the new leader.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "executions": 0, "coalesced": 0, "errors": 0}
+
+    def _join(self, key: Hashable):
+        """(future, leader): the in-flight future for `key`, created (and led) if there is none."""
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                # Running futures can't be cancelled: a cancelled follower must not cancel everyone's call
+                future.set_running_or_notify_cancel()
+                self._in_flight[key] = future
+                self.stats["executions"] += 1
+            else:
+                self.stats["coalesced"] += 1
+        return future, leader
+
+    def _finish(self, key: Hashable, future: Future, result=None, error: Optional[BaseException] = None):
+        with self._lock:
+            del self._in_flight[key]
+            if isinstance(error, Exception):
+                self.stats["errors"] += 1
+        if error is None:
+            future.set_result(result)
+        elif isinstance(error, Exception):
+            future.set_exception(error)
+        else:
+            # CancelledError, KeyboardInterrupt...: the leader's own fate, not the call's result
+            future.set_exception(_LeaderAborted())
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs):
+        with self._lock:
+            self.stats["calls"] += 1
+
+        while True:
+            future, leader = self._join(key)
+            if not leader:
+                try:
+                    # Followers get their own copy: callers may mutate returned dicts/lists
+                    return copy.deepcopy(future.result())
+                except _LeaderAborted:
+                    continue
+
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                self._finish(key, future, error=e)
+                raise
+            self._finish(key, future, result=result)
+            return result
+
+    async def ado(self, key: Hashable, fn: Callable, *args, **kwargs):
+        """Async `do`: `fn` is a coroutine function; sync and async callers share in-flight calls."""
+        with self._lock:
+            self.stats["calls"] += 1
+
+        while True:
+            future, leader = self._join(key)
+            if not leader:
+                try:
+                    return copy.deepcopy(await asyncio.wrap_future(future))
+                except _LeaderAborted:
+                    continue
+
+            try:
+                result = await fn(*args, **kwargs)
+            except BaseException as e:
+                self._finish(key, future, error=e)
+                raise
+            self._finish(key, future, result=result)
+            return result
+
+
+# Every coalescing group, for the diagnostics panel
+_groups: Dict[str, SingleFlight] = {}
+_groups_lock = threading.Lock()
+
+
+def get_group(name: str) -> SingleFlight:
+    with _groups_lock:
+        if name not in _groups:
+            _groups[name] = SingleFlight(name)
+        return _groups[name]
+
+
+def single_flight(name: str, key: Optional[Callable] = None, method: bool = False):
+    """
+    Decorator coalescing concurrent identical calls (plain or coroutine functions).
+
+    Usage:
+        @single_flight("scrape_job_page", key=lambda url, timeout=10: normalize_url(url))
+        def scrape_job_page(url, timeout=10): ...
+
+    Args:
+        name (str): Group name reported in the metrics
+        key (callable): Builds the coalescing key from the call arguments
+                        (default: the arguments themselves, which must be hashable)
+        method (bool): Decorating a method; instead of `self`, the key holds the instance's
+                       `flight_scope` (default: the instance itself), so instances that give
+                       the same results (one Chain per session, same backend) share in-flight calls
+    """
+    group = get_group(name)
+
+    def call_key(args, kwargs):
+        key_args = args[1:] if method else args
+        call = key(*key_args, **kwargs) if key else (key_args, tuple(sorted(kwargs.items())))
+        if not method:
+            return call
+        return getattr(args[0], "flight_scope", id(args[0])), call
+
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                return await group.ado(call_key(args, kwargs), fn, *args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return group.do(call_key(args, kwargs), fn, *args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def single_flight_stats() -> List[Dict]:
+    """
+    🆕 V4 FEATURE: Coalescing metrics per group.
+
+    Returns:
+        list: [{"name", "calls", "executions", "coalesced", "errors"}]
+    """
+    with _groups_lock:
+        groups = list(_groups.values())
+    return [{"name": group.name, **group.stats} for group in groups]
@@ -0,0 +1,224 @@
+"""
+Skill normalization and fuzzy lookup over a portfolio's skill vocabulary.
+
+Skills are compared by key: lowercased, parentheses and separators
+removed ("React.js", "ReactJS" and "react js" are all "reactjs"), then
+mapped through the alias table ("reactjs" -> "react", "postgres" ->
+"postgresql"). Keys with no exact match fall back to the closest vocabulary
+key (rapidfuzz when installed, otherwise a trigram index), so typos such
+as "Kubernets" still match. Every resolution, including misses, is cached.
+
+Without rapidfuzz, trigrams shortlist the candidates and difflib scores
+them with the same ratio as `rapidfuzz.fuzz.ratio`.
+"""
+import os
+import re
+import json
+import difflib
+import threading
+from typing import Dict, List, Optional
+
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:
+    fuzz = process = None
+
+# Minimum similarity (0-1) for a fuzzy match; keys shorter than FUZZY_MIN_LENGTH only match exactly.
+# 0.85 accepts "kubernets" / "javascrpt" but not "mssql" for "mysql"
+FUZZY_THRESHOLD = float(os.getenv("SKILL_FUZZY_THRESHOLD", "0.85"))
+FUZZY_MIN_LENGTH = 4
+
+# Trigram fallback: vocabulary keys sharing the most trigrams that are scored with difflib
+FUZZY_CANDIDATES = 20
+
+# Resolved lookups kept per index (the cache is cleared when full)
+CACHE_SIZE = 4096
+
+# Canonical skill -> other names for it. Extend with a JSON file of the same shape (SKILL_ALIASES_PATH)
+SKILL_ALIASES = {
+    "JavaScript": ["JS", "ECMAScript", "ES6"],
+    "TypeScript": ["TS"],
+    "React": ["ReactJS", "React.js"],
+    "Vue": ["VueJS", "Vue.js"],
+    "Angular": ["AngularJS"],
+    "Node": ["NodeJS", "Node.js"],
+    "Next": ["NextJS", "Next.js"],
+    "Python": ["Python3", "Py"],
+    "Go": ["Golang"],
+    "C#": ["CSharp"],
+    "C++": ["CPP"],
+    ".NET": ["dotnet", ".NET Core"],
+    "PostgreSQL": ["Postgres", "psql", "pgsql"],
+    "MongoDB": ["Mongo"],
+    "DynamoDB": ["Dynamo"],
+    "Elasticsearch": ["Elastic"],
+    "Kubernetes": ["K8s", "kube"],
+    "AWS": ["Amazon Web Services"],
+    "GCP": ["Google Cloud", "Google Cloud Platform"],
+    "Azure": ["Microsoft Azure"],
+    "GraphQL": ["GQL"],
+    "TailwindCSS": ["Tailwind"],
+    "scikit-learn": ["sklearn"],
+    "Machine Learning": ["ML"],
+}
+
+_SEPARATORS = re.compile(r"[\s._\-/]+")
+_PARENTHESES = re.compile(r"\([^)]*\)")
+# Delimiters between skills in a TechStack cell
+_SKILL_DELIMITERS = re.compile(r"[,;|/]")
+
+
+def _key(skill: str) -> str:
+    return _SEPARATORS.sub("", _PARENTHESES.sub("", str(skill).lower()))
+
+
+def _load_aliases() -> Dict[str, str]:
+    aliases = dict(SKILL_ALIASES)
+    path = os.getenv("SKILL_ALIASES_PATH")
+    if path:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                aliases.update(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Skill aliases not loaded from {path}: {e}")
+
+    table = {}
+    for canonical, names in aliases.items():
+        for name in names:
+            table[_key(name)] = _key(canonical)
+    return table
+
+
+_ALIASES = _load_aliases()
+
+
+def skill_key(skill: str) -> str:
+    """
+    Normalized key of a skill: "ReactJS", "React.js" and "react" all give "react".
+
+    Args:
+        skill (str): Skill name
+
+    Returns:
+        str: Comparison key ("" for an empty skill)
+    """
+    key = _key(skill)
+    return _ALIASES.get(key, key)
+
+
+def split_skills(tech_stack: str) -> List[str]:
+    """Individual skills of a TechStack cell ("Python, FastAPI / AWS (Lambda)")."""
+    skills = []
+    for skill in _SKILL_DELIMITERS.split(str(tech_stack)):
+        # Clean and normalize; remove parentheses content
+        skill = _PARENTHESES.sub("", skill.strip()).strip()
+        # Skip empty or very short strings
+        if len(skill) > 1 and not skill.isdigit():
+            skills.append(skill)
+    return skills
+
+
+def _trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SkillIndex:
+    """
+    Resolves job skills to a portfolio's own skill names.
+
+    Args:
+        vocabulary (list): Portfolio skills (`Portfolio.extract_all_skills()`)
+        documents (list): Optional TechStack cells, for `positions` (which rows use a skill)
+    """
+
+    def __init__(self, vocabulary: List[str], documents: Optional[List[str]] = None):
+        self.vocabulary = vocabulary
+        self._skills_by_key: Dict[str, str] = {}
+        for skill in vocabulary:
+            self._skills_by_key.setdefault(skill_key(skill), skill)
+        self._skills_by_key.pop("", None)
+        self._keys = list(self._skills_by_key)
+
+        # Trigram postings for the fuzzy fallback when rapidfuzz is not installed
+        self._trigram_postings: Dict[str, List[int]] = {}
+        if process is None:
+            for i, key in enumerate(self._keys):
+                for gram in _trigrams(key):
+                    self._trigram_postings.setdefault(gram, []).append(i)
+
+        # Key -> positions of the documents listing that skill
+        self._positions: Dict[str, List[int]] = {}
+        for position, document in enumerate(documents or []):
+            for skill in split_skills(document):
+                positions = self._positions.setdefault(skill_key(skill), [])
+                if not positions or positions[-1] != position:
+                    positions.append(position)
+
+        self._cache: Dict[str, Optional[str]] = {}
+        self._cache_lock = threading.Lock()
+        self.stats = {"lookups": 0, "cache_hits": 0, "fuzzy": 0}
+
+    def _closest_key(self, key: str) -> Optional[str]:
+        if len(key) < FUZZY_MIN_LENGTH or not self._keys:
+            return None
+
+        if process is not None:
+            best = process.extractOne(key, self._keys, scorer=fuzz.ratio, score_cutoff=FUZZY_THRESHOLD * 100)
+            return best[0] if best else None
+
+        shared = {}
+        for gram in _trigrams(key):
+            for i in self._trigram_postings.get(gram, ()):
+                shared[i] = shared.get(i, 0) + 1
+        candidates = sorted(shared, key=shared.get, reverse=True)[:FUZZY_CANDIDATES]
+
+        best, best_score = None, FUZZY_THRESHOLD
+        matcher = difflib.SequenceMatcher(b=key, autojunk=False)
+        for i in candidates:
+            matcher.set_seq1(self._keys[i])
+            score = matcher.ratio()
+            if score > best_score or (score == best_score and best is None):
+                best, best_score = self._keys[i], score
+        return best
+
+    def resolve_key(self, skill: str) -> Optional[str]:
+        """Vocabulary key `skill` resolves to (exact, alias or fuzzy), or None."""
+        key = skill_key(skill)
+        with self._cache_lock:
+            self.stats["lookups"] += 1
+            if key in self._cache:
+                self.stats["cache_hits"] += 1
+                return self._cache[key]
+
+        resolved = key if key in self._skills_by_key else self._closest_key(key)
+
+        with self._cache_lock:
+            if resolved is not None and resolved != key:
+                self.stats["fuzzy"] += 1
+            if len(self._cache) >= CACHE_SIZE:
+                self._cache.clear()
+            self._cache[key] = resolved
+        return resolved
+
+    def resolve(self, skill: str) -> Optional[str]:
+        """Portfolio skill name matching `skill`, or None."""
+        key = self.resolve_key(skill)
+        return self._skills_by_key[key] if key is not None else None
+
+    def match(self, skills: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Resolve a job's whole skill list.
+
+        Args:
+            skills (list): Job skills
+
+        Returns:
+            dict: {job skill: matching portfolio skill or None}
+        """
+        return {skill: self.resolve(skill) for skill in skills}
+
+    def positions(self, skill: str) -> Optional[List[int]]:
+        """Positions of the documents listing `skill` (None when the skill does not resolve)."""
+        key = self.resolve_key(skill)
+        return self._positions.get(key, []) if key is not None else None
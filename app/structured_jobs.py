@@ -0,0 +1,358 @@
+import re
+import json
+import html
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+from bs4 import BeautifulSoup
+
+from utils import fetch_page, html_to_text
+from matching import get_matcher
+from tracing import tracer
+from job_store import JobStore, get_job_store
+from single_flight import single_flight, normalize_url
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+# Structured descriptions are full postings; keep about what `extract_jobs` would return
+MAX_DESCRIPTION_CHARS = 1500
+
+# Skills recognized in ATS descriptions (JSON-LD postings may list their own)
+TECH_SKILLS = [
+    "Python", "Java", "JavaScript", "TypeScript", "Go", "Golang", "Rust", "C++", "C#", "Ruby",
+    "PHP", "Scala", "Kotlin", "Swift", "SQL", "R", "React", "React Native", "Angular", "Vue.js",
+    "Next.js", "Node.js", "Django", "Flask", "FastAPI", "Spring Boot", "Rails", ".NET",
+    "GraphQL", "REST", "gRPC", "PostgreSQL", "MySQL", "MongoDB", "Redis", "Elasticsearch",
+    "DynamoDB", "Cassandra", "Snowflake", "BigQuery", "Kafka", "Spark", "Airflow", "dbt",
+    "AWS", "Azure", "GCP", "Docker", "Kubernetes", "Terraform", "Ansible", "Jenkins",
+    "CI/CD", "Linux", "Git", "TensorFlow", "PyTorch", "scikit-learn", "Pandas", "NumPy",
+    "Machine Learning", "Deep Learning", "NLP", "Computer Vision", "LLM", "MLOps",
+    "Tableau", "Power BI", "Figma",
+]
+_CANONICAL_SKILLS = {" ".join(skill.lower().split()): skill for skill in TECH_SKILLS}
+
+_EXPERIENCE_PATTERN = re.compile(
+    r'\b(\d{1,2}\s*(?:\+|(?:-|–|to)\s*\d{1,2})?\s*\+?\s*years?)', re.IGNORECASE
+)
+
+
+def _skills_from_text(text: str) -> List[str]:
+    found = get_matcher(TECH_SKILLS).matches(text)
+    return [skill for normalized, skill in _CANONICAL_SKILLS.items() if normalized in found]
+
+
+def _experience_from_text(text: str) -> str:
+    match = _EXPERIENCE_PATTERN.search(text or "")
+    return " ".join(match.group(1).split()) if match else "Not specified"
+
+
+def _plain_text(value: str) -> str:
+    """
+    Text of an HTML description (ATS APIs sometimes entity-escape it).
+
+    Punctuation is kept, unlike `clean_text`, so skills such as C++ or
+    Node.js are still recognized.
+    """
+    soup = BeautifulSoup(html.unescape(value or ""), 'html.parser')
+    return " ".join(soup.get_text(separator=' ').split())
+
+
+def to_job_data(role: str, description: str, skills: Optional[List[str]] = None,
+                experience: Optional[str] = None, **extra) -> Dict:
+    """
+    Map structured posting fields to the `Chain.extract_jobs` output shape.
+
+    Args:
+        role (str): Job title
+        description (str): Plain-text job description
+        skills (list): Skills from the posting (detected in the description if missing)
+        experience (str): Experience requirement (detected in the description if missing)
+        **extra: Additional fields kept as is (company, location)
+
+    Returns:
+        dict: {"role", "experience", "skills", "description", ...}
+    """
+    job_data = {
+        "role": role or "",
+        "experience": experience or _experience_from_text(description),
+        "skills": skills or _skills_from_text(f"{role} {description}"),
+        "description": (description or "")[:MAX_DESCRIPTION_CHARS],
+    }
+    job_data.update({key: value for key, value in extra.items() if value})
+    return job_data
+
+
+class ATSAdapter:
+    """
+    Base class for public applicant tracking system board APIs.
+
+    Subclasses map a posting URL to its JSON API endpoint and the JSON
+    response to `extract_jobs` fields.
+    """
+
+    name = "base"
+    # Public API host; pass `api_base` to point an adapter elsewhere (e.g. a local fixture server)
+    api_base = ""
+    url_pattern = None
+
+    def __init__(self, api_base: Optional[str] = None):
+        self.api_base = (api_base or self.api_base).rstrip('/')
+
+    def match(self, url: str) -> Optional[re.Match]:
+        address = re.sub(r'^https?://', '', url or "", flags=re.IGNORECASE)
+        return self.url_pattern.match(address) if self.url_pattern else None
+
+    def api_url(self, match: re.Match) -> str:
+        raise NotImplementedError
+
+    def parse(self, data, match: re.Match) -> Optional[Tuple[Dict, str]]:
+        """Returns (job_data, plain description) or None if the posting is missing."""
+        raise NotImplementedError
+
+    def fetch(self, url: str, timeout: int = 10) -> Optional[Tuple[Dict, str]]:
+        """
+        Returns:
+            tuple: (job_data, plain description) or None if the URL is not from this ATS
+        """
+        match = self.match(url)
+        if not match:
+            return None
+
+        with tracer.span(f"ats.{self.name}", url=url) as span:
+            response = requests.get(self.api_url(match), headers=HEADERS, timeout=timeout)
+            response.raise_for_status()
+            span.set("bytes", len(response.content))
+            result = self.parse(response.json(), match)
+            span.set("found", result is not None)
+        return result
+
+
+# Registered adapters, tried in order for every posting URL
+ATS_ADAPTERS: List[ATSAdapter] = []
+
+
+def register_adapter(adapter_cls):
+    """Class decorator adding an ATS adapter to structured ingestion."""
+    ATS_ADAPTERS.append(adapter_cls())
+    return adapter_cls
+
+
+@register_adapter
+class GreenhouseAdapter(ATSAdapter):
+    name = "greenhouse"
+    api_base = "https://boards-api.greenhouse.io"
+    url_pattern = re.compile(
+        r'(?:job-)?boards(?:\.eu)?\.greenhouse\.io/(?P<board>[\w-]+)/jobs/(?P<id>\d+)', re.IGNORECASE
+    )
+
+    def api_url(self, match):
+        return f"{self.api_base}/v1/boards/{match['board']}/jobs/{match['id']}"
+
+    def parse(self, data, match):
+        description = _plain_text(data.get('content', ''))
+        return to_job_data(
+            data.get('title', ''), description,
+            company=data.get('company_name'),
+            location=(data.get('location') or {}).get('name'),
+        ), description
+
+
+@register_adapter
+class LeverAdapter(ATSAdapter):
+    name = "lever"
+    api_base = "https://api.lever.co"
+    url_pattern = re.compile(
+        r'jobs(?:\.eu)?\.lever\.co/(?P<company>[\w.-]+)/(?P<id>[0-9a-f-]{36})', re.IGNORECASE
+    )
+
+    def api_url(self, match):
+        return f"{self.api_base}/v0/postings/{match['company']}/{match['id']}"
+
+    def parse(self, data, match):
+        sections = [data.get('descriptionPlain', '')]
+        for section in data.get('lists', []):
+            sections.append(f"{section.get('text', '')}: {_plain_text(section.get('content', ''))}")
+        sections.append(data.get('additionalPlain', ''))
+        description = " ".join(" ".join(sections).split())
+
+        return to_job_data(
+            data.get('text', ''), description,
+            company=match['company'].replace('-', ' ').title(),
+            location=(data.get('categories') or {}).get('location'),
+        ), description
+
+
+@register_adapter
+class AshbyAdapter(ATSAdapter):
+    name = "ashby"
+    api_base = "https://api.ashbyhq.com"
+    url_pattern = re.compile(
+        r'jobs\.ashbyhq\.com/(?P<org>[\w.-]+)/(?P<id>[0-9a-f-]{36})', re.IGNORECASE
+    )
+
+    def api_url(self, match):
+        # The public board API lists every posting of the organization
+        return f"{self.api_base}/posting-api/job-board/{match['org']}"
+
+    def parse(self, data, match):
+        posting = next((job for job in data.get('jobs', []) if job.get('id') == match['id']), None)
+        if posting is None:
+            return None
+
+        description = posting.get('descriptionPlain') or _plain_text(posting.get('descriptionHtml', ''))
+        description = " ".join(description.split())
+        return to_job_data(
+            posting.get('title', ''), description,
+            company=match['org'].replace('-', ' ').title(),
+            location=posting.get('location'),
+        ), description
+
+
+def _json_ld_objects(data) -> List[Dict]:
+    """Flatten JSON-LD documents (lists and @graph containers) into objects."""
+    if isinstance(data, list):
+        return [obj for item in data for obj in _json_ld_objects(item)]
+    if isinstance(data, dict):
+        if '@graph' in data:
+            return _json_ld_objects(data['@graph'])
+        return [data]
+    return []
+
+
+def _is_job_posting(obj: Dict) -> bool:
+    types = obj.get('@type', [])
+    return 'JobPosting' in (types if isinstance(types, list) else [types])
+
+
+def parse_json_ld_job(page_html) -> Optional[Dict]:
+    """
+    🆕 V4 FEATURE: Read a schema.org `JobPosting` embedded as JSON-LD.
+
+    Args:
+        page_html (str, bytes or BeautifulSoup): Job page HTML
+
+    Returns:
+        dict: `extract_jobs`-shaped job data, or None if the page has no JobPosting
+    """
+    soup = page_html if isinstance(page_html, BeautifulSoup) else BeautifulSoup(page_html, 'html.parser')
+
+    for script in soup.find_all('script', type='application/ld+json'):
+        try:
+            data = json.loads(script.string or "")
+        except ValueError:
+            continue
+
+        posting = next((obj for obj in _json_ld_objects(data) if _is_job_posting(obj)), None)
+        if posting is None:
+            continue
+
+        skills = posting.get('skills')
+        if isinstance(skills, str):
+            skills = [s.strip() for s in re.split(r'[,;\n]', skills) if s.strip()]
+
+        experience = posting.get('experienceRequirements')
+        if isinstance(experience, dict):
+            try:
+                months = int(float(experience.get('monthsOfExperience')))
+            except (TypeError, ValueError, OverflowError):
+                # Missing or free text ("3+", "three"): use the description instead
+                months = None
+            if months and months >= 12:
+                experience = f"{months // 12}+ years"
+            elif months and months > 0:
+                experience = f"{months}+ months"
+            else:
+                experience = experience.get('description')
+
+        organization = posting.get('hiringOrganization')
+        address = posting.get('jobLocation')
+        if isinstance(address, list):
+            address = address[0] if address else None
+        if isinstance(address, dict):
+            address = address.get('address', address)
+        location = address.get('addressLocality') if isinstance(address, dict) else address
+
+        return to_job_data(
+            posting.get('title', ''), _plain_text(posting.get('description', '')),
+            skills=skills or None,
+            experience=experience if isinstance(experience, str) else None,
+            company=organization.get('name') if isinstance(organization, dict) else organization,
+            location=location if isinstance(location, str) else None,
+        )
+
+    return None
+
+
+@single_flight(
+    "fetch_job_posting",
+    key=lambda url, timeout=10, adapters=None: (normalize_url(url), id(adapters) if adapters is not None else None)
+)
+def fetch_job_posting(url: str, timeout: int = 10,
+                      adapters: Optional[List[ATSAdapter]] = None) -> Tuple[Optional[Dict], Optional[str], str]:
+    """
+    🆕 V4 FEATURE: Fetch a posting as structured data whenever possible.
+
+    Tries the ATS board APIs first (small JSON responses), then a single
+    size-capped page download (`fetch_page`, read to the end since JSON-LD
+    is often placed after the description) that is checked for JSON-LD
+    before falling back to the cleaned page text for LLM extraction.
+
+    Args:
+        url (str): Job posting URL
+        timeout (int): Request timeout in seconds
+        adapters (list): ATS adapters to try (default: every registered adapter)
+
+    Returns:
+        tuple: (job_data or None, page text or None, method) where method is
+               the adapter name, "json-ld", "html" (needs extraction) or "failed"
+    """
+    for adapter in (adapters if adapters is not None else ATS_ADAPTERS):
+        try:
+            result = adapter.fetch(url, timeout=timeout)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"⚠️ {adapter.name} API unavailable for {url}, falling back to the page: {e}")
+            break
+        if result is not None:
+            job_data, text = result
+            return job_data, text, adapter.name
+
+    try:
+        with tracer.span("scrape.job_page", url=url) as span:
+            # Whole page (up to the size cap): JSON-LD may come after the description
+            content = fetch_page(url, timeout=timeout, headers=HEADERS, stop_at=None)
+            if content is None:
+                return None, None, "failed"
+            # One parse for both: JSON-LD is read before scripts are stripped for the text
+            soup = BeautifulSoup(content, 'html.parser')
+            job_data = parse_json_ld_job(soup)
+            text = html_to_text(soup)
+            span.set("json_ld", job_data is not None)
+    except requests.exceptions.RequestException as e:
+        print(f"Error scraping {url}: {str(e)}")
+        return None, None, "failed"
+
+    return job_data, text, ("json-ld" if job_data else "html")
+
+
+def ingest_job_url(url: str, extractor: Callable[[str], Dict], store: Optional[JobStore] = None,
+                   timeout: int = 10) -> Tuple[Dict, Optional[str], str]:
+    """
+    🆕 V4 FEATURE: Fetch and ingest a posting, calling `extractor` only without structured data.
+
+    Args:
+        url (str): Job posting URL
+        extractor (callable): Text -> structured job data (typically `Chain.extract_jobs`)
+        store (JobStore): Job store (default: the shared store)
+        timeout (int): Request timeout in seconds
+
+    Returns:
+        tuple: (job_data, page text or None if the fetch failed, method)
+    """
+    job_data, text, method = fetch_job_posting(url, timeout=timeout)
+    if text is None:
+        return {}, None, method
+
+    job_data, _ = (store or get_job_store()).ingest_page(url, text, extractor, structured_data=job_data)
+    return job_data, text, method
@@ -0,0 +1,444 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from tracing import tracer
+from rate_limiter import call_priority, BATCH
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+
+class TaskCancelled(Exception):
+    """Raised inside a task handler when cancellation was requested."""
+
+
+class TaskQueue:
+    """
+    Persistent SQLite task queue shared by the app and its workers.
+
+    Tasks survive Streamlit reruns and restarts: workers heartbeat while
+    they run, tasks whose worker died are re-queued, and handlers persist
+    per-step checkpoints (`state`) so a resumed task skips finished steps.
+    Several worker processes can share one database file.
+    """
+
+    def __init__(self, path: str = "cache/tasks.db", stale_after: float = 300, max_attempts: int = 3):
+        self.path = path
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Autocommit; `claim` takes the write lock explicitly so workers in
+        # other processes never claim the same task
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                progress REAL DEFAULT 0,
+                stage TEXT DEFAULT '',
+                state TEXT DEFAULT '{}',
+                result TEXT,
+                error TEXT,
+                cancel_requested INTEGER DEFAULT 0,
+                attempts INTEGER DEFAULT 0,
+                worker TEXT,
+                created_at REAL,
+                started_at REAL,
+                heartbeat_at REAL,
+                finished_at REAL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks(status, created_at)")
+
+    @classmethod
+    def from_env(cls) -> "TaskQueue":
+        return cls(
+            path=os.getenv("TASK_QUEUE_PATH", "cache/tasks.db"),
+            stale_after=float(os.getenv("TASK_STALE_SECONDS", "300")),
+        )
+
+    def _row(self, row) -> Optional[Dict]:
+        if row is None:
+            return None
+        task = dict(row)
+        task['payload'] = json.loads(task['payload'])
+        task['state'] = json.loads(task['state'] or '{}')
+        task['result'] = json.loads(task['result']) if task['result'] else None
+        task['cancel_requested'] = bool(task['cancel_requested'])
+        return task
+
+    def submit(self, kind: str, payload: Dict) -> str:
+        """Queue a task; returns its id."""
+        task_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO tasks (id, kind, payload, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                (task_id, kind, json.dumps(payload), QUEUED, time.time())
+            )
+        return task_id
+
+    def get(self, task_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return self._row(row)
+
+    def list_tasks(self, kind: Optional[str] = None, limit: int = 20) -> List[Dict]:
+        """Most recent tasks first."""
+        sql = "SELECT * FROM tasks"
+        params = []
+        if kind:
+            sql += " WHERE kind = ?"
+            params.append(kind)
+        sql += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._row(row) for row in rows]
+
+    def cancel(self, task_id: str) -> bool:
+        """
+        Cancel a task: queued tasks stop immediately, running tasks at their
+        next progress report.
+
+        Returns:
+            bool: False if the task had already finished
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE tasks SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+                (CANCELLED, now, task_id, QUEUED)
+            )
+            if cursor.rowcount:
+                return True
+            cursor = self._conn.execute(
+                "UPDATE tasks SET cancel_requested = 1 WHERE id = ? AND status = ?",
+                (task_id, RUNNING)
+            )
+            return bool(cursor.rowcount)
+
+    def claim(self, worker: str) -> Optional[Dict]:
+        """Atomically take the oldest queued task."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id FROM tasks WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    """
+                    UPDATE tasks SET status = ?, worker = ?, attempts = attempts + 1,
+                                     started_at = ?, heartbeat_at = ?
+                    WHERE id = ?
+                    """,
+                    (RUNNING, worker, now, now, row['id'])
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self.get(row['id'])
+
+    def report(self, task_id: str, progress: float, stage: str, state: Optional[Dict] = None) -> bool:
+        """
+        Record progress (and optionally the checkpoint state); doubles as heartbeat.
+
+        Returns:
+            bool: True if cancellation was requested
+        """
+        sql = "UPDATE tasks SET progress = ?, stage = ?, heartbeat_at = ?"
+        params = [progress, stage, time.time()]
+        if state is not None:
+            sql += ", state = ?"
+            params.append(json.dumps(state))
+        sql += " WHERE id = ?"
+        params.append(task_id)
+
+        with self._lock:
+            self._conn.execute(sql, params)
+            row = self._conn.execute("SELECT cancel_requested FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return bool(row and row['cancel_requested'])
+
+    def heartbeat(self, task_id: str, worker: str) -> bool:
+        """
+        Renew `worker`'s lease on a running task, so long steps are not mistaken for a lost worker.
+
+        Returns:
+            bool: False if the task is no longer running on this worker
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE tasks SET heartbeat_at = ? WHERE id = ? AND status = ? AND worker = ?",
+                (time.time(), task_id, RUNNING, worker)
+            )
+        return bool(cursor.rowcount)
+
+    def _finish(self, task_id: str, worker: str, status: str, result=None, error: Optional[str] = None) -> bool:
+        """
+        Record the outcome of `worker`'s run of a task.
+
+        Returns:
+            bool: False if the task is no longer running on this worker (its lease
+            expired and another worker reclaimed it), in which case nothing is written
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                """
+                UPDATE tasks SET status = ?, result = ?, error = ?, finished_at = ?,
+                                 progress = CASE WHEN ? = 'done' THEN 1 ELSE progress END
+                WHERE id = ? AND status = ? AND worker = ?
+                """,
+                (status, json.dumps(result) if result is not None else None, error,
+                 time.time(), status, task_id, RUNNING, worker)
+            )
+        return bool(cursor.rowcount)
+
+    def complete(self, task_id: str, worker: str, result) -> bool:
+        return self._finish(task_id, worker, DONE, result=result)
+
+    def fail(self, task_id: str, worker: str, error: str) -> bool:
+        return self._finish(task_id, worker, FAILED, error=error)
+
+    def mark_cancelled(self, task_id: str, worker: str) -> bool:
+        return self._finish(task_id, worker, CANCELLED)
+
+    def requeue_stale(self) -> int:
+        """
+        Re-queue running tasks whose worker stopped heartbeating (crash or
+        restart); tasks that already used `max_attempts` fail instead.
+
+        Returns:
+            int: Number of tasks re-queued
+        """
+        cutoff = time.time() - self.stale_after
+        with self._lock:
+            self._conn.execute(
+                """
+                UPDATE tasks SET status = ?, error = 'worker lost too many times', finished_at = ?
+                WHERE status = ? AND heartbeat_at < ? AND attempts >= ?
+                """,
+                (FAILED, time.time(), RUNNING, cutoff, self.max_attempts)
+            )
+            cursor = self._conn.execute(
+                "UPDATE tasks SET status = ?, worker = NULL WHERE status = ? AND heartbeat_at < ?",
+                (QUEUED, RUNNING, cutoff)
+            )
+        if cursor.rowcount:
+            print(f"♻️ Re-queued {cursor.rowcount} interrupted task(s)")
+        return cursor.rowcount
+
+
+class TaskContext:
+    """What a task handler sees: payload, checkpoint state, worker resources, progress reporting."""
+
+    def __init__(self, queue: TaskQueue, task: Dict, resources: Dict):
+        self.queue = queue
+        self.task_id = task['id']
+        self.payload = task['payload']
+        self.state = task['state']
+        self.resources = resources
+        self._fraction = task['progress'] or 0.0
+
+    def progress(self, fraction: float, stage: str):
+        """Report progress; raises TaskCancelled if the task was cancelled."""
+        self._fraction = fraction
+        if self.queue.report(self.task_id, fraction, stage, self.state):
+            raise TaskCancelled(self.task_id)
+
+    def step(self, name: str, fn: Callable, progress: float, stage: str = ""):
+        """
+        Run one resumable step: its result is checkpointed, so a task resumed
+        after a restart returns it without running `fn` again.
+        """
+        if name not in self.state:
+            self.progress(self._fraction, stage or name)
+            self.state[name] = fn()
+        self.progress(progress, stage or name)
+        return self.state[name]
+
+
+# Task handlers by kind: handler(ctx: TaskContext) -> JSON-serializable result
+TASK_HANDLERS: Dict[str, Callable] = {}
+
+
+def register_task(kind: str):
+    """
+    Decorator registering the handler for a task kind.
+
+    Usage:
+        @register_task("campaign")
+        def campaign_task(ctx): ...
+    """
+    def decorator(fn):
+        TASK_HANDLERS[kind] = fn
+        return fn
+    return decorator
+
+
+class Worker:
+    """
+    Executes queued tasks, in a thread of the app process (`start_workers`)
+    or in a standalone process (`python app/worker.py`).
+
+    While a task runs, a background thread renews its lease every
+    `heartbeat_interval` seconds (default: a third of the queue's
+    `stale_after`), so a step that outlasts `stale_after` (e.g. rate-limited
+    LLM calls) is not re-queued and run twice by another worker.
+    """
+
+    def __init__(self, queue: TaskQueue, resources: Optional[Callable[[], Dict]] = None,
+                 poll_interval: float = 1.0, name: Optional[str] = None,
+                 heartbeat_interval: Optional[float] = None):
+        self.queue = queue
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval or queue.stale_after / 3
+        self.name = name or f"worker-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._resources_factory = resources or dict
+        self._resources = None
+
+    def run_once(self) -> bool:
+        """Run one queued task, if any; returns False when the queue is empty."""
+        task = self.queue.claim(self.name)
+        if task is None:
+            return False
+
+        handler = TASK_HANDLERS.get(task['kind'])
+        if handler is None:
+            self.queue.fail(task['id'], self.name, f"no handler for task kind '{task['kind']}'")
+            return True
+
+        if self._resources is None:
+            self._resources = self._resources_factory()
+
+        with tracer.span(f"task.{task['kind']}", task_id=task['id'], attempt=task['attempts']) as span:
+            try:
+                # Background work yields LLM capacity to interactive callers
+                with self._lease(task['id']), call_priority(BATCH):
+                    result = handler(TaskContext(self.queue, task, self._resources))
+            except TaskCancelled:
+                span.set("cancelled", True)
+                if self.queue.mark_cancelled(task['id'], self.name):
+                    print(f"🛑 Task {task['id']} cancelled")
+                else:
+                    self._lost(task['id'])
+                return True
+            except Exception as e:
+                span.set("error", str(e))
+                if self.queue.fail(task['id'], self.name, str(e)):
+                    print(f"❌ Task {task['id']} failed: {e}")
+                else:
+                    self._lost(task['id'])
+                return True
+
+        if not self.queue.complete(task['id'], self.name, result):
+            self._lost(task['id'])
+        return True
+
+    def _lost(self, task_id: str):
+        print(f"⚠️ {self.name}: lost the lease on task {task_id}, discarding its outcome")
+
+    @contextmanager
+    def _lease(self, task_id: str):
+        """Heartbeat `task_id` from a background thread while the block runs."""
+        done = threading.Event()
+
+        def renew():
+            while not done.wait(self.heartbeat_interval):
+                try:
+                    if not self.queue.heartbeat(task_id, self.name):
+                        return
+                except Exception as e:
+                    print(f"⚠️ {self.name}: heartbeat failed for task {task_id}: {e}")
+
+        thread = threading.Thread(target=renew, name=f"{self.name}-heartbeat", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            done.set()
+            thread.join()
+
+    def run_forever(self, stop: Optional[threading.Event] = None):
+        stop = stop or threading.Event()
+        last_requeue = 0.0
+        while not stop.is_set():
+            if time.monotonic() - last_requeue > self.queue.stale_after / 2:
+                self.queue.requeue_stale()
+                last_requeue = time.monotonic()
+            try:
+                if self.run_once():
+                    continue
+            except Exception as e:
+                print(f"⚠️ {self.name}: {e}")
+            stop.wait(self.poll_interval)
+
+
+_shared_queue = None
+_shared_lock = threading.Lock()
+_worker_threads: List[threading.Thread] = []
+
+
+def get_task_queue() -> TaskQueue:
+    """Process-wide task queue (shared by every Streamlit session)."""
+    global _shared_queue
+    with _shared_lock:
+        if _shared_queue is None:
+            _shared_queue = TaskQueue.from_env()
+        return _shared_queue
+
+
+def start_workers(resources: Optional[Callable[[], Dict]] = None, count: Optional[int] = None) -> int:
+    """
+    🆕 V4 FEATURE: Start background worker threads once per process.
+
+    Streamlit reruns the script on every interaction; the workers live in
+    the server process, so reruns never abandon queued or running work.
+    Set TASK_WORKERS=0 to rely on standalone `python app/worker.py` processes.
+
+    Args:
+        resources (callable): Builds the per-worker resources (e.g. {"chain", "portfolio"})
+        count (int): Number of worker threads (default: TASK_WORKERS or 2)
+
+    Returns:
+        int: Number of worker threads running
+    """
+    if count is None:
+        count = int(os.getenv("TASK_WORKERS", "2"))
+
+    queue = get_task_queue()
+    with _shared_lock:
+        if _worker_threads or count <= 0:
+            return len(_worker_threads)
+        for i in range(count):
+            worker = Worker(queue, resources=resources)
+            thread = threading.Thread(target=worker.run_forever, name=f"task-worker-{i}", daemon=True)
+            thread.start()
+            _worker_threads.append(thread)
+    print(f"👷 Started {count} background task worker(s)")
+    return count
@@ -0,0 +1,204 @@
+import os
+import json
+import time
+import uuid
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# Parent span of the code currently running (nested spans share one trace)
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed stage (scrape, LLM call, embedding, ChromaDB query...)."""
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, attributes: Dict = None):
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = dict(attributes or {})
+        self.start_time = time.time()
+        self.duration_ms = None
+        self.status = "ok"
+        self.error = None
+
+    def set(self, key: str, value):
+        """Attach an attribute (tokens, cache hit, retries, sizes...)."""
+        self.attributes[key] = value
+
+    def add(self, key: str, amount=1):
+        """Increment a numeric attribute (e.g. retries)."""
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Tracer:
+    """
+    Lightweight in-process tracer.
+
+    Finished spans are kept in a bounded buffer for the Streamlit diagnostics
+    panel, and optionally appended to a JSONL file (TRACE_JSONL_PATH) and
+    mirrored to OpenTelemetry (TRACE_OTEL=1, requires opentelemetry-api).
+    """
+
+    def __init__(self, max_spans: int = 5000, jsonl_path: Optional[str] = None,
+                 enable_otel: bool = False):
+        self.spans = deque(maxlen=max_spans)
+        self.jsonl_path = jsonl_path
+        self._lock = threading.Lock()
+        self._otel_tracer = None
+
+        if enable_otel:
+            try:
+                from opentelemetry import trace
+                self._otel_tracer = trace.get_tracer("cold-email-generator")
+            except ImportError:
+                print("⚠️ TRACE_OTEL is set but opentelemetry is not installed")
+
+    @classmethod
+    def from_env(cls) -> "Tracer":
+        return cls(
+            max_spans=int(os.getenv("TRACE_MAX_SPANS", "5000")),
+            jsonl_path=os.getenv("TRACE_JSONL_PATH") or None,
+            enable_otel=os.getenv("TRACE_OTEL", "0").strip().lower() in ("1", "true", "yes"),
+        )
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """
+        Time a block of code.
+
+        Usage:
+            with tracer.span("llm.extract_jobs", model="llama-3.1-8b-instant") as span:
+                res = chain.invoke(...)
+                span.set("completion_tokens", 42)
+        """
+        parent = _current_span.get()
+        span = Span(name, parent, attributes)
+        token = _current_span.set(span)
+
+        otel_cm = self._otel_tracer.start_as_current_span(name) if self._otel_tracer else None
+        otel_span = otel_cm.__enter__() if otel_cm else None
+
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.duration_ms = (time.perf_counter() - start) * 1000
+            _current_span.reset(token)
+
+            if otel_span is not None:
+                for key, value in span.attributes.items():
+                    if isinstance(value, (str, bool, int, float)):
+                        otel_span.set_attribute(key, value)
+                if span.error:
+                    otel_span.set_attribute("error", span.error)
+                otel_cm.__exit__(None, None, None)
+
+            self._finish(span)
+
+    def current_span(self) -> Optional[Span]:
+        return _current_span.get()
+
+    def _finish(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+            if self.jsonl_path:
+                try:
+                    with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(span.to_dict(), default=str) + "\n")
+                except OSError as e:
+                    print(f"Error writing trace to {self.jsonl_path}: {e}")
+
+    def recent(self, limit: int = 50) -> List[Dict]:
+        """Most recent finished spans, newest first."""
+        with self._lock:
+            spans = list(self.spans)[-limit:]
+        return [s.to_dict() for s in reversed(spans)]
+
+    def summary(self) -> List[Dict]:
+        """
+        Per-stage latency and token statistics.
+
+        Returns:
+            list: [{"stage", "count", "errors", "p50_ms", "p95_ms", "max_ms",
+                    "total_ms", "prompt_tokens", "completion_tokens", "cache_hits", "retries",
+                    "bytes", "bytes_saved"}]
+        """
+        with self._lock:
+            spans = list(self.spans)
+
+        by_name = {}
+        for span in spans:
+            by_name.setdefault(span.name, []).append(span)
+
+        rows = []
+        for name, group in by_name.items():
+            durations = sorted(s.duration_ms for s in group)
+            rows.append({
+                "stage": name,
+                "count": len(group),
+                "errors": sum(1 for s in group if s.status == "error"),
+                "p50_ms": round(_percentile(durations, 0.50), 2),
+                "p95_ms": round(_percentile(durations, 0.95), 2),
+                "max_ms": round(durations[-1], 2),
+                "total_ms": round(sum(durations), 2),
+                "prompt_tokens": sum(s.attributes.get("prompt_tokens", 0) for s in group),
+                "completion_tokens": sum(s.attributes.get("completion_tokens", 0) for s in group),
+                "cache_hits": sum(1 for s in group if s.attributes.get("cache_hit")),
+                "retries": sum(s.attributes.get("retries", 0) for s in group),
+                "bytes": sum(s.attributes.get("bytes", 0) for s in group),
+                "bytes_saved": sum(s.attributes.get("bytes_saved", 0) for s in group),
+            })
+
+        rows.sort(key=lambda r: r["p95_ms"], reverse=True)
+        return rows
+
+    def reset(self):
+        with self._lock:
+            self.spans.clear()
+
+
+def record_token_usage(span: Span, message) -> None:
+    """Copy prompt/completion token counts from a LangChain/Groq AIMessage onto a span."""
+    usage = getattr(message, "usage_metadata", None) or {}
+    if usage:
+        span.set("prompt_tokens", usage.get("input_tokens", 0))
+        span.set("completion_tokens", usage.get("output_tokens", 0))
+        return
+
+    token_usage = (getattr(message, "response_metadata", None) or {}).get("token_usage", {})
+    if token_usage:
+        span.set("prompt_tokens", token_usage.get("prompt_tokens", 0))
+        span.set("completion_tokens", token_usage.get("completion_tokens", 0))
+
+
+# Process-wide tracer shared by chains, portfolio, utils and the UI
+tracer = Tracer.from_env()
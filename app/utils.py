@@ -1,8 +1,15 @@
+import os
 import re
 import requests
 from bs4 import BeautifulSoup
+from lxml import etree
 from typing import List, Dict, Optional
 import time
+from urllib.parse import urlsplit
+from tracing import tracer
+from dedup import collapse_near_duplicates
+from matching import get_matcher
+from single_flight import single_flight, normalize_text, normalize_url
 
 def clean_text(text):
     """
@@ -27,6 +34,128 @@ def clean_text(text):
     return text
 
 
+def html_to_text(html) -> str:
+    """
+    Visible text of an HTML page (scripts, styles, navigation and footers removed), cleaned.
+    
+    Args:
+        html (str, bytes or BeautifulSoup): Page HTML (an already parsed page is modified in place)
+        
+    Returns:
+        str: Cleaned page text
+    """
+    soup = html if isinstance(html, BeautifulSoup) else BeautifulSoup(html, 'html.parser')
+    
+    # Remove script and style elements
+    for script in soup(["script", "style", "nav", "footer"]):
+        script.decompose()
+    
+    return clean_text(soup.get_text(separator=' ', strip=True))
+
+
+# Downloads are cut off after this many bytes (override with SCRAPE_MAX_BYTES)
+MAX_PAGE_BYTES = int(os.getenv("SCRAPE_MAX_BYTES", str(2 * 1024 * 1024)))
+PAGE_CHUNK_BYTES = 16 * 1024
+
+_TEXT_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain", "text/xml", "application/xml")
+# PDF, ZIP/DOCX, PNG, GIF, JPEG, gzip served with a missing or wrong Content-Type
+_BINARY_SIGNATURES = (b"%PDF", b"PK\x03\x04", b"\x89PNG", b"GIF8", b"\xff\xd8\xff", b"\x1f\x8b")
+# Elements whose end means the job description region has been received. Not <article>:
+# related-job cards are often articles, before or after the posting itself
+DESCRIPTION_END_TAGS = ("main",)
+
+
+@single_flight(
+    "fetch_page",
+    key=lambda url, timeout=10, max_bytes=None, stop_at=DESCRIPTION_END_TAGS, headers=None:
+        (normalize_url(url), max_bytes, stop_at)
+)
+def fetch_page(url: str, timeout: int = 10, max_bytes: Optional[int] = None,
+               stop_at=DESCRIPTION_END_TAGS, headers: Optional[Dict] = None) -> Optional[bytes]:
+    """
+    🆕 V4 FEATURE: Streaming, size-capped page download.
+    
+    Non-HTML responses (by Content-Type or by their first bytes) are
+    rejected before the body is downloaded, and reading stops at
+    `max_bytes` or once the job description region has been received.
+    Chunks are fed to an incremental lxml parser as they arrive, so the
+    end of a `stop_at` element is recognized as markup (not inside a
+    script, comment or attribute). Bytes not downloaded are recorded as
+    `bytes_saved` on the "scrape.download" span.
+    
+    Args:
+        url (str): Page URL
+        timeout (int): Request timeout in seconds
+        max_bytes (int): Download budget (default: SCRAPE_MAX_BYTES or 2 MB)
+        stop_at (tuple): Tags whose closing ends the download (None reads to the end, e.g. when
+                         JSON-LD after the description is needed)
+        headers (dict): Request headers
+        
+    Returns:
+        bytes: Page content (possibly truncated) or None if the page is not HTML
+        
+    Raises:
+        requests.exceptions.RequestException: On connection or HTTP errors
+    """
+    max_bytes = max_bytes or MAX_PAGE_BYTES
+    headers = headers or {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    }
+    
+    with tracer.span("scrape.download", url=url) as span:
+        with requests.get(url, headers=headers, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            
+            content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+            try:
+                content_length = int(response.headers.get('Content-Length', 0))
+            except ValueError:
+                content_length = 0
+            span.set("content_type", content_type)
+            
+            chunks = []
+            received = 0
+            stopped = None
+            
+            if content_type and not content_type.startswith(_TEXT_CONTENT_TYPES):
+                stopped = "content_type"
+            else:
+                parser = etree.HTMLPullParser(events=("end",), tag=stop_at) if stop_at else None
+                for chunk in response.iter_content(chunk_size=PAGE_CHUNK_BYTES):
+                    if not received and chunk.lstrip().startswith(_BINARY_SIGNATURES):
+                        stopped = "binary"
+                        break
+                    chunks.append(chunk)
+                    received += len(chunk)
+                    if received >= max_bytes:
+                        stopped = "max_bytes"
+                        break
+                    if parser is not None:
+                        parser.feed(chunk)
+                        if any(True for _ in parser.read_events()):
+                            stopped = "description_captured"
+                            break
+            
+            # Content-Length counts bytes on the wire (possibly compressed)
+            downloaded = response.raw.tell() if stopped else content_length
+            bytes_saved = max(content_length - downloaded, 0) if content_length else 0
+        
+        span.set("bytes", received)
+        span.set("bytes_saved", bytes_saved)
+        span.set("stopped", stopped)
+    
+    if stopped in ("content_type", "binary"):
+        kind = content_type if stopped == "content_type" else "binary content"
+        print(f"⏭️ Skipping {url}: not an HTML page ({kind}), "
+              f"{bytes_saved} bytes not downloaded")
+        return None
+    if stopped == "max_bytes" or bytes_saved:
+        print(f"✂️ {url}: stopped after {received} bytes ({stopped}), {bytes_saved} bytes saved")
+    
+    return b"".join(chunks)
+
+
+@single_flight("scrape_job_page", key=lambda url, timeout=10: normalize_url(url))
 def scrape_job_page(url: str, timeout: int = 10) -> Optional[str]:
     """
     🆕 V3 FEATURE: Enhanced web scraping with better error handling.
@@ -39,28 +168,22 @@ def scrape_job_page(url: str, timeout: int = 10) -> Optional[str]:
         str: Scraped page content or None if failed
     """
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=timeout)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Remove script and style elements
-        for script in soup(["script", "style", "nav", "footer"]):
-            script.decompose()
-        
-        text = soup.get_text(separator=' ', strip=True)
-        return clean_text(text)
+        with tracer.span("scrape.job_page", url=url):
+            content = fetch_page(url, timeout=timeout)
+            return html_to_text(content) if content is not None else None
         
     except requests.exceptions.RequestException as e:
         print(f"Error scraping {url}: {str(e)}")
         return None
 
 
+@single_flight(
+    "discover_jobs_from_keywords",
+    key=lambda keywords, location="Remote", max_results=10, raise_errors=False:
+        (tuple(normalize_text(k) for k in keywords), normalize_text(location), max_results, raise_errors)
+)
 def discover_jobs_from_keywords(keywords: List[str], location: str = "Remote", 
-                                max_results: int = 10) -> List[Dict]:
+                                max_results: int = 10, raise_errors: bool = False) -> List[Dict]:
     """
     🆕 V3 FEATURE: AI-Powered Job Discovery
     
@@ -71,6 +194,7 @@ def discover_jobs_from_keywords(keywords: List[str], location: str = "Remote",
         keywords (list): List of skills/technologies to search for
         location (str): Job location
         max_results (int): Maximum number of jobs to return
+        raise_errors (bool): Re-raise request errors instead of returning []
         
     Returns:
         list: [
@@ -97,8 +221,11 @@ def discover_jobs_from_keywords(keywords: List[str], location: str = "Remote",
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
         
-        response = requests.get(indeed_url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.content, 'html.parser')
+        with tracer.span("scrape.indeed_search", query=query) as span:
+            response = requests.get(indeed_url, headers=headers, timeout=10)
+            response.raise_for_status()
+            span.set("bytes", len(response.content))
+            soup = BeautifulSoup(response.content, 'html.parser')
         
         # Parse Indeed job cards
         job_cards = soup.find_all('div', class_='job_seen_beacon', limit=max_results)
@@ -141,6 +268,8 @@ def discover_jobs_from_keywords(keywords: List[str], location: str = "Remote",
         
     except Exception as e:
         print(f"Error discovering jobs: {str(e)}")
+        if raise_errors:
+            raise
     
     return jobs_found[:max_results]
 
@@ -149,6 +278,9 @@ def calculate_match_score(text: str, keywords: List[str]) -> float:
     """
     Calculates how well a job posting matches given keywords.
     
+    Keywords match as whole words through a matcher compiled once per
+    keyword list (see `matching.KeywordMatcher`).
+    
     Args:
         text (str): Job posting text
         keywords (list): List of skills/keywords
@@ -156,9 +288,100 @@ def calculate_match_score(text: str, keywords: List[str]) -> float:
     Returns:
         float: Match score between 0 and 1
     """
-    text_lower = text.lower()
-    matches = sum(1 for keyword in keywords if keyword.lower() in text_lower)
-    return min(matches / len(keywords), 1.0) if keywords else 0.0
+    return get_matcher(keywords).score(text)
+
+
+class ListingExtractor:
+    """
+    🆕 V4 FEATURE: Company/location extraction for search results with every
+    pattern compiled once.
+
+    Patterns keep their original priority order (the first pattern that
+    yields a usable value wins), so results match the per-call regex code
+    this replaces; the cleanup and non-location word lists are combined
+    into single patterns. Companies derived from a domain are memoized.
+    """
+
+    # "Company - Job Title", "Job Title at Company", "Company hiring"
+    TITLE_PATTERNS = [
+        r'(.+?)\s*-\s*.+',
+        r'.+?\s+at\s+(.+)',
+        r'(.+?)\s+hiring',
+    ]
+    # "in City" / "in City State", "at City", "City jobs"
+    LOCATION_PATTERNS = [
+        r'in\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
+        r'at\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
+        r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+(?:jobs?|positions?|roles?)',
+    ]
+    NON_LOCATION_WORDS = ['developer', 'engineer', 'manager', 'senior', 'junior']
+
+    def __init__(self):
+        self._title_patterns = [re.compile(p, re.IGNORECASE) for p in self.TITLE_PATTERNS]
+        self._company_cleanup = re.compile(r'\b(jobs?|careers?|hiring|recruiting)\b', re.IGNORECASE)
+        self._location_patterns = [re.compile(p, re.IGNORECASE) for p in self.LOCATION_PATTERNS]
+        self._non_location = re.compile("|".join(self.NON_LOCATION_WORDS))
+        self._domain_cache = {}
+
+    def company_from_url(self, url: str) -> str:
+        try:
+            netloc = urlsplit(url).netloc
+        except Exception:
+            return "Company"
+
+        company = self._domain_cache.get(netloc)
+        if company is None:
+            # Remove common prefixes and keep the main domain name
+            domain = netloc.replace('www.', '').replace('careers.', '').replace('jobs.', '')
+            company = domain.split('.')[0].title()
+            if len(self._domain_cache) < 10000:
+                self._domain_cache[netloc] = company
+        return company
+
+    def company(self, title: str, url: str) -> str:
+        company_from_url = self.company_from_url(url)
+        if company_from_url and company_from_url != "Company":
+            return company_from_url
+
+        title_lower = title.lower()
+        for pattern in self._title_patterns:
+            match = pattern.search(title_lower)
+            if match:
+                company = self._company_cleanup.sub('', match.group(1).strip()).strip()
+                if company and len(company) > 1:
+                    return company.title()
+
+        return company_from_url
+
+    def location(self, snippet: str) -> str:
+        for pattern in self._location_patterns:
+            match = pattern.search(snippet)
+            if match:
+                location = match.group(1).strip()
+                if not self._non_location.search(location.lower()):
+                    return location
+        return ""
+
+    def extract_batch(self, listings: List[Dict]) -> List[Dict]:
+        """
+        Extract company and location for many search results.
+
+        Args:
+            listings (list): Dicts with 'title', 'url' and 'snippet'
+
+        Returns:
+            list: [{"company": str, "location": str}] in input order
+        """
+        return [
+            {
+                "company": self.company(item.get('title', ''), item.get('url', '')),
+                "location": self.location(item.get('snippet', '')),
+            }
+            for item in listings
+        ]
+
+
+listing_extractor = ListingExtractor()
 
 
 def extract_company_name_from_url(url: str) -> str:
@@ -171,22 +394,7 @@ def extract_company_name_from_url(url: str) -> str:
     Returns:
         str: Extracted company name or domain
     """
-    try:
-        # Try to extract from domain
-        from urllib.parse import urlparse
-        domain = urlparse(url).netloc
-
-        # Remove common prefixes
-        domain = domain.replace('www.', '').replace('careers.', '').replace('jobs.', '')
-
-        # Get main domain name
-        company = domain.split('.')[0]
-
-        # Capitalize properly
-        return company.title()
-
-    except Exception:
-        return "Company"
+    return listing_extractor.company_from_url(url)
 
 
 def extract_company_from_title(title: str, url: str) -> str:
@@ -200,32 +408,7 @@ def extract_company_from_title(title: str, url: str) -> str:
     Returns:
         str: Extracted company name
     """
-    # First try to extract from URL
-    company_from_url = extract_company_name_from_url(url)
-    if company_from_url and company_from_url != "Company":
-        return company_from_url
-
-    # Try to extract from title patterns like "Company - Job Title" or "Job Title at Company"
-    title_lower = title.lower()
-
-    # Common patterns
-    patterns = [
-        r'(.+?)\s*-\s*.+',  # "Company - Job Title"
-        r'.+?\s+at\s+(.+)',  # "Job Title at Company"
-        r'(.+?)\s+hiring',  # "Company hiring"
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, title_lower, re.IGNORECASE)
-        if match:
-            company = match.group(1).strip()
-            # Clean up common words
-            company = re.sub(r'\b(jobs?|careers?|hiring|recruiting)\b', '', company, flags=re.IGNORECASE).strip()
-            if company and len(company) > 1:
-                return company.title()
-
-    # Fallback to URL extraction
-    return company_from_url
+    return listing_extractor.company(title, url)
 
 
 def extract_location_from_snippet(snippet: str) -> str:
@@ -238,22 +421,7 @@ def extract_location_from_snippet(snippet: str) -> str:
     Returns:
         str: Extracted location or empty string
     """
-    # Common location patterns
-    location_patterns = [
-        r'in\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',  # "in City" or "in City State"
-        r'at\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',  # "at City"
-        r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+(?:jobs?|positions?|roles?)',  # "City jobs"
-    ]
-
-    for pattern in location_patterns:
-        match = re.search(pattern, snippet, re.IGNORECASE)
-        if match:
-            location = match.group(1).strip()
-            # Filter out non-location words
-            if not any(word in location.lower() for word in ['developer', 'engineer', 'manager', 'senior', 'junior']):
-                return location
-
-    return ""
+    return listing_extractor.location(snippet)
 
 
 def validate_email_format(email: str) -> bool:
@@ -306,13 +474,19 @@ def extract_skills_from_portfolio(portfolio_data: List[Dict]) -> List[str]:
     return sorted(list(skills))
 
 
-def search_jobs_google_custom(query: str, num_results: int = 10) -> List[Dict]:
+@single_flight(
+    "search_jobs_google_custom",
+    key=lambda query, num_results=10, raise_errors=False: (normalize_text(query), num_results, raise_errors)
+)
+def search_jobs_google_custom(query: str, num_results: int = 10,
+                              raise_errors: bool = False) -> List[Dict]:
     """
     🆕 V3 FEATURE: Alternative job search using DuckDuckGo (no API key needed).
 
     Args:
         query (str): Search query (e.g., "Python developer remote")
         num_results (int): Number of results to return
+        raise_errors (bool): Re-raise request errors instead of returning []
 
     Returns:
         list: Job postings found
@@ -327,11 +501,15 @@ def search_jobs_google_custom(query: str, num_results: int = 10) -> List[Dict]:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
 
-        response = requests.get(search_url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.content, 'html.parser')
+        with tracer.span("scrape.duckduckgo_search", query=query) as span:
+            response = requests.get(search_url, headers=headers, timeout=10)
+            response.raise_for_status()
+            span.set("bytes", len(response.content))
+            soup = BeautifulSoup(response.content, 'html.parser')
 
         # Parse search results
         results = soup.find_all('div', class_='result', limit=num_results * 2)
+        listings = []
 
         for result in results:
             try:
@@ -340,73 +518,64 @@ def search_jobs_google_custom(query: str, num_results: int = 10) -> List[Dict]:
 
                 if title_elem and 'href' in title_elem.attrs:
                     title = title_elem.get_text(strip=True)
-                    url = title_elem['href']
-                    snippet = snippet_elem.get_text(strip=True) if snippet_elem else ""
 
                     # Filter for job-related results
                     if any(keyword in title.lower() for keyword in ['job', 'career', 'hiring', 'position']):
-                        # Extract company name from title or URL
-                        company = extract_company_from_title(title, url)
-
-                        # Extract location from snippet if available
-                        location = extract_location_from_snippet(snippet)
-                        if not location:
-                            location = "Remote"  # Default fallback
-
-                        # Calculate dynamic match score
-                        match_score = calculate_match_score(title + " " + snippet, query.split())
-
-                        jobs.append({
+                        listings.append({
                             "title": title,
-                            "company": company,
-                            "location": location,
-                            "description_snippet": snippet[:200],
-                            "url": url,
-                            "match_score": match_score,
-                            "source": "DuckDuckGo"
+                            "url": title_elem['href'],
+                            "snippet": snippet_elem.get_text(strip=True) if snippet_elem else ""
                         })
 
-                        if len(jobs) >= num_results:
+                        if len(listings) >= num_results:
                             break
 
             except Exception:
                 continue
 
+        # Company/location and match scores for all results at once
+        fields = listing_extractor.extract_batch(listings)
+        scores = get_matcher(query.split()).score_batch(
+            [item['title'] + " " + item['snippet'] for item in listings]
+        )
+
+        for item, extracted, match_score in zip(listings, fields, scores):
+            jobs.append({
+                "title": item['title'],
+                "company": extracted['company'],
+                "location": extracted['location'] or "Remote",  # Default fallback
+                "description_snippet": item['snippet'][:200],
+                "url": item['url'],
+                "match_score": match_score,
+                "source": "DuckDuckGo"
+            })
+
     except Exception as e:
         print(f"Error in DuckDuckGo search: {str(e)}")
+        if raise_errors:
+            raise
 
     return jobs
 
 
-def fetch_job_boards_aggregate(keywords: List[str], location: str = "Remote") -> List[Dict]:
+def dedupe_jobs(jobs: List[Dict]) -> List[Dict]:
     """
-    🆕 V3 FEATURE: Aggregate jobs from multiple free sources.
+    Remove duplicate job listings and sort by match score.
     
-    Combines results from Indeed, LinkedIn (public), and web search.
+    Exact duplicates share a URL; near-duplicates (the same posting
+    syndicated on several boards) are collapsed by MinHash similarity of
+    title + company + snippet, keeping the best-matching copy.
     
     Args:
-        keywords (list): Skills to search for
-        location (str): Desired location
+        jobs (list): Job listings from one or more sources
         
     Returns:
-        list: Aggregated job listings
+        list: Unique job listings, best match first
     """
-    all_jobs = []
-    
-    # Source 1: Indeed
-    indeed_jobs = discover_jobs_from_keywords(keywords, location, max_results=5)
-    all_jobs.extend(indeed_jobs)
-    
-    # Source 2: Web search for additional results
-    query = f"{' '.join(keywords[:2])} developer {location} job"
-    web_jobs = search_jobs_google_custom(query, num_results=5)
-    all_jobs.extend(web_jobs)
-    
-    # Remove duplicates based on URL
     seen_urls = set()
     unique_jobs = []
     
-    for job in all_jobs:
+    for job in jobs:
         if job['url'] and job['url'] not in seen_urls:
             seen_urls.add(job['url'])
             unique_jobs.append(job)
@@ -414,7 +583,32 @@ def fetch_job_boards_aggregate(keywords: List[str], location: str = "Remote") ->
     # Sort by match score
     unique_jobs.sort(key=lambda x: x.get('match_score', 0), reverse=True)
     
-    return unique_jobs
+    return collapse_near_duplicates(unique_jobs)
+
+
+def fetch_job_boards_aggregate(keywords: List[str], location: str = "Remote",
+                               deadline: Optional[float] = None) -> List[Dict]:
+    """
+    🆕 V3 FEATURE: Aggregate jobs from multiple free sources.
+    
+    Every registered source (see `job_sources.py`) is queried concurrently
+    under one overall deadline; slow or failing sources are skipped.
+    
+    Args:
+        keywords (list): Skills to search for
+        location (str): Desired location
+        deadline (float): Overall time budget in seconds
+        
+    Returns:
+        list: Aggregated job listings
+    """
+    from job_sources import stream_jobs
+    
+    all_jobs = []
+    for result in stream_jobs(keywords, location, deadline=deadline):
+        all_jobs.extend(result['jobs'])
+    
+    return dedupe_jobs(all_jobs)
 
 
 def format_email_for_download(email: str, metadata: Dict) -> str:
@@ -0,0 +1,82 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+class NumpyVectorIndex:
+    """
+    Exact in-memory nearest-neighbour search for small collections.
+
+    Unit-normalized embeddings are kept in one contiguous float32 matrix, so
+    a query is a single matrix-vector product (a batch of queries a single
+    matrix-matrix product) followed by `argpartition` for the top k. For a
+    few thousand rows this beats an HNSW lookup through ChromaDB's storage
+    layer, and results are exact.
+
+    Distances are squared L2 between unit vectors (2 - 2 * cosine), the same
+    scale ChromaDB's default space returns.
+    """
+
+    def __init__(self, embeddings, metadatas: List[Dict]):
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim != 2 or len(matrix) != len(metadatas):
+            raise ValueError("embeddings must be a (rows, dims) matrix with one row per metadata")
+        self.matrix = np.ascontiguousarray(self._normalize(matrix))
+        self.metadatas = list(metadatas)
+
+    @classmethod
+    def from_normalized(cls, matrix, metadatas: List[Dict]) -> "NumpyVectorIndex":
+        """Index over rows that are already unit-normalized (kept as is, e.g. a memory-mapped snapshot)."""
+        if matrix.ndim != 2 or len(matrix) != len(metadatas):
+            raise ValueError("embeddings must be a (rows, dims) matrix with one row per metadata")
+        index = cls.__new__(cls)
+        index.matrix = matrix
+        index.metadatas = list(metadatas)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.metadatas)
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def similarities(self, query_embeddings) -> np.ndarray:
+        """Cosine similarity of every query with every row: one (queries, rows) matrix product."""
+        queries = self._normalize(np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32)))
+        return queries @ self.matrix.T
+
+    @staticmethod
+    def top_k(similarities: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Column indices and similarities of the `k` best columns per row, best first.
+
+        Returns:
+            tuple: (indices, similarities), both of shape (rows, min(k, columns))
+        """
+        rows, columns = similarities.shape
+        k = min(k, columns)
+        if k == 0:
+            return np.zeros((rows, 0), dtype=int), np.zeros((rows, 0), dtype=similarities.dtype)
+
+        if k < columns:
+            top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(columns), (rows, columns))
+        top_similarities = np.take_along_axis(similarities, top, axis=1)
+        order = np.argsort(-top_similarities, axis=1)
+        return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_similarities, order, axis=1)
+
+    def search(self, query_embeddings, n_results: int) -> Tuple[List[List[Dict]], List[List[float]]]:
+        """
+        Top `n_results` rows for every query embedding.
+
+        Returns:
+            tuple: (metadatas, distances), one list per query, closest first
+        """
+        top, top_similarities = self.top_k(self.similarities(query_embeddings), n_results)
+        distances = np.clip(2.0 - 2.0 * top_similarities, 0.0, None)
+        metadatas = [[self.metadatas[i] for i in row] for row in top]
+        return metadatas, distances.tolist()
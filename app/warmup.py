@@ -0,0 +1,162 @@
+"""
+Startup warm-up and readiness state.
+
+Right after deploy the first request would otherwise pay for opening the
+vector store, loading the embedding model, the first TLS handshake with the
+LLM API and the HTML parser imports. `start_warmup` runs every registered
+step in parallel in the background; `readiness()` reports progress so
+health checks (and load balancers) only send traffic to warm instances.
+"""
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from tracing import tracer
+
+STARTING, WARMING, READY, DEGRADED = "starting", "warming", "ready", "degraded"
+
+# Warm-up steps by name; each receives the resources passed to `start_warmup`
+WARMUP_STEPS: Dict[str, Callable[[Dict], None]] = {}
+
+_state = {"status": STARTING, "started_at": None, "finished_at": None, "steps": {}}
+_state_lock = threading.Lock()
+_warmup_thread = None
+
+
+def warmup_step(name: str):
+    """
+    Decorator registering a warm-up step.
+
+    Usage:
+        @warmup_step("embedding_model")
+        def warm_embedding_model(resources): ...
+    """
+    def decorator(fn):
+        WARMUP_STEPS[name] = fn
+        return fn
+    return decorator
+
+
+@warmup_step("vector_store")
+def warm_vector_store(resources: Dict):
+    from portfolio import get_chroma_client
+    # Opens the on-disk store, or the HTTP connection to the shared server
+    get_chroma_client().heartbeat()
+
+
+@warmup_step("embedding_model")
+def warm_embedding_model(resources: Dict):
+    from portfolio import SharedEmbeddingFunction
+    # Loads the ONNX session (downloading the model if it is not baked in) and runs it once
+    SharedEmbeddingFunction()(["warm-up"])
+
+
+@warmup_step("portfolio")
+def warm_portfolio(resources: Dict):
+    portfolio = resources.get("portfolio")
+    if portfolio is None and resources.get("portfolios") is not None:
+        # Registry (API): warm the default portfolio
+        portfolio = resources["portfolios"].get()
+    if portfolio is None:
+        return
+    portfolio.warm_indexes()
+    portfolio.query_links(str(["Python"]))
+
+
+@warmup_step("llm_connection")
+def warm_llm_connection(resources: Dict):
+    chain = resources.get("chain")
+    if chain is not None:
+        chain.backend.warm_up()
+
+
+@warmup_step("html_parser")
+def warm_html_parser(resources: Dict):
+    from bs4 import BeautifulSoup
+    BeautifulSoup("<html><body><p>warm-up</p></body></html>", "html.parser").get_text()
+
+
+def run_warmup(resources: Optional[Dict] = None) -> Dict:
+    """
+    🆕 V4 FEATURE: Run every warm-up step in parallel and record the outcome.
+
+    A failing step marks the instance "degraded" (it still serves traffic,
+    paying that cost on first use) rather than keeping it out of rotation.
+
+    Args:
+        resources (dict): {"chain": Chain, "portfolio": Portfolio or "portfolios": PortfolioRegistry},
+                          all optional
+
+    Returns:
+        dict: Readiness state (see `readiness`)
+    """
+    resources = resources or {}
+    with _state_lock:
+        _state.update(status=WARMING, started_at=time.time(), finished_at=None,
+                      steps={name: {"status": "pending"} for name in WARMUP_STEPS})
+
+    def run_step(name: str, fn: Callable[[Dict], None]):
+        start = time.perf_counter()
+        try:
+            with tracer.span(f"warmup.{name}"):
+                fn(resources)
+            result = {"status": "ok"}
+        except Exception as e:
+            print(f"⚠️ Warm-up step '{name}' failed: {e}")
+            result = {"status": "error", "error": str(e)}
+        result["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        with _state_lock:
+            _state["steps"][name] = result
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(WARMUP_STEPS) or 1, thread_name_prefix="warmup") as executor:
+        for name, fn in WARMUP_STEPS.items():
+            executor.submit(run_step, name, fn)
+
+    with _state_lock:
+        failed = [name for name, step in _state["steps"].items() if step["status"] == "error"]
+        _state.update(status=DEGRADED if failed else READY, finished_at=time.time())
+    print(f"🔥 Warm-up finished in {(time.perf_counter() - start) * 1000:.0f} ms"
+          + (f" (failed: {', '.join(failed)})" if failed else ""))
+    return readiness()
+
+
+def start_warmup(resources: Optional[Dict] = None) -> bool:
+    """
+    🆕 V4 FEATURE: Start the warm-up once per process, in a background thread.
+
+    Set STARTUP_WARMUP=0 to skip it (the instance reports ready immediately).
+
+    Args:
+        resources (dict): Same as `run_warmup`
+
+    Returns:
+        bool: True if this call started the warm-up
+    """
+    global _warmup_thread
+    with _state_lock:
+        if _warmup_thread is not None or _state["status"] != STARTING:
+            return False
+        if os.getenv("STARTUP_WARMUP", "1").strip().lower() in ("0", "false", "no"):
+            _state.update(status=READY, finished_at=time.time())
+            return False
+        _warmup_thread = threading.Thread(target=run_warmup, args=(resources,), name="warmup", daemon=True)
+        _warmup_thread.start()
+    return True
+
+
+def readiness() -> Dict:
+    """
+    🆕 V4 FEATURE: Current readiness state.
+
+    Returns:
+        dict: {"ready": bool, "status": starting|warming|ready|degraded,
+               "steps": {name: {"status", "duration_ms", "error"?}}, ...}
+    """
+    with _state_lock:
+        state = {key: value for key, value in _state.items() if key != "steps"}
+        state["steps"] = {name: dict(step) for name, step in _state["steps"].items()}
+    state["ready"] = state["status"] in (READY, DEGRADED)
+    return state
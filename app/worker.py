@@ -0,0 +1,52 @@
+"""
+Standalone background worker: executes queued campaigns outside the Streamlit process.
+
+Usage:
+    python app/worker.py                 # one worker
+    python app/worker.py --concurrency 4
+
+Run the app with TASK_WORKERS=0 to leave all work to these processes.
+"""
+import argparse
+import threading
+
+from dotenv import load_dotenv
+
+from chains import Chain
+from portfolio_registry import get_portfolio_registry
+from task_queue import Worker, get_task_queue
+import campaigns  # noqa: F401  (registers the "campaign" task)
+
+
+def campaign_resources():
+    # Each campaign names its portfolio; the registry keeps recently used ones loaded
+    return {"chain": Chain(), "portfolios": get_portfolio_registry()}
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Background worker for queued campaigns")
+    parser.add_argument("--concurrency", type=int, default=1, help="Worker threads in this process")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between queue polls when idle")
+    args = parser.parse_args()
+
+    queue = get_task_queue()
+    queue.requeue_stale()
+
+    threads = []
+    for i in range(args.concurrency):
+        worker = Worker(queue, resources=campaign_resources, poll_interval=args.poll_interval)
+        thread = threading.Thread(target=worker.run_forever, name=f"task-worker-{i}", daemon=True)
+        thread.start()
+        threads.append(thread)
+    print(f"👷 {args.concurrency} worker(s) polling {queue.path}")
+
+    try:
+        for thread in threads:
+            thread.join()
+    except KeyboardInterrupt:
+        print("👋 Worker stopped; running tasks will be re-queued")
+
+
+if __name__ == "__main__":
+    main()
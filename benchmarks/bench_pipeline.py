@@ -0,0 +1,70 @@
+"""Campaign pipeline benchmarks against the offline fake LLM backend."""
+import os
+import shutil
+
+from harness import benchmark, read_fixture, APP_DIR
+
+# Simulated per-call LLM latency in ms: 0 isolates pipeline overhead
+LATENCIES_MS = [0, 20]
+
+
+def run_campaign(chain, portfolio, page_text: str, company: str):
+    """Same sequence of calls as the Smart Discovery campaign in app/main.py."""
+    job_data = chain.extract_jobs(page_text)
+    company_intel = chain.research_company(company, job_data.get('description', ''))
+    tone = chain.detect_style(job_data.get('description', ''))
+    links = portfolio.query_links(str(job_data.get('skills', [])))
+
+    variations = chain.generate_email_variations(job_data, links, tone, company_intel)
+
+    best_email, best_score = None, 0
+    for email in variations.values():
+        score = chain.analyze_email_effectiveness(email, job_data).get('success_score', 75)
+        if score > best_score:
+            best_email, best_score = email, score
+
+    return chain.generate_follow_up_sequence(best_email, job_data, company)
+
+
+@benchmark("pipeline.campaign", params=LATENCIES_MS)
+def bench_campaign(ctx, latency_ms):
+    from chromadb.api.client import SharedSystemClient
+    from chains import Chain
+    from llm_backends import FakeBackend
+    from portfolio import Portfolio
+    from utils import clean_text
+
+    SharedSystemClient.clear_system_cache()
+    ctx.stack.callback(SharedSystemClient.clear_system_cache)
+
+    directory = ctx.tmpdir()
+    ctx.chdir(directory)
+    csv_path = os.path.join(directory, "links_portfolio.csv")
+    shutil.copy(os.path.join(APP_DIR, "rsrc", "links_portfolio.csv"), csv_path)
+
+    portfolio = Portfolio(file_path=csv_path)
+    portfolio.load_portfolio()
+    chain = Chain(backend=FakeBackend(seed=7, latency_ms=latency_ms))
+    page_text = clean_text(read_fixture("job_page_medium.html"))
+
+    return lambda: run_campaign(chain, portfolio, page_text, "Globex")
+
+
+@benchmark("pipeline.async_fanout", params=[50, 500])
+def bench_async_fanout(ctx, in_flight):
+    """`in_flight` concurrent cold emails awaited on one event loop (20 ms simulated latency)."""
+    import asyncio
+    from chains import Chain
+    from llm_backends import FakeBackend
+
+    chain = Chain(backend=FakeBackend(seed=7, latency_ms=20))
+    job_data = {"role": "Backend Engineer", "skills": ["Python", "PostgreSQL"], "description": "APIs"}
+
+    async def fan_out():
+        # Distinct company intel per call so nothing is coalesced
+        return await asyncio.gather(*(
+            chain.agenerate_cold_email(job_data, [], "technical", {"key_values": [str(i)]})
+            for i in range(in_flight)
+        ))
+
+    return lambda: asyncio.run(fan_out())
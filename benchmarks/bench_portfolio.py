@@ -0,0 +1,325 @@
+"""Portfolio analytics, retrieval and ingestion benchmarks at 1k/10k/100k rows."""
+import os
+import sys
+import time
+import shutil
+import socket
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from harness import benchmark, make_portfolio_csv, APP_DIR
+
+SIZES = [1000, 10000, 100000]
+JOB_SKILLS = ["Python", "FastAPI", "PostgreSQL", "Docker", "AWS", "Kubernetes", "GraphQL", "Rust"]
+
+# Concurrent retrieval: Chroma client mode x worker processes, same total queries per round
+CONCURRENT_WORKERS = ["embedded-1", "embedded-4", "embedded-16", "http-1", "http-4", "http-16"]
+CONCURRENT_QUERIES = 64
+CONCURRENT_ROWS = 1000
+
+
+def _portfolio(ctx, rows: int, vector_backend: str = None):
+    from chromadb.api.client import SharedSystemClient
+    from portfolio import Portfolio
+
+    # Chroma caches clients by path; "vector_db" is relative, so drop the cache per temp dir
+    SharedSystemClient.clear_system_cache()
+    ctx.stack.callback(SharedSystemClient.clear_system_cache)
+
+    directory = ctx.tmpdir()
+    ctx.chdir(directory)
+    csv_path = make_portfolio_csv(os.path.join(directory, "portfolio.csv"), rows)
+    return Portfolio(file_path=csv_path, vector_backend=vector_backend)
+
+
+@benchmark("portfolio.extract_all_skills", params=SIZES, sized=True)
+def bench_extract_all_skills(ctx, rows):
+    portfolio = _portfolio(ctx, rows)
+
+    def reset():
+        portfolio._skills_cache = None
+
+    return reset, portfolio.extract_all_skills
+
+
+@benchmark("portfolio.get_portfolio_summary", params=SIZES, sized=True, rounds=3)
+def bench_portfolio_summary(ctx, rows):
+    portfolio = _portfolio(ctx, rows)
+    return portfolio.get_portfolio_summary
+
+
+@benchmark("portfolio.suggest_skills_for_job", params=SIZES, sized=True)
+def bench_suggest_skills(ctx, rows):
+    portfolio = _portfolio(ctx, rows)
+    return lambda: portfolio.suggest_skills_for_job(JOB_SKILLS)
+
+
+@benchmark("portfolio.find_projects_by_skill", params=SIZES, sized=True)
+def bench_find_projects(ctx, rows):
+    portfolio = _portfolio(ctx, rows)
+    return lambda: portfolio.find_projects_by_skill("Kubernetes")
+
+
+# Job postings spell skills their own way: aliases, spacing and typos of JOB_SKILLS
+VARIANT_JOB_SKILLS = ["python3", "Fast API", "Postgres", "Dockers", "Amazon Web Services",
+                      "K8s", "Graph QL", "Kubernets", "Rust"]
+
+
+@benchmark("portfolio.skill_index", params=SIZES, sized=True)
+def bench_skill_index(ctx, rows):
+    portfolio = _portfolio(ctx, rows)
+    portfolio.extract_all_skills()
+
+    def reset():
+        portfolio._skill_index = None
+
+    return reset, portfolio.skill_index
+
+
+@benchmark("portfolio.suggest_skills_variants", params=SIZES, sized=True)
+def bench_suggest_skills_variants(ctx, rows):
+    portfolio = _portfolio(ctx, rows)
+    return lambda: portfolio.suggest_skills_for_job(VARIANT_JOB_SKILLS)
+
+
+@benchmark("portfolio.load_portfolio", params=SIZES, sized=True, rounds=1, warmup=False)
+def bench_load_portfolio(ctx, rows):
+    portfolio = _portfolio(ctx, rows)
+    return portfolio.load_portfolio
+
+
+def _loaded_portfolio(ctx, rows: int, vector_backend: str):
+    portfolio = _portfolio(ctx, rows, vector_backend)
+    portfolio.load_portfolio()
+    return portfolio
+
+
+# Hot reload after editing 1% of the CSV rows (compare with portfolio.load_portfolio,
+# which embeds every row)
+@benchmark("portfolio.reload_incremental", params=SIZES, sized=True)
+def bench_reload_incremental(ctx, rows):
+    portfolio = _loaded_portfolio(ctx, rows, None)
+    with open(portfolio.file_path, "rb") as f:
+        original = f.read()
+    lines = original.decode("utf-8").splitlines(keepends=True)
+    changed = max(1, rows // 100)
+    edited = "".join(
+        lines[:1] + [line.replace("https://", "https://edited.") for line in lines[1:changed + 1]] + lines[changed + 1:]
+    ).encode("utf-8")
+    versions = [edited, original]
+
+    def edit():
+        with open(portfolio.file_path, "wb") as f:
+            f.write(versions[0])
+        versions.reverse()
+
+    return edit, portfolio.reload_if_changed
+
+
+# Same queries against ChromaDB (HNSW) and the in-memory NumPy index; the query
+# embedding is computed the same way by both, so the gap is the search itself
+SEARCH_SIZES = [100, 1000, 10000, 100000]
+BATCH_QUERIES = [str(JOB_SKILLS[i:] + JOB_SKILLS[:i]) for i in range(32)]
+
+
+@benchmark("portfolio.query_links", params=SEARCH_SIZES, sized=True)
+def bench_query_links(ctx, rows):
+    portfolio = _loaded_portfolio(ctx, rows, "chroma")
+    return lambda: portfolio.query_links(str(JOB_SKILLS))
+
+
+@benchmark("portfolio.query_links_numpy", params=SEARCH_SIZES, sized=True)
+def bench_query_links_numpy(ctx, rows):
+    portfolio = _loaded_portfolio(ctx, rows, "numpy")
+    return lambda: portfolio.query_links(str(JOB_SKILLS))
+
+
+@benchmark("portfolio.query_links_batch", params=SEARCH_SIZES, sized=True)
+def bench_query_links_batch(ctx, rows):
+    portfolio = _loaded_portfolio(ctx, rows, "chroma")
+    return lambda: portfolio.query_links_batch(BATCH_QUERIES)
+
+
+@benchmark("portfolio.query_links_batch_numpy", params=SEARCH_SIZES, sized=True)
+def bench_query_links_batch_numpy(ctx, rows):
+    portfolio = _loaded_portfolio(ctx, rows, "numpy")
+    return lambda: portfolio.query_links_batch(BATCH_QUERIES)
+
+
+# Campaign of CAMPAIGN_JOBS jobs: per-job query_links + suggest_skills_for_job
+# vs one match_jobs call (one embedding batch, one jobs x projects matrix)
+CAMPAIGN_JOBS = [JOB_SKILLS[i % 8:] + JOB_SKILLS[:i % 8] for i in range(32)]
+MATCH_SIZES = [100, 1000, 10000]
+
+
+@benchmark("portfolio.match_jobs_loop", params=MATCH_SIZES, sized=True)
+def bench_match_jobs_loop(ctx, rows):
+    portfolio = _loaded_portfolio(ctx, rows, "chroma")
+    return lambda: [(portfolio.query_links(str(skills)), portfolio.suggest_skills_for_job(skills))
+                    for skills in CAMPAIGN_JOBS]
+
+
+@benchmark("portfolio.match_jobs", params=MATCH_SIZES, sized=True)
+def bench_match_jobs(ctx, rows):
+    portfolio = _loaded_portfolio(ctx, rows, None)
+    return lambda: portfolio.match_jobs(CAMPAIGN_JOBS)
+
+
+# Alternating requests between two consultants' portfolios (1000 projects each):
+# both resident, reloaded from the index snapshot, or rebuilt from ChromaDB
+TENANT_SWITCH = ["resident", "cold-snapshot", "cold-rebuild"]
+
+
+@benchmark("portfolio.tenant_switch", params=TENANT_SWITCH)
+def bench_tenant_switch(ctx, setting):
+    from chromadb.api.client import SharedSystemClient
+    from portfolio_registry import PortfolioRegistry
+
+    SharedSystemClient.clear_system_cache()
+    ctx.stack.callback(SharedSystemClient.clear_system_cache)
+    directory = ctx.tmpdir()
+    ctx.chdir(directory)
+    for seed, name in enumerate(["alice", "bob"]):
+        make_portfolio_csv(os.path.join(directory, f"{name}.csv"), 1000, seed=seed)
+
+    registry = PortfolioRegistry(
+        portfolios_dir=directory,
+        max_bytes=1 << 40 if setting == "resident" else 0,
+        snapshot_dir="" if setting == "cold-rebuild" else os.path.join(directory, "snapshots"),
+    )
+    # First loads embed both portfolios (and write their snapshots)
+    for name in ["alice", "bob"]:
+        registry.get(name)
+    tenants = ["alice", "bob"]
+
+    def switch():
+        tenants.reverse()
+        registry.get(tenants[0]).query_links(str(JOB_SKILLS))
+
+    return switch
+
+
+# Fresh process until the portfolio is indexed and has answered one query: nothing on
+# disk (embeds every row), the build-time snapshot + Chroma store (app/build_index.py),
+# or the snapshot with an empty Chroma store (shared server / wiped volume)
+COLD_START = ["rebuild", "snapshot", "snapshot-empty-store"]
+COLD_START_ROWS = 5000
+_COLD_START_SCRIPT = (
+    "from portfolio import Portfolio; portfolio = Portfolio(file_path='portfolio.csv'); "
+    "portfolio.{}(); portfolio.query_links(\"['Python', 'AWS']\")"
+)
+
+
+@benchmark("portfolio.cold_start", params=COLD_START, rounds=3)
+def bench_cold_start(ctx, setting):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [APP_DIR, env.get("PYTHONPATH")]))
+
+    def run(directory, method):
+        subprocess.run([sys.executable, "-c", _COLD_START_SCRIPT.format(method)],
+                       cwd=directory, env=env, check=True, stdout=subprocess.DEVNULL)
+
+    baked = ctx.tmpdir()
+    make_portfolio_csv(os.path.join(baked, "portfolio.csv"), COLD_START_ROWS)
+    if setting != "rebuild":
+        run(baked, "build_snapshot")
+        if setting == "snapshot-empty-store":
+            snapshots = os.path.join(baked, "vector_db", "snapshots")
+            shutil.move(snapshots, os.path.join(baked, "snapshots"))
+            shutil.rmtree(os.path.join(baked, "vector_db"))
+            os.makedirs(os.path.join(baked, "vector_db"))
+            shutil.move(os.path.join(baked, "snapshots"), snapshots)
+
+    directory = os.path.join(ctx.tmpdir(), "container")
+
+    def fresh_container():
+        shutil.rmtree(directory, ignore_errors=True)
+        shutil.copytree(baked, directory)
+
+    return fresh_container, lambda: run(directory, "warm_indexes")
+
+
+_worker_portfolio = None
+
+
+def _init_query_worker(csv_path: str, env: dict):
+    global _worker_portfolio
+    os.environ.update(env)
+    from portfolio import Portfolio
+
+    # Every query goes to ChromaDB: this benchmark compares client modes
+    _worker_portfolio = Portfolio(file_path=csv_path, vector_backend="chroma")
+    # Load the embedding model before the timed rounds
+    _worker_portfolio.query_links(str(JOB_SKILLS))
+
+
+def _query_worker(i: int):
+    shift = i % len(JOB_SKILLS)
+    return _worker_portfolio.query_links(str(JOB_SKILLS[shift:] + JOB_SKILLS[:shift]))
+
+
+def _chroma_server(ctx, path: str) -> int:
+    """Start a local Chroma server (`chroma run`) for the benchmark and return its port."""
+    import chromadb
+
+    if not shutil.which("chroma"):
+        raise RuntimeError("`chroma` CLI not found (installed with chromadb)")
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    server = subprocess.Popen(["chroma", "run", "--path", path, "--host", "127.0.0.1", "--port", str(port)],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    ctx.stack.callback(server.wait)
+    ctx.stack.callback(server.terminate)
+
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            chromadb.HttpClient(host="127.0.0.1", port=port).heartbeat()
+            return port
+        except Exception:
+            if time.monotonic() > deadline or server.poll() is not None:
+                raise RuntimeError("Chroma server did not start")
+            time.sleep(0.2)
+
+
+@benchmark("portfolio.query_links_concurrent", params=CONCURRENT_WORKERS, rounds=5)
+def bench_query_links_concurrent(ctx, setting):
+    """
+    CONCURRENT_QUERIES `query_links` calls per round, spread over N worker
+    processes that each open their own embedded store on one directory, or
+    share one Chroma server over HTTP (CHROMA_MODE=http).
+    """
+    import chromadb
+    from chromadb.api.client import SharedSystemClient
+    from portfolio import Portfolio
+
+    mode, workers = setting.split("-")
+    workers = int(workers)
+
+    SharedSystemClient.clear_system_cache()
+    ctx.stack.callback(SharedSystemClient.clear_system_cache)
+
+    directory = ctx.tmpdir()
+    csv_path = make_portfolio_csv(os.path.join(directory, "portfolio.csv"), CONCURRENT_ROWS)
+    db_path = os.path.join(directory, "vector_db")
+
+    if mode == "http":
+        port = _chroma_server(ctx, db_path)
+        client = chromadb.HttpClient(host="127.0.0.1", port=port)
+        env = {"CHROMA_MODE": "http", "CHROMA_HOST": "127.0.0.1", "CHROMA_PORT": str(port)}
+    else:
+        client = chromadb.PersistentClient(path=db_path)
+        env = {"CHROMA_MODE": "embedded", "CHROMA_PATH": db_path}
+    Portfolio(file_path=csv_path, client=client).load_portfolio()
+
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=_init_query_worker, initargs=(csv_path, env))
+    ctx.stack.callback(pool.shutdown)
+    # Start every worker process before timing
+    list(pool.map(_query_worker, range(workers * 2)))
+
+    return lambda: list(pool.map(_query_worker, range(CONCURRENT_QUERIES)))
@@ -0,0 +1,75 @@
+"""Text cleaning, job page scraping/parsing and search result extraction benchmarks."""
+import os
+import json
+
+from harness import benchmark, read_fixture
+
+PAGE_SIZES = ["small", "medium", "large"]
+RESULT_COUNTS = [1000, 10000]
+
+
+def _page_html(size: str) -> str:
+    if size == "large":
+        # ~100 KB page: the medium posting with its body repeated, like boards that inline listings
+        html = read_fixture("job_page_medium.html")
+        head, body = html.split("<body>", 1)
+        return head + "<body>" + body * 40
+    return read_fixture(f"job_page_{size}.html")
+
+
+@benchmark("clean_text", params=PAGE_SIZES)
+def bench_clean_text(ctx, size):
+    from utils import clean_text
+
+    html = _page_html(size)
+    return lambda: clean_text(html)
+
+
+@benchmark("scrape_job_page", params=PAGE_SIZES)
+def bench_scrape_job_page(ctx, size):
+    from utils import scrape_job_page
+
+    directory = ctx.tmpdir()
+    with open(os.path.join(directory, "job.html"), "w", encoding="utf-8") as f:
+        f.write(_page_html(size))
+
+    url = f"{ctx.fixture_server(directory)}/job.html"
+    return lambda: scrape_job_page(url)
+
+
+@benchmark("scrape_job_page.oversized", params=["listing", "pdf"])
+def bench_scrape_oversized(ctx, kind):
+    """~5 MB responses: a page with a huge listing after the posting, and a PDF behind a job URL."""
+    from utils import scrape_job_page
+
+    directory = ctx.tmpdir()
+    if kind == "pdf":
+        name = "job.pdf"
+        content = b"%PDF-1.4\n" + os.urandom(5 * 1024 * 1024)
+    else:
+        name = "job.html"
+        html = _page_html("medium")
+        head, body = html.split("<body>", 1)
+        filler = "<div class='related'>Related job teaser</div>" * 120000
+        content = (head + "<body>" + body.replace("</body>", filler + "</body>")).encode("utf-8")
+    with open(os.path.join(directory, name), "wb") as f:
+        f.write(content)
+
+    url = f"{ctx.fixture_server(directory)}/{name}"
+    return lambda: scrape_job_page(url)
+
+
+@benchmark("extract_listing_fields", params=RESULT_COUNTS, sized=True)
+def bench_extract_listing_fields(ctx, count):
+    from utils import ListingExtractor
+
+    fixtures = json.loads(read_fixture("search_results.json"))
+    extractor = ListingExtractor()
+
+    # Guard accuracy before timing: outputs must match the recorded fixtures
+    for item, extracted in zip(fixtures, extractor.extract_batch(fixtures)):
+        if extracted != item["expected"]:
+            raise AssertionError(f"{item['title']!r}: expected {item['expected']}, got {extracted}")
+
+    listings = [fixtures[i % len(fixtures)] for i in range(count)]
+    return lambda: extractor.extract_batch(listings)
@@ -0,0 +1,253 @@
+"""
+Minimal benchmark harness for the cold-email pipeline.
+
+Benchmarks are registered with the `@benchmark` decorator. The decorated
+function is the setup phase: it receives a `BenchContext` (plus one value
+from `params`) and returns the callable to time, or a
+`(before_each, timed)` tuple when every round needs fresh state.
+"""
+import os
+import sys
+import time
+import json
+import random
+import shutil
+import tempfile
+import platform
+import statistics
+import threading
+import subprocess
+import contextlib
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from typing import Callable, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+APP_DIR = os.path.join(REPO_ROOT, "app")
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+# The app modules import each other as top-level modules (streamlit runs app/main.py)
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+BENCHMARKS: List[Dict] = []
+
+SKILL_VOCABULARY = [
+    "Python", "JavaScript", "TypeScript", "React.js", "Node.js", "Angular", "Vue.js",
+    "Django", "Flask", "FastAPI", "Spring Boot", "Java", "Go", "Rust", "C#", ".NET Core",
+    "PostgreSQL", "MySQL", "MongoDB", "Redis", "Elasticsearch", "DynamoDB", "Firestore",
+    "AWS", "Azure", "GCP", "Docker", "Kubernetes", "Terraform", "Jenkins",
+    "TensorFlow", "PyTorch", "scikit-learn", "Pandas", "Spark", "Airflow", "Kafka",
+    "GraphQL", "Next.js", "TailwindCSS", "Supabase", "Firebase", "Flutter", "Swift",
+    "Kotlin", "Tableau", "Power BI", "Jupyter", "Git", "Jira"
+]
+
+
+def benchmark(name: str, params: Optional[List] = None, rounds: Optional[int] = None,
+              warmup: bool = True, sized: bool = False):
+    """
+    Register a benchmark.
+
+    Args:
+        name (str): Benchmark name (the param value is appended as `name[param]`)
+        params (list): Optional parameter values, one benchmark run per value
+        rounds (int): Fixed number of timed rounds (for slow benchmarks)
+        warmup (bool): Run one untimed round first
+        sized (bool): `params` are data sizes that `--sizes` may restrict
+    """
+    def decorator(fn):
+        BENCHMARKS.append({
+            "name": name, "setup": fn, "params": params, "rounds": rounds, "warmup": warmup,
+            "sized": sized
+        })
+        return fn
+    return decorator
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class _QuietServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # Clients that stop reading early (size-capped downloads) reset the connection
+        pass
+
+
+class BenchContext:
+    """Per-benchmark resources, cleaned up once the benchmark finishes."""
+
+    def __init__(self):
+        self.stack = contextlib.ExitStack()
+
+    def tmpdir(self) -> str:
+        path = tempfile.mkdtemp(prefix="coldemail-bench-")
+        self.stack.callback(shutil.rmtree, path, True)
+        return path
+
+    def chdir(self, path: str):
+        """Run the rest of the benchmark from `path` (Portfolio writes `vector_db/` in the cwd)."""
+        previous = os.getcwd()
+        os.chdir(path)
+        self.stack.callback(os.chdir, previous)
+
+    def fixture_server(self, directory: str = FIXTURES_DIR) -> str:
+        """Serve `directory` over HTTP on localhost and return the base URL."""
+        handler = partial(_QuietHandler, directory=directory)
+        server = _QuietServer(("127.0.0.1", 0), handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.stack.callback(server.server_close)
+        self.stack.callback(server.shutdown)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    def close(self):
+        self.stack.close()
+
+
+def make_portfolio_csv(path: str, rows: int, seed: int = 0) -> str:
+    """Write a synthetic portfolio CSV with the same columns as app/rsrc/links_portfolio.csv."""
+    import pandas as pd
+
+    rng = random.Random(seed)
+    data = {
+        "TechStack": [", ".join(rng.sample(SKILL_VOCABULARY, rng.randint(3, 6))) for _ in range(rows)],
+        "Portfolio_Link": [f"https://example.com/project-{i}" for i in range(rows)],
+    }
+    pd.DataFrame(data).to_csv(path, index=False)
+    return path
+
+
+def read_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def measure(fn: Callable, before_each: Optional[Callable] = None, rounds: Optional[int] = None,
+            warmup: bool = True, min_rounds: int = 3, max_rounds: int = 1000,
+            min_time: float = 0.5) -> Dict:
+    """Time `fn` for a fixed number of rounds, or until `min_time` seconds have been spent."""
+    timings = []
+    target_rounds = rounds if rounds else max_rounds
+
+    # Warm-up round (imports, lazy caches, connection setup)
+    if warmup:
+        if before_each:
+            before_each()
+        fn()
+
+    spent = 0.0
+    while len(timings) < target_rounds:
+        if before_each:
+            before_each()
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        timings.append(elapsed)
+        spent += elapsed
+        if not rounds and len(timings) >= min_rounds and spent >= min_time:
+            break
+
+    ordered = sorted(timings)
+    return {
+        "rounds": len(timings),
+        "min": ordered[0],
+        "max": ordered[-1],
+        "mean": statistics.fmean(timings),
+        "median": statistics.median(timings),
+        "p95": ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))],
+        "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+    }
+
+
+def run_benchmarks(selected: Optional[str] = None, sizes: Optional[List] = None) -> Dict:
+    """Run registered benchmarks whose name contains `selected`; return results keyed by name."""
+    results = {}
+
+    for bench in BENCHMARKS:
+        if selected and selected not in bench["name"]:
+            continue
+
+        params = bench["params"] or [None]
+        if sizes and bench["sized"]:
+            params = [p for p in bench["params"] if p in sizes]
+
+        for param in params:
+            name = bench["name"] if param is None else f"{bench['name']}[{param}]"
+            ctx = BenchContext()
+            print(f"⏱️  {name} ...", flush=True)
+            try:
+                target = bench["setup"](ctx) if param is None else bench["setup"](ctx, param)
+                before_each, fn = target if isinstance(target, tuple) else (None, target)
+                stats = measure(fn, before_each=before_each, rounds=bench["rounds"],
+                                warmup=bench["warmup"])
+                print(f"   median {stats['median'] * 1000:.3f} ms | p95 {stats['p95'] * 1000:.3f} ms "
+                      f"({stats['rounds']} rounds)")
+                results[name] = stats
+            except Exception as e:
+                print(f"   ❌ {type(e).__name__}: {e}")
+                results[name] = {"error": f"{type(e).__name__}: {e}"}
+            finally:
+                ctx.close()
+
+    return results
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, text=True
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def save_results(results: Dict, output: Optional[str] = None) -> str:
+    """Store results as JSON (default: benchmarks/results/<commit>.json)."""
+    revision = git_revision()
+    payload = {
+        "commit": revision,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "benchmarks": results,
+    }
+
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{revision}.json")
+
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+    return output
+
+
+def compare_results(baseline_path: str, results: Dict, threshold: float = 0.10) -> List[str]:
+    """
+    Compare medians against a previous results file.
+
+    Returns:
+        list: Names of benchmarks slower than the baseline by more than `threshold`
+    """
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    regressions = []
+    print(f"\n📊 Comparison against {baseline.get('commit', baseline_path)}")
+    for name, stats in results.items():
+        old = baseline.get("benchmarks", {}).get(name)
+        if not old or "median" not in old or "median" not in stats:
+            continue
+        ratio = stats["median"] / old["median"] if old["median"] else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "⚠️ regression"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            flag = "✅ faster"
+        print(f"   {name:<50} {old['median'] * 1000:>10.3f} ms -> {stats['median'] * 1000:>10.3f} ms "
+              f"(x{ratio:.2f}) {flag}")
+    return regressions
@@ -0,0 +1,144 @@
+"""
+Load test for the HTTP API (app/api.py) against the offline fake LLM backend.
+
+Starts the API with uvicorn in a background thread (LLM_BACKEND=fake) and
+fires requests from an async httpx client, reporting requests/second and
+latency percentiles per endpoint.
+
+Usage:
+    python benchmarks/load_api.py
+    python benchmarks/load_api.py --requests 500 --concurrency 50 --endpoint generate
+    FAKE_LLM_LATENCY_MS=300 python benchmarks/load_api.py --endpoint variations
+
+The default endpoints carry their portfolio links in the request, so no
+embedding model is needed; pass `--endpoint match` to include vector search.
+"""
+import os
+import sys
+import time
+import json
+import socket
+import asyncio
+import argparse
+import threading
+import statistics
+
+os.environ.setdefault("LLM_BACKEND", "fake")
+
+from harness import FIXTURES_DIR  # noqa: E402  (puts app/ on sys.path)
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+JOB_DATA = {
+    "role": "Senior Backend Engineer",
+    "experience": "5+ years",
+    "skills": ["Python", "FastAPI", "PostgreSQL", "AWS"],
+    "description": "Build and scale the APIs behind our hiring platform.",
+}
+LINKS = [[{"links": "https://example.com/portfolio/api-platform"}]]
+
+
+def _job_text() -> str:
+    with open(os.path.join(FIXTURES_DIR, "job_page_medium.html"), encoding="utf-8") as f:
+        return f.read()[:4000]
+
+
+def request_body(endpoint: str) -> dict:
+    if endpoint == "extract":
+        return {"text": _job_text()}
+    if endpoint == "match":
+        return {"skills": JOB_DATA["skills"]}
+    if endpoint == "generate":
+        return {"job_data": JOB_DATA, "links": LINKS, "tone": "technical"}
+    if endpoint == "variations":
+        return {"job_data": JOB_DATA, "links": LINKS, "company_intel": {}}
+    if endpoint == "followups":
+        return {"email": "Hi team, ...", "job_data": JOB_DATA, "company_name": "Example"}
+    if endpoint == "batch":
+        return {"requests": [{"op": op, "body": request_body(op)} for op in ("generate", "followups")]}
+    raise ValueError(f"unknown endpoint {endpoint!r}")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int) -> uvicorn.Server:
+    config = uvicorn.Config("api:app", host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def load(base_url: str, endpoint: str, requests: int, concurrency: int) -> dict:
+    body = request_body(endpoint)
+    latencies, errors = [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        # Warm-up: first calls create the LLM clients
+        await client.post(f"/{endpoint}", json=body)
+
+        async def one():
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(f"/{endpoint}", json=body)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "endpoint": endpoint,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="HTTP API load test (fake LLM backend)")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=20, help="Requests in flight at once")
+    parser.add_argument("--endpoint", action="append",
+                        help="Endpoint to load (repeatable; default: extract, generate, variations, followups, batch)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    endpoints = args.endpoint or ["extract", "generate", "variations", "followups", "batch"]
+    port = _free_port()
+    server = start_server(port)
+    base_url = f"http://127.0.0.1:{port}"
+
+    results = []
+    try:
+        for endpoint in endpoints:
+            result = asyncio.run(load(base_url, endpoint, args.requests, args.concurrency))
+            results.append(result)
+            if not args.json:
+                print(f"{endpoint:<12} {result['rps']:>8.1f} req/s   p50 {result['p50_ms']:>7.1f} ms   "
+                      f"p95 {result['p95_ms']:>7.1f} ms   errors {result['errors']}")
+    finally:
+        server.should_exit = True
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    return 1 if any(r["errors"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
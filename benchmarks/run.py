@@ -0,0 +1,46 @@
+"""
+Run the benchmark suite and store the results as JSON.
+
+Usage:
+    python benchmarks/run.py                              # everything
+    python benchmarks/run.py --filter portfolio --sizes 1000,10000
+    python benchmarks/run.py --compare benchmarks/results/<old>.json
+"""
+import sys
+import argparse
+
+from harness import run_benchmarks, save_results, compare_results
+
+# Registers benchmarks on import
+import bench_text  # noqa: F401
+import bench_portfolio  # noqa: F401
+import bench_pipeline  # noqa: F401
+import bench_ingest  # noqa: F401
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Cold email generator benchmarks")
+    parser.add_argument("--filter", help="Only run benchmarks whose name contains this string")
+    parser.add_argument("--sizes", help="Comma-separated row counts for sized benchmarks (e.g. 1000,10000)")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="Previous results file to compare medians against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative slowdown reported as a regression (default: 0.10)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",")] if args.sizes else None
+    results = run_benchmarks(args.filter, sizes)
+
+    path = save_results(results, args.output)
+    print(f"\n✅ Results saved to {path}")
+
+    if args.compare:
+        regressions = compare_results(args.compare, results, args.threshold)
+        if regressions:
+            print(f"\n⚠️ {len(regressions)} regression(s) above {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
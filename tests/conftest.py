@@ -0,0 +1,37 @@
+import os
+import sys
+import threading
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(REPO_ROOT, "app")
+FIXTURES_DIR = os.path.join(REPO_ROOT, "benchmarks", "fixtures")
+
+# The app modules import each other as top-level modules (streamlit runs app/main.py)
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def serve_directory():
+    """Serve a directory over HTTP on localhost: `serve_directory(path)` returns the base URL."""
+    servers = []
+
+    def serve(directory: str = FIXTURES_DIR) -> str:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), partial(_QuietHandler, directory=directory))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield serve
+    for server in servers:
+        server.shutdown()
+        server.server_close()
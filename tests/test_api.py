@@ -0,0 +1,66 @@
+"""API request validation: malformed bodies are rejected with a 400, not a 500."""
+import pytest
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+import api
+
+
+@pytest.fixture
+def client():
+    # No lifespan: validation runs before the shared Chain and portfolios are needed
+    return TestClient(Starlette(routes=api.app.routes))
+
+
+@pytest.mark.parametrize("path", ["/generate", "/variations"])
+@pytest.mark.parametrize("job_data", ["Python developer", ["Python"], 42])
+def test_job_data_must_be_an_object(client, path, job_data):
+    response = client.post(path, json={"job_data": job_data})
+
+    assert response.status_code == 400
+    assert response.json() == {"error": "'job_data' must be an object"}
+
+
+@pytest.mark.parametrize("path", ["/generate", "/variations"])
+def test_job_data_skills_must_be_a_list(client, path):
+    response = client.post(path, json={"job_data": {"role": "Engineer", "skills": "Python, SQL"}})
+
+    assert response.status_code == 400
+    assert response.json() == {"error": "'job_data.skills' must be a list"}
+
+
+def test_followups_job_data_must_be_an_object(client):
+    response = client.post("/followups", json={"email": "Hi", "job_data": "Engineer", "company_name": "Globex"})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("jobs", [["Python"], [{"skills": "Python"}], [["Python"], 3]])
+def test_match_jobs_entries_must_be_skill_lists(client, jobs):
+    response = client.post("/match_jobs", json={"jobs": jobs})
+
+    assert response.status_code == 400
+    assert "'jobs'" in response.json()["error"]
+
+
+@pytest.mark.parametrize("top_k", [0, -1, "2", 1.5, True])
+def test_match_jobs_top_k_must_be_positive_integer(client, top_k):
+    response = client.post("/match_jobs", json={"jobs": [["Python"]], "top_k": top_k})
+
+    assert response.status_code == 400
+    assert response.json() == {"error": "'top_k' must be a positive integer"}
+
+
+def test_batch_reports_malformed_items_separately(client):
+    response = client.post("/batch", json={"requests": [
+        {"op": "generate", "body": {"job_data": ["Python"]}},
+        {"op": "match_jobs", "body": {"jobs": "Python"}},
+        {"op": "nope"},
+    ]})
+
+    assert response.status_code == 200
+    assert response.json()["results"] == [
+        {"ok": False, "error": "'job_data' must be an object"},
+        {"ok": False, "error": "'jobs' must be a list of skill lists"},
+        {"ok": False, "error": "unknown op 'nope'"},
+    ]
@@ -0,0 +1,79 @@
+"""MinHash LSH near-duplicate detection: recall and precision around the 0.7 threshold."""
+import random
+
+import pytest
+
+from dedup import NearDuplicateIndex, collapse_near_duplicates, jaccard, shingles
+
+
+def _pairs(low: float, high: float, count: int = 100, seed: int = 7):
+    """Pages of 150 distinct words and a copy with some words replaced, Jaccard in (low, high]."""
+    rng = random.Random(seed)
+    vocab = [f"w{i}" for i in range(100000)]
+    pairs = []
+    while len(pairs) < count:
+        words = rng.sample(vocab, 150)
+        edited = list(words)
+        for i in rng.sample(range(150), rng.randint(3, 20)):
+            edited[i] = rng.choice(vocab)
+        a, b = " ".join(words), " ".join(edited)
+        if low < jaccard(shingles(a), shingles(b)) <= high:
+            pairs.append((a, b))
+    return pairs
+
+
+def _exact(a: str, b: str):
+    return lambda key: jaccard(shingles(a), shingles(b))
+
+
+def test_pairs_just_above_threshold_are_found():
+    # 16 bands of 8 rows found ~68% of these pairs
+    pairs = _pairs(0.70, 0.75, count=300)
+    found = 0
+    for a, b in pairs:
+        index = NearDuplicateIndex()
+        index.add("a", a)
+        found += index.query(b, similarity=_exact(a, b)) == "a"
+
+    assert found >= 0.98 * len(pairs)
+
+
+def test_pairs_just_above_threshold_share_a_band():
+    index = NearDuplicateIndex()
+    pairs = _pairs(0.70, 0.75, count=300)
+    for key, (a, _) in enumerate(pairs):
+        index.add(key, a)
+
+    shared = sum(key in dict(index.candidates(index.hasher.signature(b))) for key, (_, b) in enumerate(pairs))
+    assert shared >= 0.99 * len(pairs)
+
+
+def test_pairs_below_threshold_are_rejected():
+    pairs = _pairs(0.55, 0.68)
+    for a, b in pairs:
+        index = NearDuplicateIndex()
+        index.add("a", a)
+        assert index.query(b, similarity=_exact(a, b)) is None
+
+
+@pytest.mark.parametrize("bands", [16, 32])
+def test_band_layout_must_divide_permutations(bands):
+    assert NearDuplicateIndex(bands=bands).rows * bands == 128
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(bands=bands + 1)
+
+
+def test_collapse_near_duplicates_keeps_first_listing():
+    jobs = [
+        {"title": "Senior Python Engineer", "company": "Globex",
+         "description_snippet": "Build data pipelines with Python and Airflow.", "url": "a", "source": "indeed"},
+        {"title": "Senior Python Engineer", "company": "Globex",
+         "description_snippet": "Build data pipelines with Python and Airflow!", "url": "b", "source": "glassdoor"},
+        {"title": "Frontend Developer", "company": "Initech",
+         "description_snippet": "React and TypeScript.", "url": "c", "source": "indeed"},
+    ]
+    kept = collapse_near_duplicates(jobs)
+
+    assert [job["url"] for job in kept] == ["a", "c"]
+    assert kept[0]["duplicates"] == ["b"]
+    assert kept[0]["sources"] == ["indeed", "glassdoor"]
@@ -0,0 +1,80 @@
+"""Job source circuit breaker: a half-open breaker lets exactly one trial call through."""
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from job_sources import CircuitBreaker, JobSource, stream_jobs
+
+
+def _half_open_breaker(reset_timeout: float = 0.05) -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=reset_timeout)
+    breaker.record_failure()
+    assert not breaker.allow()
+    time.sleep(reset_timeout * 1.5)
+    assert breaker.state == "half-open"
+    return breaker
+
+
+def test_half_open_allows_one_concurrent_trial():
+    breaker = _half_open_breaker()
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        allowed = list(executor.map(lambda _: breaker.allow(), range(64)))
+
+    assert allowed.count(True) == 1
+
+
+def test_trial_failure_reopens_and_success_closes():
+    breaker = _half_open_breaker()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    time.sleep(0.075)
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert all(breaker.allow() for _ in range(5))
+
+
+def test_abandoned_trial_expires():
+    breaker = _half_open_breaker()
+    assert breaker.allow()
+    assert not breaker.allow()
+    time.sleep(0.075)
+    assert breaker.allow()
+
+
+class _BlockingSource(JobSource):
+    name = "Blocking"
+    cacheable = False
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.calls = 0
+
+    def search(self, keywords, location, max_results):
+        self.calls += 1
+        self.release.wait(5)
+        return [{"title": "Python Developer", "url": "https://example.com/1"}]
+
+
+def test_concurrent_streams_send_one_trial_to_half_open_source():
+    source = _BlockingSource()
+    source.breaker = _half_open_breaker()
+
+    first = stream_jobs(["python"], sources=[source], use_cache=False, deadline=5)
+    trial = threading.Thread(target=lambda: list(first))
+    trial.start()
+    deadline = time.monotonic() + 5
+    while source.calls == 0 and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+    second = list(stream_jobs(["python"], sources=[source], use_cache=False, deadline=5))
+    source.release.set()
+    trial.join(5)
+
+    assert source.calls == 1
+    assert second[0]["error"] == "circuit open"
+    assert source.breaker.state == "closed"
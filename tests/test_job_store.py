@@ -0,0 +1,42 @@
+"""Job store near-duplicate index: built once, shared by concurrent callers."""
+import time
+import threading
+
+import job_store
+from job_store import JobStore
+
+PAGE = " ".join(f"word{i}" for i in range(120))
+
+
+def test_concurrent_first_callers_share_one_index(tmp_path, monkeypatch):
+    builds = []
+
+    class SlowIndex(job_store.NearDuplicateIndex):
+        def __init__(self, *args, **kwargs):
+            builds.append(self)
+            time.sleep(0.05)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(job_store, "NearDuplicateIndex", SlowIndex)
+    store = JobStore(path=str(tmp_path / "jobs.db"))
+    indexes = []
+    threads = [threading.Thread(target=lambda: indexes.append(store._near_duplicates())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(builds) == 1
+    assert all(index is builds[0] for index in indexes)
+
+
+def test_index_is_rebuilt_from_stored_pages(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    JobStore(path=path).ingest_page("https://example.com/a", PAGE, lambda text: {"role": "A"})
+
+    store = JobStore(path=path)
+    job_data, changed = store.ingest_page("https://example.com/b", PAGE + " extra",
+                                          lambda text: {"role": "B"})
+
+    assert (job_data, changed) == ({"role": "A"}, True)
+    assert len(store._near_duplicates()) == 1
@@ -0,0 +1,92 @@
+"""The compiled ListingExtractor must return what the per-call regex code it replaced returned."""
+import os
+import re
+import json
+from urllib.parse import urlparse
+
+import pytest
+
+from conftest import FIXTURES_DIR
+from utils import ListingExtractor
+
+
+# Per-call implementation replaced by ListingExtractor (kept verbatim as the reference)
+def legacy_company_from_url(url):
+    try:
+        domain = urlparse(url).netloc
+        domain = domain.replace('www.', '').replace('careers.', '').replace('jobs.', '')
+        return domain.split('.')[0].title()
+    except Exception:
+        return "Company"
+
+
+def legacy_company_from_title(title, url):
+    company_from_url = legacy_company_from_url(url)
+    if company_from_url and company_from_url != "Company":
+        return company_from_url
+
+    title_lower = title.lower()
+    patterns = [
+        r'(.+?)\s*-\s*.+',
+        r'.+?\s+at\s+(.+)',
+        r'(.+?)\s+hiring',
+    ]
+    for pattern in patterns:
+        match = re.search(pattern, title_lower, re.IGNORECASE)
+        if match:
+            company = match.group(1).strip()
+            company = re.sub(r'\b(jobs?|careers?|hiring|recruiting)\b', '', company, flags=re.IGNORECASE).strip()
+            if company and len(company) > 1:
+                return company.title()
+    return company_from_url
+
+
+def legacy_location_from_snippet(snippet):
+    location_patterns = [
+        r'in\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
+        r'at\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
+        r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+(?:jobs?|positions?|roles?)',
+    ]
+    for pattern in location_patterns:
+        match = re.search(pattern, snippet, re.IGNORECASE)
+        if match:
+            location = match.group(1).strip()
+            if not any(word in location.lower() for word in ['developer', 'engineer', 'manager', 'senior', 'junior']):
+                return location
+    return ""
+
+
+with open(os.path.join(FIXTURES_DIR, "search_results.json"), "r", encoding="utf-8") as f:
+    SEARCH_RESULTS = json.load(f)
+
+# Titles/URLs that exercise the title patterns (no usable company in the domain)
+TITLE_CASES = [
+    ("Acme Corp - Backend Engineer", "not a url"),
+    ("Data Engineer at Globex Careers", ""),
+    ("Initech hiring Python developers", ""),
+    ("Jobs - Senior Developer", ""),
+    ("X - Y", ""),
+    ("Plain title", ""),
+]
+
+
+@pytest.mark.parametrize("item", SEARCH_RESULTS, ids=lambda item: item["title"])
+def test_matches_legacy_and_fixture(item):
+    extracted = ListingExtractor().extract_batch([item])[0]
+    legacy = {
+        "company": legacy_company_from_title(item["title"], item["url"]),
+        "location": legacy_location_from_snippet(item["snippet"]),
+    }
+    assert extracted == legacy
+    assert extracted == item["expected"]
+
+
+def test_batch_preserves_order():
+    extractor = ListingExtractor()
+    listings = SEARCH_RESULTS * 3
+    assert extractor.extract_batch(listings) == [item["expected"] for item in listings]
+
+
+@pytest.mark.parametrize("title,url", TITLE_CASES)
+def test_title_patterns_match_legacy(title, url):
+    assert ListingExtractor().company(title, url) == legacy_company_from_title(title, url)
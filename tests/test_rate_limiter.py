@@ -0,0 +1,51 @@
+"""Rate-limit scheduler: interactive callers are served before batch work."""
+import time
+import threading
+
+import rate_limiter
+from rate_limiter import RateLimitScheduler, call_priority, INTERACTIVE, BATCH
+from task_queue import TaskQueue, Worker, register_task
+
+
+def _wait_for_waiters(limits, count: int):
+    deadline = time.monotonic() + 5
+    while len(limits.waiters) < count:
+        assert time.monotonic() < deadline, "waiter never queued"
+        time.sleep(0.005)
+
+
+def test_interactive_waiter_is_granted_before_earlier_batch_waiter():
+    scheduler = RateLimitScheduler(requests_per_minute=600)  # one request per 0.1s
+    limits = scheduler.limits("model")
+    limits.requests.level = 0
+    granted = []
+
+    def caller(priority):
+        scheduler.acquire(priority=priority, model="model")
+        granted.append(priority)
+
+    batch = threading.Thread(target=caller, args=(BATCH,))
+    batch.start()
+    _wait_for_waiters(limits, 1)
+    interactive = threading.Thread(target=caller, args=(INTERACTIVE,))
+    interactive.start()
+    batch.join(5)
+    interactive.join(5)
+
+    assert granted == [INTERACTIVE, BATCH]
+
+
+def test_call_priority_sets_default_priority():
+    assert rate_limiter._call_priority.get() == INTERACTIVE
+    with call_priority(BATCH):
+        assert rate_limiter._call_priority.get() == BATCH
+    assert rate_limiter._call_priority.get() == INTERACTIVE
+
+
+def test_worker_runs_tasks_at_batch_priority(tmp_path):
+    register_task("priority-probe")(lambda ctx: rate_limiter._call_priority.get())
+    queue = TaskQueue(path=str(tmp_path / "tasks.db"))
+    task_id = queue.submit("priority-probe", {})
+
+    assert Worker(queue).run_once()
+    assert queue.get(task_id)["result"] == BATCH
@@ -0,0 +1,191 @@
+"""Structured job ingestion: ATS board APIs, JSON-LD and the HTML fallback, against local fixtures."""
+import os
+import json
+
+import pytest
+
+from conftest import FIXTURES_DIR
+from job_store import JobStore
+from structured_jobs import ATS_ADAPTERS, fetch_job_posting, ingest_job_url, parse_json_ld_job
+
+ATS_POSTINGS = {
+    "greenhouse": ("https://boards.greenhouse.io/globex/jobs/4012345", "Senior Machine Learning Engineer"),
+    "lever": ("https://jobs.lever.co/globex/5f1e8a52-0c3b-4f4e-9d6a-2b7c1e0d9a41", "Backend Engineer, Payments"),
+    "ashby": ("https://jobs.ashbyhq.com/globex/9b2d4c6e-1f3a-4b5c-8d7e-0a1b2c3d4e5f", "Frontend Engineer"),
+}
+
+
+@pytest.fixture
+def adapters(serve_directory):
+    """Every registered adapter, pointed at the fixture copies of the ATS APIs."""
+    api_base = serve_directory(os.path.join(FIXTURES_DIR, "ats"))
+    return [type(adapter)(api_base=api_base) for adapter in ATS_ADAPTERS]
+
+
+def _json_ld_page(posting) -> str:
+    return (f'<html><head><script type="application/ld+json">{json.dumps(posting)}</script></head>'
+            f'<body><p>Job page</p></body></html>')
+
+
+@pytest.mark.parametrize("method", list(ATS_POSTINGS))
+def test_ats_adapters(adapters, method):
+    url, role = ATS_POSTINGS[method]
+    job_data, text, used = fetch_job_posting(url, adapters=adapters)
+
+    assert used == method
+    assert job_data["role"] == role
+    assert job_data["skills"]
+    assert job_data["description"] and text
+
+
+def test_ashby_missing_posting(adapters):
+    ashby = next(adapter for adapter in adapters if adapter.name == "ashby")
+    assert ashby.fetch("https://jobs.ashbyhq.com/globex/11111111-2222-4333-8444-555555555555") is None
+
+
+def test_adapters_ignore_other_urls(adapters):
+    assert all(adapter.fetch("https://example.com/jobs/1") is None for adapter in adapters)
+
+
+def test_json_ld_page(serve_directory):
+    job_data, text, used = fetch_job_posting(f"{serve_directory()}/job_page_jsonld.html", adapters=[])
+
+    assert used == "json-ld"
+    assert job_data["role"] == "Senior Machine Learning Engineer"
+    assert job_data["skills"] == ["Python", "PyTorch", "Kubernetes", "AWS", "Spark"]
+    assert job_data["experience"] == "5+ years"
+    assert job_data["company"] == "Globex"
+    assert job_data["location"] == "Berlin"
+    assert text
+
+
+def test_html_fallback(serve_directory):
+    job_data, text, used = fetch_job_posting(f"{serve_directory()}/job_page_medium.html", adapters=[])
+
+    assert used == "html"
+    assert job_data is None
+    assert text
+
+
+def test_missing_page(serve_directory):
+    assert fetch_job_posting(f"{serve_directory()}/no_such_page.html", adapters=[]) == (None, None, "failed")
+
+
+@pytest.mark.parametrize("months,expected", [
+    (36, "3+ years"),
+    ("24", "2+ years"),
+    (12, "1+ years"),
+    (6, "6+ months"),
+    ("11", "11+ months"),
+    (0, "Senior level"),
+    (-6, "Senior level"),
+    ("3+", "Senior level"),
+    ("three", "Senior level"),
+    (None, "Senior level"),
+])
+def test_json_ld_months_of_experience(months, expected):
+    posting = {
+        "@type": "JobPosting",
+        "title": "Data Engineer",
+        "description": "<p>Spark pipelines.</p>",
+        "experienceRequirements": {"monthsOfExperience": months, "description": "Senior level"},
+    }
+    assert parse_json_ld_job(_json_ld_page(posting))["experience"] == expected
+
+
+def test_json_ld_list_and_types():
+    page = _json_ld_page([
+        {"@type": "BreadcrumbList"},
+        {"@type": ["JobPosting"], "title": "Go Developer", "description": "Go and gRPC services, 3+ years.",
+         "hiringOrganization": "Initech", "jobLocation": [{"address": {"addressLocality": "Austin"}}]},
+    ])
+    job_data = parse_json_ld_job(page)
+
+    assert job_data["role"] == "Go Developer"
+    assert job_data["company"] == "Initech"
+    assert job_data["location"] == "Austin"
+    assert job_data["experience"] == "3+ years"
+    assert "Go" in job_data["skills"]
+
+
+def test_json_ld_without_posting():
+    assert parse_json_ld_job('<script type="application/ld+json">{not json</script>') is None
+    assert parse_json_ld_job(_json_ld_page({"@type": "Organization", "name": "Globex"})) is None
+
+
+@pytest.fixture
+def ingest(serve_directory, tmp_path, monkeypatch):
+    """ingest_job_url on fixture pages with a fresh store and a recording LLM extractor."""
+    import structured_jobs
+
+    monkeypatch.setattr(structured_jobs, "ATS_ADAPTERS", [])
+    store = JobStore(path=str(tmp_path / "jobs.db"))
+    pages = serve_directory()
+    calls = []
+
+    def extractor(text):
+        calls.append(text)
+        return {"role": "LLM guess", "skills": []}
+
+    def run(page):
+        job_data, _, method = ingest_job_url(f"{pages}/{page}", extractor, store=store)
+        return job_data, method
+
+    run.calls = calls
+    return run
+
+
+def test_ingest_structured_skips_extraction(ingest):
+    job_data, method = ingest("job_page_jsonld.html")
+
+    assert method == "json-ld"
+    assert job_data["role"] == "Senior Machine Learning Engineer"
+    assert ingest.calls == []
+
+
+def test_ingest_html_runs_extraction(ingest):
+    job_data, method = ingest("job_page_medium.html")
+
+    assert method == "html"
+    assert job_data["role"] == "LLM guess"
+    assert len(ingest.calls) == 1
+
+
+def test_structured_data_replaces_near_duplicate_extraction(ingest):
+    # Same posting without JSON-LD first: its LLM extraction must not stand in for the exact data
+    ingest("job_page_medium.html")
+    job_data, method = ingest("job_page_jsonld.html")
+
+    assert method == "json-ld"
+    assert job_data["role"] == "Senior Machine Learning Engineer"
+    assert len(ingest.calls) == 1
+
+
+def _late_json_ld_page() -> str:
+    """Description in <main> (after related-job <article> cards), then ~40 KB of markup, then JSON-LD."""
+    posting = {"@type": "JobPosting", "title": "Platform Engineer", "description": "Terraform and AWS."}
+    cards = "".join(f"<article class='related'>Related job {i} " + "y" * 8000 + "</article>" for i in range(3))
+    filler = "".join(f"<div class='footer-link'>Link {i} " + "x" * 80 + "</div>" for i in range(400))
+    return (f"<html><body>{cards}<main><script>var end = '</main>';</script>"
+            f"<h1>Platform Engineer</h1><p>Run our Terraform and AWS platform.</p></main>{filler}"
+            f'<script type="application/ld+json">{json.dumps(posting)}</script></body></html>')
+
+
+def test_json_ld_after_main_is_downloaded(serve_directory, tmp_path):
+    (tmp_path / "late.html").write_text(_late_json_ld_page(), encoding="utf-8")
+    job_data, text, used = fetch_job_posting(f"{serve_directory(str(tmp_path))}/late.html", adapters=[])
+
+    assert used == "json-ld"
+    assert job_data["role"] == "Platform Engineer"
+
+
+def test_fetch_page_stops_at_end_of_main(serve_directory, tmp_path):
+    from utils import fetch_page
+
+    page = _late_json_ld_page().encode("utf-8")
+    (tmp_path / "late.html").write_bytes(page)
+    content = fetch_page(f"{serve_directory(str(tmp_path))}/late.html")
+
+    # Related-job articles and the "</main>" inside a script don't end the download early
+    assert b"Run our Terraform and AWS platform." in content
+    assert len(content) < len(page)
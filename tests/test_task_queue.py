@@ -0,0 +1,58 @@
+"""Task queue leases: a worker whose task was reclaimed can't overwrite the new run."""
+import pytest
+
+from task_queue import TaskQueue, Worker, register_task, RUNNING, QUEUED, DONE
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return TaskQueue(path=str(tmp_path / "tasks.db"), stale_after=60)
+
+
+def _expire_lease(queue: TaskQueue, task_id: str):
+    with queue._lock:
+        queue._conn.execute("UPDATE tasks SET heartbeat_at = 0 WHERE id = ?", (task_id,))
+
+
+def _reclaim(queue: TaskQueue, task_id: str, worker: str):
+    _expire_lease(queue, task_id)
+    assert queue.requeue_stale() == 1
+    assert queue.get(task_id)["status"] == QUEUED
+    assert queue.claim(worker)["id"] == task_id
+
+
+def test_reclaimed_task_is_not_overwritten_by_first_worker(queue):
+    task_id = queue.submit("probe", {})
+    queue.claim("first")
+    _reclaim(queue, task_id, "second")
+
+    assert not queue.complete(task_id, "first", {"by": "first"})
+    assert not queue.fail(task_id, "first", "boom")
+    assert not queue.mark_cancelled(task_id, "first")
+    task = queue.get(task_id)
+    assert (task["status"], task["worker"], task["result"]) == (RUNNING, "second", None)
+
+    assert queue.complete(task_id, "second", {"by": "second"})
+    assert queue.get(task_id)["result"] == {"by": "second"}
+
+
+def test_finished_task_is_not_overwritten(queue):
+    task_id = queue.submit("probe", {})
+    queue.claim("first")
+    assert queue.complete(task_id, "first", {"ok": True})
+
+    assert not queue.fail(task_id, "first", "late failure")
+    assert queue.get(task_id)["status"] == DONE
+
+
+def test_worker_discards_outcome_of_reclaimed_task(queue):
+    @register_task("reclaimed-midway")
+    def handler(ctx):
+        _reclaim(ctx.queue, ctx.task_id, "second")
+        return {"by": "first"}
+
+    task_id = queue.submit("reclaimed-midway", {})
+    assert Worker(queue, name="first").run_once()
+
+    task = queue.get(task_id)
+    assert (task["status"], task["worker"], task["result"]) == (RUNNING, "second", None)